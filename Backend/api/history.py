@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends
-from core.firebase import db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from core.repository import db
 from core.auth import get_current_user
+from core.message_store import page_messages
+from core.projections import get_fields
+from core.session_analytics import message_counts
+from core.session_index import InvalidCursor, list_session_index
 import logging
 
 # Configure logging
@@ -9,15 +14,24 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/")
-async def get_all_history(user=Depends(get_current_user)):
+async def get_all_history(
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Maximum sessions to return (all if omitted)"),
+    cursor: Optional[str] = Query(None, description="session_id of the last session already received"),
+    user=Depends(get_current_user)
+):
     """
     Get all session history for the current user, including message counts.
     
+    Served from the per-user session index, so the listing is a single query
+    over small documents. Pass ``limit`` and then the returned ``next_cursor``
+    as ``cursor`` to page through long histories; a cursor that is not one of
+    the user's sessions is rejected with 400.
+    
     Returns:
         List of sessions with session_id, created_at, status, and message_count
     """
     try:
-        if db is None:
+        if not db:
             logger.warning("Database not available - returning mock history")
             return {
                 "history": [
@@ -39,58 +53,54 @@ async def get_all_history(user=Depends(get_current_user)):
                 "status": "development_mode"
             }
         
-        # Get all sessions for the user
-        sessions_query = db.collection("sessions").where("user_id", "==", user["uid"])
-        sessions = list(sessions_query.stream())
-        
-        history = []
-        for session_doc in sessions:
-            session_id = session_doc.id
-            session_data = session_doc.to_dict()
-            
-            if not session_data:
-                continue
-                
-            messages = session_data.get("messages", [])
-            total_message_count = len(messages)
-            user_message_count = len([m for m in messages if m.get("role") == "user"])
-            
-            # Check if session is summarized
-            summary_doc = db.collection("session_summaries").document(session_id).get()
-            status = "summarized" if summary_doc.exists else "open"
-            
-            history.append({
-                "session_id": session_id,
-                "created_at": str(session_data.get("created_at", "")),
-                "status": status,
-                "message_count": total_message_count,
-                "user_message_count": user_message_count
-            })
+        try:
+            entries, next_cursor = await list_session_index(user["uid"], limit, cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        # Sort by creation date (newest first)
-        history.sort(key=lambda x: x.get("created_at", ""), reverse=True)
+        history = [
+            {
+                "session_id": entry["session_id"],
+                "created_at": str(entry.get("created_at", "")),
+                "status": "summarized" if entry.get("summarized") else "open",
+                "message_count": entry.get("message_count", 0),
+                "user_message_count": entry.get("user_message_count", 0)
+            }
+            for entry in entries
+        ]
         
         logger.info(f"Retrieved history for user {user.get('uid')}: {len(history)} sessions")
         return {
             "history": history,
             "total_sessions": len(history),
+            "next_cursor": next_cursor,
             "status": "success"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving history: {e}")
         return {"error": str(e), "status": "error"}
 
 @router.get("/session")
-async def get_session_history(session_id: str, user=Depends(get_current_user)):
+async def get_session_history(
+    session_id: str,
+    cursor: Optional[int] = Query(None, description="Sequence number of the last message already received"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Maximum messages to return (all if omitted)"),
+    user=Depends(get_current_user)
+):
     """
     Get detailed history for a specific session, including message counts and breakdown.
     
+    Messages can be paged: pass ``limit`` and then the returned ``next_cursor``
+    as ``cursor`` until ``next_cursor`` is null.
+    
     Returns:
-        Session details with full message history, counts, and analysis
+        Session details with the requested page of message history, counts, and analysis
     """
     try:
-        if db is None:
+        if not db:
             logger.warning("Database not available - returning mock session history")
             return {
                 "session_id": session_id,
@@ -106,7 +116,7 @@ async def get_session_history(session_id: str, user=Depends(get_current_user)):
                 "status": "development_mode"
             }
         
-        session_ref = db.collection("sessions").document(session_id).get()
+        session_ref = await db.collection("sessions").document(session_id).get()
         if not session_ref.exists:
             return {"error": "Session not found"}
         
@@ -118,13 +128,11 @@ async def get_session_history(session_id: str, user=Depends(get_current_user)):
         if session_data.get("user_id") != user["uid"]:
             return {"error": "Access denied to this session"}
         
-        messages = session_data.get("messages", [])
-        total_message_count = len(messages)
-        user_message_count = len([m for m in messages if m.get("role") == "user"])
-        ai_message_count = len([m for m in messages if m.get("role") == "generated"])
+        messages, next_cursor = await page_messages(session_ref.reference, session_data, cursor, limit)
+        total_message_count, user_message_count, ai_message_count = message_counts(session_data)
         
         # Check if session is summarized
-        summary_doc = db.collection("session_summaries").document(session_id).get()
+        summary_doc = await get_fields(db.collection("session_summaries").document(session_id), "history_summary")
         status = "summarized" if summary_doc.exists else "open"
         
         # Get summary info if available
@@ -145,7 +153,8 @@ async def get_session_history(session_id: str, user=Depends(get_current_user)):
             "message_count": total_message_count,
             "user_message_count": user_message_count,
             "ai_message_count": ai_message_count,
-            "history": messages
+            "history": messages,
+            "next_cursor": next_cursor
         }
         
         # Add summary info if available
@@ -19,17 +19,43 @@ Endpoints:
 - POST /session/ - Create new therapy session
 - POST /session/message - Add message to existing session
 - POST /session/generate-question - Get AI follow-up question
-- POST /session/close - Close session with analysis
+- POST /session/generate-question/stream - Stream the AI follow-up question (SSE or chunked text)
+- POST /session/close - Close session with analysis (queued as a background job)
+- GET /session/close/status/{job_id} - Poll a close job
 """
 
-import statistics
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from models.schemas import Message
-from core.firebase import db
-from core.genkit_gemini import generate_followup_question, summarize_text_flow, analyze_goals_from_session, generate_contextual_followup_question
-from google.cloud.firestore_v1 import ArrayUnion
+from core.repository import collect, db, run_transaction
+from core.genkit_gemini import generate_followup_question, summarize_text_flow, analyze_goals_from_session, generate_contextual_followup_question, stream_contextual_followup_question, StreamInterrupted, cache_stats, coalescing_stats, executor_stats, streaming_stats
 from core.auth import get_current_user
+from core.config import settings
+from core.cache import MISSING, LRUCache, SQLiteCache, TieredCache
+from core.activity import ACTIVITY_FIELD, DAY_FIELD, local_day, record_activity, resolve_timezone
+from core.context_builder import build_context
+from core.daily_stats import record_session
+from core.goal_tracking import save_goals
+from core.projections import fields, get_fields, project
+from core.jobs import job_queue, register_handler
+from core.metrics import registry
+from core.session_analytics import session_analytics
+from core.session_index import index_entry, index_ref
+from core.singleflight import SingleFlight
+from core.summary_index import EMBEDDING_FIELD, SummaryIndex, embed_text
+from core.user_rollup import USER_SUMMARIES, reopen_session, save_close
+from core.message_store import (
+    append_messages,
+    count_available,
+    load_messages,
+    message_count,
+    new_session_fields,
+    page_messages,
+)
 from datetime import datetime
 import logging
 
@@ -39,134 +65,37 @@ logger = logging.getLogger(__name__)
 # Initialize FastAPI router for session endpoints
 router = APIRouter()
 
-def analyze_messages(messages: List[dict]) -> Dict[str, Any]:
-    """
-    Analyze conversation messages for emotional patterns and intensity.
-    
-    This function processes conversation messages to understand the emotional landscape
-    from the actual text content using comprehensive keyword analysis.
-    
-    Args:
-        messages (List[dict]): List of message objects from the session
-        
-    Returns:
-        Dict[str, Any]: Analytics containing:
-            - emotion_percentages: All emotions as percentages that sum to 1.0
-            - avg_intensity: Average emotional intensity (0-10 scale)
-            - message_analysis: Breakdown of analysis
-    """
-    logger.info(f"Analyzing {len(messages)} messages for emotional insights")
-    
-    # Define comprehensive emotion keywords - all emotions you requested
-    emotion_keywords = {
-        "anxiety": ["anxious", "worried", "nervous", "stress", "panic", "fear", "scared", "overwhelmed", "tense", "uneasy"],
-        "happy": ["happy", "joy", "joyful", "excited", "great", "wonderful", "amazing", "fantastic", "thrilled", "cheerful", "delighted"],
-        "sad": ["sad", "depressed", "down", "unhappy", "miserable", "tearful", "crying", "grieving", "heartbroken", "melancholy"],
-        "disgust": ["disgusted", "grossed out", "revolted", "sickened", "repulsed", "appalled", "nauseated"],
-        "fear": ["afraid", "terrified", "frightened", "scared", "fearful", "petrified", "alarmed", "spooked"],
-        "anger": ["angry", "mad", "furious", "irritated", "frustrated", "rage", "annoyed", "livid", "pissed", "heated"],
-        "envy": ["envious", "jealous", "resentful", "covet", "bitter", "green with envy", "wish I had"],
-        "embarrassment": ["embarrassed", "ashamed", "humiliated", "mortified", "awkward", "self-conscious", "uncomfortable"],
-        "content": ["content", "satisfied", "peaceful", "calm", "serene", "comfortable", "at ease", "relaxed"],
-        "relief": ["relieved", "grateful", "thankful", "better", "freed", "unburdened", "lifted weight"]
-    }
-    
-    # Initialize all emotions with 0 count to ensure they all appear in results
-    emotion_counts = {
-        "anxiety": 0, "happy": 0, "sad": 0, "disgust": 0, "fear": 0,
-        "anger": 0, "envy": 0, "embarrassment": 0, "content": 0, "relief": 0
-    }
-    
-    intensities = []
-    user_messages = [m for m in messages if m.get("role") == "user"]
-    
-    logger.info(f"Analyzing {len(user_messages)} user messages out of {len(messages)} total messages")
-    
-    for message in user_messages:
-        text = message.get("text", "").lower()
-        
-        if not text.strip():
-            continue
-            
-        # Calculate basic intensity based on text characteristics
-        intensity = 5  # Base intensity
-        
-        # Adjust intensity based on text features
-        if "!" in text:
-            intensity += 1
-        if "?" in text:
-            intensity += 0.5
-        if any(word in text for word in ["very", "extremely", "really", "so", "too"]):
-            intensity += 1
-        if len(text) > 100:  # Longer messages might indicate more emotional content
-            intensity += 0.5
-        
-        # Cap intensity at 10
-        intensity = min(10, intensity)
-        intensities.append(intensity)
-        
-        # Analyze emotion keywords - each message can contribute to multiple emotions
-        for emotion, keywords in emotion_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                emotion_counts[emotion] += 1
-    
-    # Calculate average intensity
-    avg_intensity = statistics.mean(intensities) if intensities else 5.0
-    
-    # Convert counts to percentages that sum to 1.0
-    total_emotions = sum(emotion_counts.values())
-    
-    if total_emotions == 0:
-        # If no emotions detected, distribute evenly with slight bias toward content
-        emotion_percentages = {
-            "anxiety": 0.05, "happy": 0.10, "sad": 0.05, "disgust": 0.05, "fear": 0.05,
-            "anger": 0.05, "envy": 0.05, "embarrassment": 0.05, "content": 0.50, "relief": 0.05
-        }
-    else:
-        # Calculate percentages based on detected emotions
-        emotion_percentages = {
-            emotion: round(count / total_emotions, 3) for emotion, count in emotion_counts.items()
-        }
-        
-        # Ensure they sum to exactly 1.0 by adjusting the largest percentage if needed
-        current_sum = sum(emotion_percentages.values())
-        if current_sum != 1.0:
-            # Find the emotion with the highest percentage and adjust
-            max_emotion = max(emotion_percentages.keys(), key=lambda k: emotion_percentages[k])
-            emotion_percentages[max_emotion] += round(1.0 - current_sum, 3)
-    
-    analytics = {
-        "emotion_percentages": emotion_percentages,
-        "emotion_counts": emotion_counts,  # Keep raw counts for debugging
-        "avg_intensity": round(avg_intensity, 2),
-        "message_analysis": {
-            "total_messages": len(messages),
-            "user_messages": len(user_messages),
-            "analyzed_messages": len([m for m in user_messages if m.get("text", "").strip()]),
-            "avg_message_length": round(sum(len(m.get("text", "")) for m in user_messages) / len(user_messages), 2) if user_messages else 0
-        }
-    }
-    
-    # Verify percentages sum to 1.0
-    percentage_sum = sum(emotion_percentages.values())
-    logger.info(f"Session analysis complete: {len([k for k, v in emotion_counts.items() if v > 0])} emotions detected, avg intensity {avg_intensity:.2f}, percentages sum: {percentage_sum}")
-    return analytics
+# Background job kind that runs session close post-processing
+CLOSE_JOB = "close_session"
+
+# Close processing time per stage (and "total"), to tell Gemini from Firestore time
+CLOSE_STAGE_DURATION = registry.histogram("session_close_stage_seconds", "Session close time by stage and status",
+                                          ("stage", "status"))
+
+# Concurrent generate-question requests for the same session state (retries,
+# double taps) share one generation and add a single message
+question_flights = SingleFlight()
 
-async def track_goals_from_session(session_id: str, messages: List[dict], user_id: str):
+async def track_goals_from_session(session_id: str, messages: List[dict], user_id: str, raise_errors: bool = False):
     """
     Automatically track and update goals based on session content using AI analysis.
     
     This function:
     1. Uses AI to identify goals mentioned in the session
     2. Checks against existing goals in the database
-    3. Creates new goals or updates existing ones
+    3. Creates new goals or updates existing ones, in a single transaction
     4. Tracks goal progress through the lifecycle: imagined → started → done → abandoned
+    
+    Re-running it for the same session is idempotent (see ``core.goal_tracking``).
+    
+    With ``raise_errors`` failures propagate instead of being reported in the
+    result, so a background close job can retry them.
     """
     logger.info(f"Analyzing session {session_id} for goal tracking")
     
     try:
         # Use AI to analyze the session for goals
-        goal_analysis = await analyze_goals_from_session(messages)
+        goal_analysis = await analyze_goals_from_session(messages, raise_errors=raise_errors)
         detected_goals = goal_analysis.get("goals", [])
         
         if not detected_goals:
@@ -175,79 +104,12 @@ async def track_goals_from_session(session_id: str, messages: List[dict], user_i
         
         logger.info(f"Detected {len(detected_goals)} goals in session {session_id}")
         
-        # Get existing goals for the user
-        existing_goals_query = db.collection("goals").where("user_id", "==", user_id)
-        existing_goals_docs = list(existing_goals_query.stream())
-        existing_goals = {doc.id: doc.to_dict() for doc in existing_goals_docs}
-        
-        new_goals_count = 0
-        updated_goals_count = 0
-        
-        for detected_goal in detected_goals:
-            goal_text = detected_goal.get("goal", "").lower().strip()
-            if not goal_text or detected_goal.get("confidence", 0) < 0.6:
-                continue  # Skip low-confidence goals
-            
-            # Check if this goal already exists (fuzzy matching)
-            existing_goal_id = None
-            for goal_id, goal_data in existing_goals.items():
-                existing_text = goal_data.get("goal", "").lower().strip()
-                # Simple similarity check - could be enhanced with more sophisticated matching
-                if goal_text in existing_text or existing_text in goal_text or \
-                   len(set(goal_text.split()) & set(existing_text.split())) >= 2:
-                    existing_goal_id = goal_id
-                    break
-            
-            current_time = datetime.now().isoformat()
-            
-            if existing_goal_id:
-                # Update existing goal
-                existing_goal = existing_goals[existing_goal_id]
-                goal_ref = db.collection("goals").document(existing_goal_id)
-                
-                # Update status if it has progressed
-                current_status = existing_goal.get("status", "imagined")
-                new_status = detected_goal.get("status", "imagined")
-                
-                # Only allow forward progression or to abandoned
-                status_order = {"imagined": 0, "started": 1, "done": 2}
-                should_update_status = (new_status == "abandoned" or 
-                                      status_order.get(new_status, 0) > status_order.get(current_status, 0))
-                
-                update_data = {
-                    "last_mentioned": current_time,
-                    "session_mentions": existing_goal.get("session_mentions", []) + [session_id]
-                }
-                
-                if should_update_status:
-                    update_data["status"] = new_status
-                    logger.info(f"Updated goal status from {current_status} to {new_status}: {goal_text}")
-                
-                goal_ref.update(update_data)
-                updated_goals_count += 1
-                
-            else:
-                # Create new goal
-                goal_ref = db.collection("goals").document()
-                goal_data = {
-                    "user_id": user_id,
-                    "goal": detected_goal.get("goal", ""),
-                    "status": detected_goal.get("status", "imagined"),
-                    "created_at": current_time,
-                    "last_mentioned": current_time,
-                    "session_mentions": [session_id],
-                    "confidence_score": detected_goal.get("confidence", 0.0),
-                    "category": detected_goal.get("category", "other")
-                }
-                
-                goal_ref.set(goal_data)
-                new_goals_count += 1
-                logger.info(f"Created new goal ({detected_goal.get('status')}): {goal_text}")
+        # Match against the user's goals and write every change in one transaction
+        counts = await save_goals(session_id, user_id, detected_goals)
         
         result = {
             "goals_processed": len(detected_goals),
-            "new_goals": new_goals_count,
-            "updated_goals": updated_goals_count
+            **counts
         }
         
         logger.info(f"Goal tracking complete for session {session_id}: {result}")
@@ -255,76 +117,183 @@ async def track_goals_from_session(session_id: str, messages: List[dict], user_i
         
     except Exception as e:
         logger.error(f"Error tracking goals from session {session_id}: {e}")
+        if raise_errors:
+            raise
         return {"goals_processed": 0, "new_goals": 0, "updated_goals": 0, "error": str(e)}
+    finally:
+        # Goals may have changed
+        await invalidate_user_context(user_id)
+
+# Per-user goals behind the historical context, and each user's summary
+# similarity index (in-process only, as it holds NumPy arrays). Tracking goals
+# invalidates the goals; closing and reopening a session add or remove one
+# summary in the loaded index. After the TTL, goals are re-read and an index is
+# synced with a listing of the stored summaries, which bounds staleness from
+# changes made by other processes
+context_cache = TieredCache(
+    LRUCache(settings.context_cache_max_entries, ttl=settings.context_cache_ttl),
+    SQLiteCache(settings.context_cache_path, ttl=settings.context_cache_ttl)
+    if settings.context_cache_path else None
+)
+summary_indexes = LRUCache(settings.context_cache_max_entries, max_bytes=settings.summary_index_max_bytes,
+                           sizeof=lambda index: index.nbytes)
+registry.watch_cache("user_context", context_cache.stats)
+registry.watch_cache("summary_index", summary_indexes.stats)
+
+def _context_key(user_id: str) -> str:
+    return f"user_context:{user_id}"
+
+async def invalidate_user_context(user_id: str) -> None:
+    """Drop a user's cached goals after they change."""
+    await context_cache.delete(_context_key(user_id))
+
+def index_summary(user_id: str, session_id: str, session_summary: Optional[Dict[str, Any]]) -> None:
+    """
+    Add a stored session summary to the user's loaded summary index, or remove
+    it (``session_summary`` None, when the session is reopened).
+    """
+    key = _context_key(user_id)
+    index = summary_indexes.peek(key)
+    if index is MISSING:
+        return  # Not loaded in this process; the next question loads it
+    if session_summary is None:
+        index.remove(session_id)
+    else:
+        index.add(session_id, session_summary, limit=settings.summary_retrieval_max_sessions)
+    # Re-store so the cache accounts for the index's new size
+    summary_indexes.set(key, index)
+
+async def _user_context(user_id: str) -> Dict[str, Any]:
+    """Active goals for a user, from the cache when possible."""
+    key = _context_key(user_id)
+    if settings.context_cache_enabled:
+        cached = await context_cache.get(key)
+        if cached is not MISSING:
+            return cached
+    
+    # Get recent active goals for context
+    goals_query = db.collection("goals")\
+        .where("user_id", "==", user_id)\
+        .where("status", "in", ["started", "imagined"])\
+        .order_by("last_mentioned", direction="DESCENDING")\
+        .limit(3)
+    goals_docs = await collect(project(goals_query, "context_goals"))
+    
+    goals = []
+    for goal_doc in goals_docs:
+        goal_data = goal_doc.to_dict()
+        if goal_data:
+            goals.append({
+                "goal": goal_data.get("goal", ""),
+                "status": goal_data.get("status", ""),
+                "category": goal_data.get("category", "")
+            })
+    
+    user_context = {"goals": goals}
+    if settings.context_cache_enabled:
+        await context_cache.set(key, user_context)
+    return user_context
+
+def _summaries_query(user_id: str):
+    # Using summaries ensures privacy and efficiency
+    return db.collection("session_summaries")\
+        .where("user_id", "==", user_id)\
+        .order_by("created_at", direction="DESCENDING")\
+        .limit(settings.summary_retrieval_max_sessions)
+
+async def _summary_index(user_id: str) -> SummaryIndex:
+    """
+    Similarity index over the user's latest session summaries, from the cache when possible.
+    
+    A cached index older than the context TTL is synced instead of reloaded:
+    the summaries are listed without their text and embeddings, and only
+    those not indexed yet are read in full.
+    """
+    key = _context_key(user_id)
+    if not settings.context_cache_enabled:
+        return SummaryIndex.from_docs(await collect(project(_summaries_query(user_id), "context_summaries")))
+    
+    index = summary_indexes.get(key)
+    if index is MISSING:
+        index = SummaryIndex.from_docs(await collect(project(_summaries_query(user_id), "context_summaries")))
+    elif time.monotonic() - index.synced_at >= settings.context_cache_ttl:
+        session_ids = [doc.id for doc in await collect(project(_summaries_query(user_id), "summary_listing"))]
+        indexed = {entry["session_id"] for entry in index.entries}
+        refs = [db.collection("session_summaries").document(session_id)
+                for session_id in session_ids if session_id not in indexed]
+        docs = [doc async for doc in db.get_all(refs, field_paths=fields("context_summaries"))] if refs else []
+        index.sync(session_ids, [doc for doc in docs if doc.exists])
+    else:
+        return index
+    summary_indexes.set(key, index)
+    return index
+
+def _conversation_tail(messages: List[dict]) -> str:
+    """Text of the user's latest messages, which say what the conversation is about now."""
+    tail = messages[-settings.summary_retrieval_tail:]
+    user_texts = [m.get("text", "") for m in tail if m.get("role") == "user"]
+    return " ".join(user_texts or [m.get("text", "") for m in tail])
+
+def related_summaries(index: SummaryIndex, current_session_id: str, current_messages: List[dict],
+                      limit: int = 2) -> List[Tuple[Dict[str, Any], bool]]:
+    """
+    Pick the past session summaries to show as historical context.
+    
+    Summaries most similar to the conversation tail come first; remaining
+    places go to the most recent sessions.
+    
+    Returns:
+        List[Tuple[Dict[str, Any], bool]]: (summary entry, whether it was
+            retrieved by similarity) pairs
+    """
+    related = index.top_k(_conversation_tail(current_messages), limit, exclude={current_session_id},
+                          min_score=settings.summary_retrieval_min_score)
+    chosen = [(entry, True) for entry, _ in related]
+    chosen_ids = {entry["session_id"] for entry, _ in related} | {current_session_id}
+    for entry in index.entries:
+        if len(chosen) >= limit:
+            break
+        if entry["session_id"] not in chosen_ids:
+            chosen.append((entry, False))
+    return chosen
 
 async def get_relevant_session_context(user_id: str, current_session_id: str, current_messages: List[dict]) -> dict:
     """
     Get relevant context from previous session SUMMARIES ONLY to inform question generation.
     
     This function:
-    1. Retrieves recent session summaries (NOT full messages)
+    1. Retrieves the session summaries (NOT full messages) most related to the
+       current conversation, topped up with the most recent ones
     2. Gets active user goals for context
     3. Returns concise historical context for question generation
     
     Privacy-focused: Only uses processed summaries, never raw messages from previous sessions.
+    The summary index and goals are cached per user (see ``summary_indexes`` and ``context_cache``).
     """
     try:
-        # Get recent session summaries (last 3 sessions, excluding current)
-        # Using summaries ensures privacy and efficiency
-        summaries_query = db.collection("session_summaries")\
-            .where("user_id", "==", user_id)\
-            .order_by("created_at", direction="DESCENDING")\
-            .limit(3)
-        
-        summaries = list(summaries_query.stream())
-        recent_summaries = []
-        
-        for summary_doc in summaries:
-            if summary_doc.id == current_session_id:
-                continue  # Skip current session
-            summary_data = summary_doc.to_dict()
-            if summary_data and summary_data.get("summary"):
-                # Only store the summary text, not full session data
-                summary_text = summary_data.get("summary", "").strip()
-                if summary_text:
-                    recent_summaries.append({
-                        "summary": summary_text[:200],  # Limit length to keep context focused
-                        "session_date": summary_data.get("created_at")
-                    })
-        
-        # Get recent active goals for context
-        goals_query = db.collection("goals")\
-            .where("user_id", "==", user_id)\
-            .where("status", "in", ["started", "imagined"])\
-            .order_by("last_mentioned", direction="DESCENDING")\
-            .limit(3)
-        
-        recent_goals = []
-        goals_docs = list(goals_query.stream())
-        for goal_doc in goals_docs:
-            goal_data = goal_doc.to_dict()
-            if goal_data:
-                recent_goals.append({
-                    "goal": goal_data.get("goal", ""),
-                    "status": goal_data.get("status", ""),
-                    "category": goal_data.get("category", "")
-                })
+        user_context, index = await asyncio.gather(_user_context(user_id), _summary_index(user_id))
+        chosen = related_summaries(index, current_session_id, current_messages)
+        recent_summaries = [
+            {"summary": summary["summary"], "session_date": summary["session_date"]}
+            for summary, _ in chosen
+        ]
+        recent_goals = user_context["goals"]
         
         # Create brief historical context from summaries only
         historical_context = ""
-        if recent_summaries:
-            # Combine the most recent 1-2 summaries into brief context
+        if chosen:
             context_parts = []
-            for i, summary_data in enumerate(recent_summaries[:2]):
+            for i, (summary_data, related) in enumerate(chosen):
                 summary_text = summary_data["summary"]
                 # Keep each summary very brief for context
                 brief_summary = summary_text[:100] + "..." if len(summary_text) > 100 else summary_text
-                context_parts.append(f"Recent session {i+1}: {brief_summary}")
+                label = "Related session" if related else "Recent session"
+                context_parts.append(f"{label} {i+1}: {brief_summary}")
             
             historical_context = " | ".join(context_parts)
         
         context = {
-            "session_summaries": recent_summaries[:2],  # Most recent 2 summaries
+            "session_summaries": recent_summaries,  # At most 2 summaries
             "recent_goals": recent_goals,
             "historical_context": historical_context
         }
@@ -336,88 +305,223 @@ async def get_relevant_session_context(user_id: str, current_session_id: str, cu
         logger.error(f"Error getting session context: {e}")
         return {"session_summaries": [], "recent_goals": [], "historical_context": ""}
 
-async def summarize_text(messages: List[dict]):
+async def summarize_text(messages: List[dict], raise_errors: bool = False):
     # Use Gemini to summarize the session
     context = "\n".join([m["text"] for m in messages if "text" in m])
-    return await summarize_text_flow(context)
+    return await summarize_text_flow(context, raise_errors=raise_errors)
 
-@router.post("/close")
-async def close_session(session_id: str, user=Depends(get_current_user)):
+async def _run_stage(name: str, awaitable, timeout: Optional[float], fallback: Any,
+                     timings: Dict[str, Any]) -> Any:
+    """
+    Await one close stage with a timeout, recording its duration and outcome.
+    
+    A stage that times out or fails yields ``fallback`` instead of raising, so
+    the remaining stages still produce a (partial) result.
+    """
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(awaitable, timeout)
+        status = "ok"
+    except asyncio.TimeoutError:
+        logger.warning(f"Close stage '{name}' timed out after {timeout}s")
+        result, status = fallback, "timeout"
+    except Exception as e:
+        logger.error(f"Close stage '{name}' failed: {e}")
+        result, status = fallback, "error"
+    timings[name] = {"status": status, "duration_ms": _elapsed_ms(start)}
+    return result
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+def _observe_close(timings: Dict[str, Any], total_ms: float, status: str) -> None:
+    for name, stage in timings.items():
+        CLOSE_STAGE_DURATION.labels(name, stage["status"]).observe(stage["duration_ms"] / 1000)
+    CLOSE_STAGE_DURATION.labels("total", status).observe(total_ms / 1000)
+
+async def _previous_overall_summary(user_id: str) -> str:
+    """The user's current overall summary text (a single document read)."""
+    snapshot = await get_fields(db.collection(USER_SUMMARIES).document(user_id), "overall_summary")
+    return (snapshot.to_dict() or {}).get("overall_summary", "") if snapshot.exists else ""
+
+async def _summarize_session(user_id: str, messages: List[dict], timings: Dict[str, Any],
+                             raise_errors: bool) -> Tuple[str, Optional[str]]:
+    """
+    Summarize the session, then fold it into the user's overall summary.
+    
+    The session summary and the read of the previous overall summary run
+    concurrently. The overall summary is rolled forward from the previous one
+    and this session's summary, so its prompt does not grow with the number of
+    sessions.
+    
+    Returns:
+        Tuple[str, Optional[str]]: Session summary ("" if unavailable) and the
+            overall summary (None if unavailable)
+    """
+    summary, previous_overall = await asyncio.gather(
+        _run_stage("summary", summarize_text(messages, raise_errors), settings.close_summary_timeout, "", timings),
+        _run_stage("previous_overall_summary", _previous_overall_summary(user_id), None, None, timings),
+    )
+    if previous_overall is None:
+        # Rolling forward from nothing would discard the user's history
+        return summary, None
+    
+    overall_summary = await _run_stage("overall_summary", _overall_summary([previous_overall, summary], raise_errors),
+                                       settings.close_overall_summary_timeout, None, timings)
+    return summary, overall_summary
+
+async def _overall_summary(summary_texts: List[str], raise_errors: bool) -> str:
+    overall_text = "\n".join([text for text in summary_texts if text])
+    return await summarize_text([{"text": overall_text}], raise_errors) if overall_text else ""
+
+@router.post("/close", status_code=202)
+async def close_session(session_id: str, response: Response, user=Depends(get_current_user)):
+    """
+    Close a session by queueing its summarization as a background job.
+    
+    Returns ``202`` with a job id right away; poll ``/session/close/status/{job_id}``
+    for the result. Closing a session that already has a queued or running
+    close job returns that job instead of starting another.
+    """
     session_ref = db.collection("sessions").document(session_id)
-    session = session_ref.get()
+    session = await get_fields(session_ref, "close_session")
     if not session.exists:
         raise HTTPException(status_code=404, detail="Session not found")
     session_data = session.to_dict()
+    if session_data is not None and not count_available(session_data):
+        # Array-layout session from before running analytics: count the messages
+        session_data = (await session_ref.get()).to_dict()
     if not session_data:
         raise HTTPException(status_code=404, detail="Session data not found")
-    messages = session_data.get("messages", [])
     # Only summarize if session is long enough (e.g., 5+ messages)
-    if len(messages) < 5:
+    if message_count(session_data) < 5:
+        response.status_code = 200
         return {"status": "not summarized", "reason": "Session too short"}
-    summary = await summarize_text(messages)
-    analytics = analyze_messages(messages)
     
-    # Track goals from this session
-    goal_tracking_result = await track_goals_from_session(session_id, messages, user["uid"])
+    job = await job_queue.enqueue(CLOSE_JOB, {"session_id": session_id, "user_id": user["uid"]},
+                                  dedupe_key=session_id)
+    logger.info(f"Queued close job {job['job_id']} for session {session_id} ({job['status']})")
+    return {
+        "status": job["status"],
+        "job_id": job["job_id"],
+        "session_id": session_id,
+        "status_url": f"/session/close/status/{job['job_id']}"
+    }
+
+@router.get("/close/status/{job_id}")
+async def close_status(job_id: str, user=Depends(get_current_user)):
+    """
+    Get the state of a session close job.
+    
+    ``status`` is one of queued, running, succeeded or failed; ``result`` holds
+    the summary, analytics, goal tracking and per-stage timing once succeeded.
+    """
+    job = await job_queue.get(job_id)
+    if not job or job["kind"] != CLOSE_JOB or job["payload"].get("user_id") != user["uid"]:
+        raise HTTPException(status_code=404, detail="Close job not found")
+    return {
+        "job_id": job_id,
+        "session_id": job["payload"]["session_id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": datetime.fromtimestamp(job["created_at"]).isoformat(),
+        "updated_at": datetime.fromtimestamp(job["updated_at"]).isoformat()
+    }
+
+async def process_close(payload: Dict[str, Any], final_attempt: bool = True) -> Dict[str, Any]:
+    """
+    Summarize a session, track its goals and refresh the user's overall summary.
+    
+    Runs as the ``close_session`` background job. The session summary, goal
+    analysis and the read of the previous overall summary run concurrently,
+    each bounded by its own timeout; the overall summary is generated once the
+    session summary is ready, and the user's numeric analytics are updated
+    incrementally (see ``core.user_rollup``). If a stage times out or Gemini fails, the job raises so
+    it is retried; on the final attempt the partial result is stored instead
+    and flagged ``partial``.
+    
+    Args:
+        payload (Dict[str, Any]): ``session_id`` and ``user_id``
+        final_attempt (bool): Whether a partial result should be accepted
     
-    # Store summary and analytics in a separate collection
-    db.collection("session_summaries").document(session_id).set({
+    Returns:
+        Dict[str, Any]: The close result reported by the status endpoint
+    """
+    close_start = time.perf_counter()
+    session_id, user_id = payload["session_id"], payload["user_id"]
+    session_ref = db.collection("sessions").document(session_id)
+    session = await session_ref.get()
+    session_data = session.to_dict() if session.exists else None
+    if not session_data:
+        return {"status": "not summarized", "reason": "Session not found"}
+    messages = await load_messages(session_ref, session_data)
+    
+    # Local analytics come from the running state and need no stage of their own
+    timings: Dict[str, Any] = {}
+    analytics_start = time.perf_counter()
+    analytics = session_analytics(session_data)
+    timings["analytics"] = {"status": "ok", "duration_ms": _elapsed_ms(analytics_start)}
+    
+    # Goal analysis runs alongside the summary chain; the overall summary only
+    # needs the session summary, not the goals
+    raise_errors = not final_attempt
+    (summary, overall_summary), goal_tracking_result = await asyncio.gather(
+        _summarize_session(user_id, messages, timings, raise_errors),
+        _run_stage("goals", track_goals_from_session(session_id, messages, user_id, raise_errors),
+                   settings.close_goals_timeout,
+                   {"goals_processed": 0, "new_goals": 0, "updated_goals": 0, "error": "unavailable"}, timings),
+    )
+    
+    failed = [name for name, stage in timings.items() if stage["status"] != "ok"]
+    if failed and not final_attempt:
+        # Nothing is stored yet; the job queue retries the whole close with backoff
+        _observe_close(timings, _elapsed_ms(close_start), "retry")
+        raise RuntimeError(f"Close stages incomplete for session {session_id}: {', '.join(failed)}")
+    
+    session_summary = {
         "session_id": session_id,
-        "user_id": user["uid"],
+        "user_id": user_id,
         "summary": summary,
         "analytics": analytics,
         "goal_tracking": goal_tracking_result,
         "created_at": session_data.get("created_at") if session_data else None
-    })
-    # Update overall summary for the user
-    # Fetch all summaries for this user
-    summaries = db.collection("session_summaries").where("user_id", "==", user["uid"]).stream()
-    all_summaries = [s.to_dict() for s in summaries]
-    overall_text = "\n".join([s.get("summary", "") for s in all_summaries if s.get("summary")])
-    overall_summary = await summarize_text([{"text": overall_text}]) if overall_text else ""
-    
-    # Average analytics
-    all_intensities = [s["analytics"]["avg_intensity"] for s in all_summaries if s.get("analytics") and "avg_intensity" in s["analytics"]]
-    avg_intensity = statistics.mean(all_intensities) if all_intensities else 0
-    
-    # Calculate average emotion percentages across all sessions
-    emotion_averages = {
-        "anxiety": 0, "happy": 0, "sad": 0, "disgust": 0, "fear": 0,
-        "anger": 0, "envy": 0, "embarrassment": 0, "content": 0, "relief": 0
     }
-    
-    if all_summaries:
-        # Sum up percentages from each session
-        for s in all_summaries:
-            if s.get("analytics") and "emotion_percentages" in s["analytics"]:
-                for emotion, percentage in s["analytics"]["emotion_percentages"].items():
-                    emotion_averages[emotion] += percentage
-        
-        # Average the percentages
-        num_sessions = len(all_summaries)
-        emotion_averages = {emotion: round(total / num_sessions, 3) for emotion, total in emotion_averages.items()}
-        
-        # Ensure they still sum to 1.0
-        current_sum = sum(emotion_averages.values())
-        if current_sum != 1.0 and current_sum > 0:
-            # Adjust the largest percentage to make sum exactly 1.0
-            max_emotion = max(emotion_averages.keys(), key=lambda k: emotion_averages[k])
-            emotion_averages[max_emotion] += round(1.0 - current_sum, 3)
-    
-    db.collection("user_summaries").document(user["uid"]).set({
-        "user_id": user["uid"],
-        "overall_summary": overall_summary,
-        "avg_intensity": avg_intensity,
-        "emotion_percentages": emotion_averages
-    })
+    if session_data and session_data.get(DAY_FIELD):
+        # Count the summary on the same local day as the session
+        session_summary[DAY_FIELD] = session_data[DAY_FIELD]
+    if summary:
+        # Lets question generation find this session when a later conversation is related
+        session_summary[EMBEDDING_FIELD] = embed_text(summary)
+    
+    # Store the summary, flag the index entry and update the user's running
+    # analytics in one transaction. The previous overall summary is kept when
+    # this close could not produce one.
+    store_start = time.perf_counter()
+    user_analytics = await save_close(session_summary, session_data, overall_summary)
+    index_summary(user_id, session_id, session_summary)
+    timings["store"] = {"status": "ok", "duration_ms": _elapsed_ms(store_start)}
+    
+    partial = any(stage["status"] != "ok" for stage in timings.values())
+    total_ms = _elapsed_ms(close_start)
+    _observe_close(timings, total_ms, "partial" if partial else "ok")
+    logger.info(f"Closed session {session_id} in {total_ms} ms (partial={partial}): " +
+                ", ".join(f"{name}={stage['duration_ms']}ms/{stage['status']}" for name, stage in timings.items()))
     return {
         "status": "summarized", 
         "summary": summary, 
         "analytics": analytics, 
-        "overall_summary": overall_summary,
-        "goal_tracking": goal_tracking_result
+        "overall_summary": overall_summary or "",
+        "goal_tracking": goal_tracking_result,
+        "user_analytics": user_analytics,
+        "partial": partial,
+        "stages": timings,
+        "duration_ms": total_ms
     }
 
+register_handler(CLOSE_JOB, process_close)
+
 @router.get("/summary/{session_id}")
 async def get_session_summary(session_id: str, user=Depends(get_current_user)):
     """
@@ -429,7 +533,7 @@ async def get_session_summary(session_id: str, user=Depends(get_current_user)):
     """
     # First check if session has been summarized
     summary_ref = db.collection("session_summaries").document(session_id)
-    summary_doc = summary_ref.get()
+    summary_doc = await get_fields(summary_ref, "session_summary")
     
     if summary_doc.exists:
         # Return existing summary
@@ -445,7 +549,7 @@ async def get_session_summary(session_id: str, user=Depends(get_current_user)):
     
     # If not summarized, get current session data and analyze it
     session_ref = db.collection("sessions").document(session_id)
-    session = session_ref.get()
+    session = await session_ref.get()
     
     if not session.exists:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -458,9 +562,9 @@ async def get_session_summary(session_id: str, user=Depends(get_current_user)):
     if session_data.get("user_id") != user["uid"]:
         raise HTTPException(status_code=403, detail="Access denied to this session")
     
-    messages = session_data.get("messages", [])
+    total_messages = message_count(session_data)
     
-    if len(messages) == 0:
+    if total_messages == 0:
         return {
             "session_id": session_id,
             "status": "empty",
@@ -482,12 +586,12 @@ async def get_session_summary(session_id: str, user=Depends(get_current_user)):
             "note": "Session is empty - no analysis available yet"
         }
     
-    # Generate live analysis
-    analytics = analyze_messages(messages)
+    # Live analysis from the running state maintained as messages arrive
+    analytics = session_analytics(session_data)
     
     # Generate summary if session has enough content
-    if len(messages) >= 3:
-        summary = await summarize_text(messages)
+    if total_messages >= 3:
+        summary = await summarize_text(await load_messages(session_ref, session_data))
     else:
         summary = "Session is still in progress. Not enough content for a meaningful summary yet."
     
@@ -497,90 +601,207 @@ async def get_session_summary(session_id: str, user=Depends(get_current_user)):
         "summary": summary,
         "emotion_analysis": analytics,
         "created_at": str(session_data.get("created_at", "")),
-        "message_count": len(messages),
+        "message_count": total_messages,
         "note": "Live analysis of active session - summary will be more comprehensive when session is closed"
     }
 
-@router.post("/generate-question")
-async def generate_question(session_id: str, user=Depends(get_current_user)):
-    """
-    Generate a brief therapeutic response (1-2 lines) and add it to the message history.
-    
-    This endpoint generates either a supportive statement or a concise follow-up
-    question based primarily on the current conversation, with relevant context
-    from previous sessions to maintain continuity.
-    """
+async def _load_session(session_id: str):
+    """Read a session document, raising 404 if it does not exist."""
     session_ref = db.collection("sessions").document(session_id)
-    session = session_ref.get()
+    session = await session_ref.get()
     if not session.exists:
         raise HTTPException(status_code=404, detail="Session not found")
     session_data = session.to_dict()
     if not session_data:
         raise HTTPException(status_code=404, detail="Session data not found")
+    return session_ref, session_data
+
+async def _prepare_question(session_ref, session_data: Dict[str, Any], user: Dict[str, Any]):
+    """
+    Load everything a generated response needs, reopening a summarized session.
     
-    # Check if session is summarized (exists in session_summaries)
-    summary_ref = db.collection("session_summaries").document(session_id)
-    summary_doc = summary_ref.get()
-    if summary_doc.exists:
-        # Remove the summary to "reopen" the session
-        summary_ref.delete()
+    Returns:
+        Tuple of the token-budgeted conversation context (recent turns and a
+        summary of older ones), historical context and whether the session
+        was reopened
+    """
+    session_id = session_ref.id
+    
+    # Remove the summary (and its share of the user's analytics) to "reopen" a summarized session
+    reopened = await reopen_session(session_id)
+    if reopened:
         logger.info(f"Reopened session {session_id} by removing summary")
+        index_summary(user["uid"], session_id, None)
     
-    # Get current session messages (primary focus)
-    current_history = session_data.get("messages", [])
+    # Get the most recent session messages within the token budget (primary focus)
+    conversation = await build_context(session_ref, session_data)
     
     # Get relevant context from previous sessions (secondary context)
-    historical_context = await get_relevant_session_context(user["uid"], session_id, current_history)
-    
-    # Generate response with weighted context
-    response = await generate_contextual_followup_question(current_history, historical_context)
-    
-    # Add the generated question/response to the message history
+    historical_context = await get_relevant_session_context(user["uid"], session_id, conversation["turns"])
+    return conversation, historical_context, reopened
+
+async def _save_generated(session_ref, session_data: Dict[str, Any], response: str) -> None:
+    """Add a generated question/response to the message history."""
     msg_data = {
         "text": response,
         "time": datetime.now(),
         "role": "generated"
     }
+    await append_messages(session_ref, session_data, [msg_data])
+    logger.info(f"Generated contextual question added to session {session_ref.id}: {response[:50]}...")
+
+def _used_historical_context(historical_context: dict) -> bool:
+    return len(historical_context.get("session_summaries", [])) > 0 or len(historical_context.get("recent_goals", [])) > 0
+
+@router.post("/generate-question")
+async def generate_question(session_id: str, user=Depends(get_current_user)):
+    """
+    Generate a brief therapeutic response (1-2 lines) and add it to the message history.
     
-    session_ref.update({
-        "messages": ArrayUnion([msg_data])
-    })
+    This endpoint generates either a supportive statement or a concise follow-up
+    question based primarily on the current conversation, with relevant context
+    from previous sessions to maintain continuity. Identical requests made while
+    one is being generated (same session and message count) receive its result
+    instead of adding a second response.
+    """
+    session_ref, session_data = await _load_session(session_id)
+    key = f"{session_id}:{message_count(session_data)}"
+    return await question_flights.do(key, lambda: _generate_question(session_ref, session_data, user))
+
+async def _generate_question(session_ref, session_data: Dict[str, Any], user: Dict[str, Any]) -> Dict[str, Any]:
+    conversation, historical_context, reopened = await _prepare_question(session_ref, session_data, user)
     
-    logger.info(f"Generated contextual question added to session {session_id}: {response[:50]}...")
+    # Generate response with weighted context
+    response = await generate_contextual_followup_question(
+        conversation["turns"], historical_context, conversation["summary"]
+    )
+    await _save_generated(session_ref, session_data, response)
     
     return {
         "response": response,
         "type": "therapeutic_response",
         "note": "This response prioritizes current conversation with historical context",
         "message_added": True,
-        "reopened": summary_doc.exists,
-        "used_historical_context": len(historical_context.get("session_summaries", [])) > 0 or len(historical_context.get("recent_goals", [])) > 0
+        "reopened": reopened,
+        "used_historical_context": _used_historical_context(historical_context)
     }
 
-@router.post("/")
-async def start_session(user=Depends(get_current_user)):
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/generate-question/stream")
+async def generate_question_stream(session_id: str, request: Request, user=Depends(get_current_user)):
+    """
+    Stream a generated response as Gemini produces it, then add it to the message history.
+    
+    Clients that accept ``text/event-stream`` receive Server-Sent Events:
+    ``token`` events with ``{"text": chunk}`` and a final ``done`` event with the
+    full response and timing (``ttft_ms``, time to first token since the
+    request arrived, and ``total_ms``). Other clients receive the raw text as a
+    chunked ``text/plain`` response. The message is persisted once generation
+    completes; if the client disconnects first, nothing is stored. If Gemini
+    fails mid-stream, the partial response is not stored either and SSE
+    clients receive an ``error`` event with ``"message_added": false``.
+    """
+    request_start = time.perf_counter()
+    session_ref, session_data = await _load_session(session_id)
+    conversation, historical_context, reopened = await _prepare_question(session_ref, session_data, user)
+    use_sse = "text/event-stream" in request.headers.get("accept", "")
+    
+    async def body():
+        parts: List[str] = []
+        ttft_ms = None
+        try:
+            async for text in stream_contextual_followup_question(
+                conversation["turns"], historical_context, conversation["summary"]
+            ):
+                if ttft_ms is None:
+                    ttft_ms = _elapsed_ms(request_start)
+                parts.append(text)
+                yield _sse("token", {"text": text}) if use_sse else text
+        except StreamInterrupted:
+            # The client already has part of the text; keep it out of the history
+            logger.warning(f"Streamed question for session {session_id} failed after {len(parts)} chunks; not saved")
+            if use_sse:
+                yield _sse("error", {"detail": "Response generation failed", "message_added": False})
+            return
+        
+        response = "".join(parts)
+        await _save_generated(session_ref, session_data, response)
+        total_ms = _elapsed_ms(request_start)
+        logger.info(f"Streamed question for session {session_id}: ttft={ttft_ms} ms, total={total_ms} ms")
+        if use_sse:
+            yield _sse("done", {
+                "response": response,
+                "message_added": True,
+                "reopened": reopened,
+                "used_historical_context": _used_historical_context(historical_context),
+                "ttft_ms": ttft_ms,
+                "total_ms": total_ms
+            })
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if use_sse else "text/plain; charset=utf-8",
+        # Disable proxy buffering so chunks reach the client as they are produced
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def create_session(user_id: str, timezone_name: Optional[str] = None):
+    """
+    Create a session document together with its entry in the user's session index,
+    its count in the user's daily statistics and the user's activity counters.
+    
+    Args:
+        user_id (str): Owner of the session
+        timezone_name (str, optional): IANA time zone the user's days are counted in;
+            defaults to the one the user last sent
+    
+    Returns:
+        Tuple of the new session reference and the data written to it
+    """
     session_ref = db.collection("sessions").document()
-    session_ref.set({
+    return await run_transaction(_create_session, session_ref, user_id, timezone_name)
+
+async def _create_session(transaction, session_ref, user_id: str, timezone_name: Optional[str]):
+    user_ref = db.collection(USER_SUMMARIES).document(user_id)
+    snapshot = await get_fields(user_ref, "activity", transaction=transaction)
+    activity = (snapshot.to_dict() or {}).get(ACTIVITY_FIELD) if snapshot.exists else None
+    timezone_name = resolve_timezone(timezone_name or (activity or {}).get("timezone"))
+    
+    session_data = {
         "created_at": datetime.now(),
-        "user_id": user["uid"],
-        "messages": []
-    })
+        "user_id": user_id,
+        **new_session_fields()
+    }
+    day = session_data[DAY_FIELD] = local_day(timezone_name, session_data["created_at"])
+    transaction.set(session_ref, session_data)
+    transaction.set(index_ref(user_id, session_ref.id), index_entry(session_data["created_at"]))
+    record_session(transaction, user_id, day)
+    transaction.set(user_ref, {"user_id": user_id, ACTIVITY_FIELD: record_activity(activity, day, timezone_name)},
+                    merge=True)
+    return session_ref, session_data
+
+@router.post("/")
+async def start_session(
+    timezone: Optional[str] = Query(None, description="IANA time zone of the user, e.g. Europe/Berlin"),
+    user=Depends(get_current_user)
+):
+    session_ref, _ = await create_session(user["uid"], timezone)
     return {"session_id": session_ref.id, "status": "started", "user": user}
 
 @router.post("/message")
 async def add_message(message: Message, user=Depends(get_current_user)):
     session_ref = db.collection("sessions").document(message.session_id)
-    session = session_ref.get()
+    session = await session_ref.get()
 
     if not session.exists:
         return {"error": "Session not found"}
 
-    # Check if session is summarized (exists in session_summaries)
-    summary_ref = db.collection("session_summaries").document(message.session_id)
-    summary_doc = summary_ref.get()
-    if summary_doc.exists:
-        # Remove the summary to "reopen" the session
-        summary_ref.delete()
+    # Remove the summary (and its share of the user's analytics) to "reopen" a summarized session
+    reopened = await reopen_session(message.session_id)
+    if reopened:
+        index_summary(user["uid"], message.session_id, None)
 
     # Determine the role: 'user' or 'generated'
     role = message.role if hasattr(message, 'role') else 'user'
@@ -592,10 +813,8 @@ async def add_message(message: Message, user=Depends(get_current_user)):
     if role == "user":
         msg_data["user_id"] = user["uid"]
 
-    session_ref.update({
-        "messages": ArrayUnion([msg_data])
-    })
-    return {"status": "saved", "message": message.text, "role": role, "user": user, "reopened": summary_doc.exists}
+    await append_messages(session_ref, session.to_dict() or {}, [msg_data])
+    return {"status": "saved", "message": message.text, "role": role, "user": user, "reopened": reopened}
 
 
 @router.get("/debug/sessions")
@@ -605,7 +824,7 @@ async def debug_get_all_sessions(user=Depends(get_current_user)):
     Helps with troubleshooting session creation and retrieval.
     """
     try:
-        if db is None:
+        if not db:
             return {
                 "sessions": [
                     {"session_id": "mock-session-1", "created_at": "2024-01-01", "messages": []},
@@ -614,17 +833,19 @@ async def debug_get_all_sessions(user=Depends(get_current_user)):
                 "status": "development_mode"
             }
         
+        # Dates, counts and the message arrays of array-layout sessions in one query
         sessions_query = db.collection("sessions").where("user_id", "==", user["uid"])
-        sessions = list(sessions_query.stream())
+        sessions = await collect(project(sessions_query, "debug_sessions"))
         
         session_list = []
         for session_doc in sessions:
             session_data = session_doc.to_dict()
+            first_messages, _ = await page_messages(session_doc.reference, session_data, limit=3)
             session_list.append({
                 "session_id": session_doc.id,
                 "created_at": str(session_data.get("created_at")),
-                "message_count": len(session_data.get("messages", [])),
-                "messages": session_data.get("messages", [])[:3]  # Show first 3 messages
+                "message_count": message_count(session_data),
+                "messages": first_messages  # Show first 3 messages
             })
         
         return {
@@ -646,7 +867,7 @@ async def debug_create_test_session(user=Depends(get_current_user)):
     Helps test the complete session workflow including analysis.
     """
     try:
-        if db is None:
+        if not db:
             return {
                 "session_id": "mock-test-session",
                 "messages_added": 3,
@@ -654,12 +875,7 @@ async def debug_create_test_session(user=Depends(get_current_user)):
             }
         
         # Create session
-        session_ref = db.collection("sessions").document()
-        session_ref.set({
-            "created_at": datetime.now(),
-            "user_id": user["uid"],
-            "messages": []
-        })
+        session_ref, session_data = await create_session(user["uid"])
         
         # Add test messages with specific details for AI to reference
         test_messages = [
@@ -672,10 +888,7 @@ async def debug_create_test_session(user=Depends(get_current_user)):
             {"text": "Not well. I had a panic attack yesterday during the team meeting about the project.", "time": datetime.now(), "role": "user", "user_id": user["uid"]}
         ]
         
-        for msg in test_messages:
-            session_ref.update({
-                "messages": ArrayUnion([msg])
-            })
+        await append_messages(session_ref, session_data, test_messages)
         
         return {
             "session_id": session_ref.id,
@@ -688,3 +901,52 @@ async def debug_create_test_session(user=Depends(get_current_user)):
     except Exception as e:
         logger.error(f"Error creating test session: {e}")
         return {"error": str(e), "status": "error"}
+
+
+@router.get("/debug/llm-cache")
+async def debug_llm_cache_stats(user=Depends(get_current_user)):
+    """
+    Debug endpoint reporting Gemini response cache hit/miss, eviction and size counters.
+    """
+    return {"cache": cache_stats(), "enabled": settings.llm_cache_enabled, "status": "success"}
+
+
+@router.get("/debug/streaming")
+async def debug_streaming_stats(user=Depends(get_current_user)):
+    """
+    Debug endpoint reporting time-to-first-token of recent streamed generations.
+    """
+    return {"streaming": streaming_stats(), "status": "success"}
+
+
+@router.get("/debug/llm-executor")
+async def debug_llm_executor_stats(user=Depends(get_current_user)):
+    """
+    Debug endpoint reporting Gemini call concurrency, queue depth and load shedding counters.
+    """
+    return {"executor": executor_stats(), "status": "success"}
+
+
+@router.get("/debug/coalescing")
+async def debug_coalescing_stats(user=Depends(get_current_user)):
+    """
+    Debug endpoint reporting executed vs coalesced generate-question requests and Gemini calls.
+    """
+    return {
+        "generate_question": question_flights.stats(),
+        "gemini_calls": coalescing_stats(),
+        "status": "success"
+    }
+
+
+@router.get("/debug/context-cache")
+async def debug_context_cache_stats(user=Depends(get_current_user)):
+    """
+    Debug endpoint reporting hit rate and size of the per-user historical context caches.
+    """
+    return {
+        "cache": context_cache.stats(),
+        "summary_indexes": summary_indexes.stats(),
+        "enabled": settings.context_cache_enabled,
+        "status": "success"
+    }
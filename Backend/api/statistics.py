@@ -11,12 +11,23 @@ Endpoints:
 - GET /statistics/ - General user statistics
 - GET /statistics/goals - User therapy goals
 - GET /statistics/mood-trends - Mood analysis
+
+Session statistics are read from the user's activity counters (see
+``core.activity``) in a single document read; the number of analyzed sessions
+comes from the user rollup (``core.user_rollup``), or from the daily
+aggregates for users whose rollup has not been built yet. Mood trends are served from the
+per-user daily aggregates (see ``core.daily_stats``), so their cost depends on
+the number of active days, not on how many summaries or mood entries a user has.
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from core.firebase import db
+from core.repository import collect, db
 from core.auth import get_current_user
-from datetime import datetime, timedelta
+from core.activity import ACTIVITY_FIELD, new_activity
+from core.config import settings
+from core.daily_stats import list_daily_stats
+from core.projections import get_fields, project
+from core.user_rollup import ROLLUP_FIELD, USER_SUMMARIES
 from typing import Dict, Any, List
 import logging
 
@@ -32,11 +43,12 @@ async def get_statistics(user=Depends(get_current_user)) -> Dict[str, Any]:
     Get comprehensive user statistics including session counts and activity patterns.
     
     Returns:
-        Dict containing total_sessions, consecutive_days, and activity metrics
+        Dict containing total_sessions, consecutive_days (the streak ending at
+        last_active_date), longest_streak, and activity metrics
     """
     try:
         # Check if database is available (handles dev mode gracefully)
-        if db is None:
+        if not db:
             logger.warning("Database not available - returning mock statistics for development")
             return {
                 "total_sessions": 5,
@@ -46,56 +58,25 @@ async def get_statistics(user=Depends(get_current_user)) -> Dict[str, Any]:
         
         logger.info(f"Fetching statistics for user: {user.get('uid')}")
         
-        # Get all sessions for the user
-        sessions_query = db.collection("sessions").where("user_id", "==", user["uid"])
-        sessions = list(sessions_query.stream())
-        session_list = [s.to_dict() for s in sessions]
-        total_sessions = len(session_list)
-        
-        logger.info(f"Found {total_sessions} sessions for user")
-        
-        # Calculate consecutive days with proper date handling
-        dates = []
-        for session in session_list:
-            created_at = session.get("created_at")
-            if created_at:
-                try:
-                    # Handle both datetime objects and timestamps
-                    if hasattr(created_at, 'date'):
-                        dates.append(created_at.date())
-                    elif hasattr(created_at, 'seconds'):  # Firestore timestamp
-                        date_obj = datetime.fromtimestamp(created_at.seconds)
-                        dates.append(date_obj.date())
-                    else:
-                        # Try parsing as ISO string
-                        date_obj = datetime.fromisoformat(str(created_at))
-                        dates.append(date_obj.date())
-                except Exception as e:
-                    logger.warning(f"Could not parse date {created_at}: {e}")
-                    continue
-        
-        # Remove duplicates and sort
-        unique_dates = sorted(set(dates), reverse=True)
-        consecutive = 0
-        
-        if unique_dates:
-            consecutive = 1
-            for i in range(1, len(unique_dates)):
-                if (unique_dates[i-1] - unique_dates[i]).days == 1:
-                    consecutive += 1
-                else:
-                    break
-        
-        # Get additional metrics from session summaries
-        summaries_query = db.collection("session_summaries").where("user_id", "==", user["uid"])
-        summaries = list(summaries_query.stream())
-        analyzed_sessions = len(summaries)
+        # Activity counters are kept up to date as sessions start (core.activity)
+        snapshot = await get_fields(db.collection(USER_SUMMARIES).document(user["uid"]), "statistics")
+        user_data = (snapshot.to_dict() or {}) if snapshot.exists else {}
+        activity = user_data.get(ACTIVITY_FIELD) or new_activity(settings.default_timezone)
+        rollup = user_data.get(ROLLUP_FIELD)
+        if rollup is not None:
+            analyzed_sessions = rollup.get("sessions", 0)
+        else:
+            # No close since the rollup was introduced and no rebuild yet: count
+            # summaries from the daily aggregates as before
+            analyzed_sessions = sum(day["summaries"] for day in await list_daily_stats(user["uid"]))
         
         result = {
-            "total_sessions": total_sessions,
-            "consecutive_days": consecutive,
+            "total_sessions": activity["total_sessions"],
+            "consecutive_days": activity["current_streak"],
+            "longest_streak": activity["longest_streak"],
+            "last_active_date": activity["last_active_date"],
             "analyzed_sessions": analyzed_sessions,
-            "active_dates": len(unique_dates),
+            "active_dates": activity["active_dates"],
             "status": "success"
         }
         
@@ -117,7 +98,7 @@ async def get_user_goals(user=Depends(get_current_user)) -> Dict[str, Any]:
     - Recent goal activity
     """
     try:
-        if db is None:
+        if not db:
             logger.warning("Database not available - returning mock goals for development")
             return {
                 "goals": [
@@ -144,7 +125,7 @@ async def get_user_goals(user=Depends(get_current_user)) -> Dict[str, Any]:
         logger.info(f"Fetching goals for user: {user.get('uid')}")
         
         goals_query = db.collection("goals").where("user_id", "==", user["uid"])
-        goals = list(goals_query.stream())
+        goals = await collect(project(goals_query, "goal_list"))
         goal_list = []
         
         # Organize goals by status
@@ -216,7 +197,7 @@ async def get_mood_trends(user=Depends(get_current_user)) -> Dict[str, Any]:
         Dict containing mood trends, counts, and analysis
     """
     try:
-        if db is None:
+        if not db:
             logger.warning("Database not available - returning mock mood trends for development")
             return {
                 "mood_trends": {
@@ -230,31 +211,20 @@ async def get_mood_trends(user=Depends(get_current_user)) -> Dict[str, Any]:
         
         logger.info(f"Fetching mood trends for user: {user.get('uid')}")
         
-        # Get mood data from multiple sources
+        # Mood counts from session analytics and direct mood entries, per day
+        days = await list_daily_stats(user["uid"])
         mood_counts = {}
-        
-        # 1. Direct mood entries (if any exist)
-        moods_query = db.collection("moods").where("user_id", "==", user["uid"])
-        mood_entries = list(moods_query.stream())
-        
-        for entry_doc in mood_entries:
-            entry = entry_doc.to_dict()
-            mood = entry.get("mood")
-            if mood:
-                mood_counts[mood] = mood_counts.get(mood, 0) + 1
-        
-        # 2. Mood data from session summaries (more comprehensive)
-        summaries_query = db.collection("session_summaries").where("user_id", "==", user["uid"])
-        summaries = list(summaries_query.stream())
-        
-        for summary_doc in summaries:
-            summary = summary_doc.to_dict()
-            analytics = summary.get("analytics", {})
-            session_moods = analytics.get("mood_counts", {})
-            
-            # Aggregate mood counts from session analytics
-            for mood, count in session_moods.items():
+        emotion_totals = {}
+        daily_moods = []
+        
+        for day in days:
+            for emotion, count in day["emotion_sums"].items():
+                emotion_totals[emotion] = emotion_totals.get(emotion, 0) + count
+            day_moods = {mood: count for mood, count in day["moods"].items() if count}
+            for mood, count in day_moods.items():
                 mood_counts[mood] = mood_counts.get(mood, 0) + count
+            if day_moods:
+                daily_moods.append({"date": day["date"], "moods": day_moods})
         
         # Calculate additional metrics
         total_mood_entries = sum(mood_counts.values())
@@ -265,8 +235,10 @@ async def get_mood_trends(user=Depends(get_current_user)) -> Dict[str, Any]:
             "total_entries": total_mood_entries,
             "most_common_mood": most_common_mood,
             "mood_diversity": len(mood_counts),
-            "from_sessions": len(summaries),
-            "from_direct_entries": len(mood_entries),
+            "from_sessions": sum(day["summaries"] for day in days),
+            "from_direct_entries": sum(day["mood_entries"] for day in days),
+            "emotion_totals": emotion_totals,
+            "daily_moods": daily_moods,
             "status": "success"
         }
         
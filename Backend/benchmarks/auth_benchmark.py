@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Per-request cost of Firebase ID token authentication.
+
+Generates an RSA key pair and serves its public half as the JWKS document
+(with ``Cache-Control: max-age``) through a local fetch function, then signs
+ID tokens for ``--users`` users the way Firebase does. Each user sends
+``--requests`` requests with the same token. Compared:
+
+- verify: ``core.token_verifier.TokenVerifier`` with the claims memo
+  disabled, i.e. a signature check on every request (what calling
+  ``verify_id_token`` per request costs, minus its key download handling)
+- cached: the same verifier with the claims memo, as the middleware uses it
+
+first as direct ``verify`` calls and then end to end through a minimal
+FastAPI app (``AuthMiddleware`` plus a ``get_current_user`` endpoint) against
+the same app without the middleware. Also checks that the key set was fetched
+once and that tampered and expired tokens are rejected.
+
+Run from the Backend directory (no network or Firebase project needed):
+    python benchmarks/auth_benchmark.py --users 200 --requests 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import Depends, FastAPI
+
+import core.middleware as middleware
+from core.auth import get_current_user
+from core.config import settings
+from core.middleware import AuthMiddleware
+from core.token_verifier import ISSUER_PREFIX, TokenVerificationError, TokenVerifier
+
+PROJECT = "demo-therapyapp"
+KEY_ID = "benchmark-key"
+
+
+def make_key_set() -> Tuple[Any, Dict[str, Any]]:
+    """A private key and the JWKS document publishing its public key."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk.update(kid=KEY_ID, alg="RS256", use="sig")
+    return private_key, {"keys": [jwk]}
+
+
+def make_token(private_key, uid: str, lifetime: int = 3600) -> str:
+    """An ID token with the claims Firebase issues."""
+    now = int(time.time())
+    claims = {"iss": ISSUER_PREFIX + PROJECT, "aud": PROJECT, "sub": uid, "user_id": uid,
+              "iat": now, "auth_time": now, "exp": now + lifetime, "email": f"{uid}@example.com"}
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": KEY_ID})
+
+
+def local_fetch(jwks: Dict[str, Any], fetches: List[float]):
+    """Serves the key set with a six-hour max-age, counting fetches."""
+    async def fetch(url: str):
+        fetches.append(time.time())
+        return jwks, {"cache-control": "public, max-age=21600, must-revalidate, no-transform"}
+    return fetch
+
+
+def summarize(samples: List[float]) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"{statistics.mean(samples) * 1e6:>9.1f} {statistics.median(samples) * 1e6:>9.1f} {p99 * 1e6:>9.1f}"
+
+
+def request_order(tokens: List[str], repeats: int) -> List[str]:
+    """Each user's token ``repeats`` times, users interleaved as concurrent clients would be."""
+    return [token for _ in range(repeats) for token in tokens]
+
+
+async def direct(verifier: TokenVerifier, order: List[str]) -> List[float]:
+    samples = []
+    for token in order:
+        start = time.perf_counter()
+        await verifier.verify(token)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def make_app(with_auth: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(user=Depends(get_current_user)):
+        return {"uid": user["uid"]}
+
+    if with_auth:
+        app.add_middleware(AuthMiddleware)
+    return app
+
+
+async def end_to_end(app: FastAPI, order: List[str]) -> List[float]:
+    samples = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for token in order:
+            start = time.perf_counter()
+            response = await client.get("/whoami", headers={"Authorization": f"Bearer {token}"})
+            samples.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+    return samples
+
+
+async def run_all(args):
+    private_key, jwks = make_key_set()
+    tokens = [make_token(private_key, f"user-{i}") for i in range(args.users)]
+    order = request_order(tokens, args.requests)
+    # The middleware's development bypass only applies to ENVIRONMENT=dev
+    settings.environment = "benchmark"
+
+    print(f"{args.users} users x {args.requests} requests each (microseconds per request)")
+    print(f"{'mode':<28} {'mean':>9} {'p50':>9} {'p99':>9}")
+    fetches: List[float] = []
+    verifiers = {
+        "verify": TokenVerifier(PROJECT, cache_size=0, fetch=local_fetch(jwks, fetches)),
+        "cached": TokenVerifier(PROJECT, cache_size=args.users, fetch=local_fetch(jwks, fetches)),
+    }
+    for name, verifier in verifiers.items():
+        await verifier.verify(tokens[0])  # Load the key set outside the timing
+        print(f"{'direct ' + name:<28} {summarize(await direct(verifier, order))}")
+
+    print(f"{'app without auth':<28} {summarize(await end_to_end(make_app(False), order))}")
+    for name, verifier in verifiers.items():
+        middleware.token_verifier = verifier
+        print(f"{'app with auth, ' + name:<28} {summarize(await end_to_end(make_app(True), order))}")
+
+    cached = verifiers["cached"].stats()
+    print(f"Key set fetches: {len(fetches)} (one per verifier); "
+          f"claims cache hit rate {cached['claims_cache']['hit_rate']:.1%}")
+
+    tampered = tokens[0][:-4] + ("AAAA" if not tokens[0].endswith("AAAA") else "BBBB")
+    expired = make_token(private_key, "user-expired", lifetime=-60)
+    for label, token in (("tampered", tampered), ("expired", expired)):
+        try:
+            await verifiers["cached"].verify(token)
+            print(f"{label} token: ACCEPTED")
+        except TokenVerificationError:
+            print(f"{label} token: rejected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200, help="Distinct users (tokens)")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per user")
+    args = parser.parse_args()
+    asyncio.run(run_all(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Prompt size and latency of follow-up question prompts by session length.
+
+For sessions of 10, 100 and 500 messages, compares the contextual follow-up
+prompt built from the entire conversation history (the original behaviour)
+with the one built by ``core.context_builder`` (recent turns within the token
+budget plus the rolling summary of older turns). Reports prompt tokens
+(``count_tokens``) and bytes, prompt build time, and how often the rolling
+summary was recomputed while the session grew one message at a time.
+
+Sessions are held in memory (array layout), so no Firestore is needed. The
+model is a stub by default; with ``--live`` each prompt is also sent to Gemini
+(GEMINI_API_KEY required) and the generation latency is reported.
+
+Run from the Backend directory:
+    python benchmarks/context_builder_benchmark.py --sizes 10,100,500
+    python benchmarks/context_builder_benchmark.py --live --runs 3
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from core import genkit_gemini
+from core.config import settings
+from core.context_builder import SUMMARY_FIELD, build_context, count_tokens
+
+USER_LINES = [
+    "Work has been really stressful this week and I keep worrying about the deadline.",
+    "I didn't sleep well again, I was up until three thinking about everything.",
+    "My sister called and we actually had a nice talk, which helped a bit.",
+    "I want to start going for walks in the morning before work.",
+    "Sometimes I feel like nobody notices how much I'm carrying.",
+    "I tried the breathing exercise and it calmed me down a little.",
+]
+AI_LINES = [
+    "That sounds like a lot to carry. Would you like to share more about it?",
+    "It makes sense that you'd feel worn out after a week like that.",
+    "I'm glad that conversation helped. How did it feel afterwards?",
+]
+HISTORICAL_CONTEXT = {
+    "recent_goals": [{"goal": "Sleep 7 hours a night", "status": "started"}],
+    "historical_context": "Recent session 1: You talked about pressure at work and feeling tired...",
+}
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubModel:
+    """Answers instantly; rolling-summary prompts get a summary of realistic length."""
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        if "Update the running summary" in prompt:
+            return StubResponse(" ".join(["You talked about work stress, poor sleep and a helpful call "
+                                          "with your sister, and want to start morning walks."] * 2))
+        return StubResponse("That sounds really hard. Would you like to share more?")
+
+
+class MemorySessionRef:
+    """Minimal stand-in for a session DocumentReference over an array-layout session."""
+
+    def __init__(self, session_data: dict):
+        self.id = "benchmark-session"
+        self.data = session_data
+
+    async def update(self, fields: dict):
+        self.data.update(fields)
+
+
+def make_messages(count: int) -> List[dict]:
+    rng = random.Random(count)
+    return [
+        {"text": rng.choice(USER_LINES if i % 2 == 0 else AI_LINES),
+         "role": "user" if i % 2 == 0 else "generated",
+         "time": datetime.now()}
+        for i in range(count)
+    ]
+
+
+async def grow_session(count: int):
+    """Append messages one at a time, building the context after each like the API does."""
+    session_data = {"messages": []}
+    ref = MemorySessionRef(session_data)
+    recomputes = 0
+    for message in make_messages(count):
+        session_data["messages"].append(message)
+        through = (session_data.get(SUMMARY_FIELD) or {}).get("through", 0)
+        await build_context(ref, session_data)
+        if (session_data.get(SUMMARY_FIELD) or {}).get("through", 0) != through:
+            recomputes += 1
+    return ref, session_data, recomputes
+
+
+async def timed_generation(prompt: str, runs: int) -> float:
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await genkit_gemini._call_model(prompt)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+async def run_size(count: int, args) -> List[dict]:
+    ref, session_data, recomputes = await grow_session(count)
+    messages = session_data["messages"]
+
+    start = time.perf_counter()
+    full_prompt = genkit_gemini._contextual_followup_prompt(messages, HISTORICAL_CONTEXT)
+    full_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    context = await build_context(ref, session_data)
+    budget_prompt = genkit_gemini._contextual_followup_prompt(context["turns"], HISTORICAL_CONTEXT, context["summary"])
+    budget_ms = (time.perf_counter() - start) * 1000
+
+    rows = []
+    for mode, prompt, build_ms, extra in (
+        ("full", full_prompt, full_ms, "-"),
+        ("budgeted", budget_prompt, budget_ms, f"{len(context['turns'])} turns, {recomputes} summaries"),
+    ):
+        row = {"messages": count, "mode": mode, "tokens": count_tokens(prompt),
+               "bytes": len(prompt.encode("utf-8")), "build_ms": build_ms, "extra": extra}
+        if args.live:
+            row["latency_ms"] = await timed_generation(prompt, args.runs)
+        rows.append(row)
+    return rows
+
+
+async def run_all(args):
+    # Every prompt must reach the model when measuring latency
+    settings.llm_cache_enabled = False
+    if not args.live:
+        genkit_gemini.model = StubModel()
+    print(f"Token budget {settings.question_context_tokens}, window {settings.question_context_window} "
+          f"messages, summary step {settings.question_summary_step}")
+    header = f"{'messages':>8} {'mode':<9} {'tokens':>7} {'bytes':>8} {'build ms':>9}"
+    print(header + (f" {'gen ms':>8}" if args.live else "") + "  notes")
+    for size in (int(s) for s in args.sizes.split(",")):
+        for row in await run_size(size, args):
+            line = f"{row['messages']:>8} {row['mode']:<9} {row['tokens']:>7} {row['bytes']:>8} {row['build_ms']:>9.2f}"
+            if args.live:
+                line += f" {row['latency_ms']:>8.0f}"
+            print(f"{line}  {row['extra']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,500", help="Comma-separated session lengths")
+    parser.add_argument("--live", action="store_true", help="Also measure Gemini generation latency")
+    parser.add_argument("--runs", type=int, default=3, help="Live generations per prompt (median reported)")
+    args = parser.parse_args()
+    asyncio.run(run_all(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for session emotion analysis.
+
+Compares the original per-keyword substring scan of ``analyze_messages`` with
+the compiled single-pass matcher in ``core.emotion_analysis`` on synthetic
+sessions, and checks that both produce identical analytics.
+
+Run from the Backend directory:
+    python benchmarks/emotion_analysis_benchmark.py --messages 1000 --sessions 20
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.emotion_analysis import EMOTION_KEYWORDS, INTENSIFIERS, analyze_messages
+
+FILLER_WORDS = (
+    "i feel like today was long and my boss said the project is due soon but "
+    "i also think we could manage it if we work together on the plan for next "
+    "week maybe after the weekend when things calm a little and sleep improves"
+).split()
+
+
+def legacy_analyze_messages(messages: List[dict]) -> Dict[str, Any]:
+    """The original implementation: rebuilds the lexicon and rescans each text per emotion."""
+    emotion_keywords = {emotion: list(keywords) for emotion, keywords in EMOTION_KEYWORDS.items()}
+    emotion_counts = {
+        "anxiety": 0, "happy": 0, "sad": 0, "disgust": 0, "fear": 0,
+        "anger": 0, "envy": 0, "embarrassment": 0, "content": 0, "relief": 0
+    }
+    intensities = []
+    user_messages = [m for m in messages if m.get("role") == "user"]
+    for message in user_messages:
+        text = message.get("text", "").lower()
+        if not text.strip():
+            continue
+        intensity = 5
+        if "!" in text:
+            intensity += 1
+        if "?" in text:
+            intensity += 0.5
+        if any(word in text for word in ["very", "extremely", "really", "so", "too"]):
+            intensity += 1
+        if len(text) > 100:
+            intensity += 0.5
+        intensity = min(10, intensity)
+        intensities.append(intensity)
+        for emotion, keywords in emotion_keywords.items():
+            if any(keyword in text for keyword in keywords):
+                emotion_counts[emotion] += 1
+    avg_intensity = statistics.mean(intensities) if intensities else 5.0
+    total_emotions = sum(emotion_counts.values())
+    if total_emotions == 0:
+        emotion_percentages = {
+            "anxiety": 0.05, "happy": 0.10, "sad": 0.05, "disgust": 0.05, "fear": 0.05,
+            "anger": 0.05, "envy": 0.05, "embarrassment": 0.05, "content": 0.50, "relief": 0.05
+        }
+    else:
+        emotion_percentages = {
+            emotion: round(count / total_emotions, 3) for emotion, count in emotion_counts.items()
+        }
+        current_sum = sum(emotion_percentages.values())
+        if current_sum != 1.0:
+            max_emotion = max(emotion_percentages.keys(), key=lambda k: emotion_percentages[k])
+            emotion_percentages[max_emotion] += round(1.0 - current_sum, 3)
+    return {
+        "emotion_percentages": emotion_percentages,
+        "emotion_counts": emotion_counts,
+        "avg_intensity": round(avg_intensity, 2),
+        "message_analysis": {
+            "total_messages": len(messages),
+            "user_messages": len(user_messages),
+            "analyzed_messages": len([m for m in user_messages if m.get("text", "").strip()]),
+            "avg_message_length": round(sum(len(m.get("text", "")) for m in user_messages) / len(user_messages), 2) if user_messages else 0
+        }
+    }
+
+
+def make_session(rng: random.Random, size: int) -> List[dict]:
+    """Build a synthetic conversation alternating user and generated messages."""
+    keywords = [k for words in EMOTION_KEYWORDS.values() for k in words] + INTENSIFIERS
+    messages = []
+    for i in range(size):
+        words = [
+            rng.choice(keywords) if rng.random() < 0.08 else rng.choice(FILLER_WORDS)
+            for _ in range(rng.randint(4, 60))
+        ]
+        text = " ".join(words) + rng.choice(["", ".", "!", "?"])
+        if rng.random() < 0.3:
+            text = text.capitalize()
+        messages.append({"text": text, "role": "user" if i % 2 == 0 else "generated"})
+    return messages
+
+
+def time_it(fn, sessions: List[List[dict]], repeat: int) -> float:
+    """Best wall time in milliseconds per session over ``repeat`` rounds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for messages in sessions:
+            fn(messages)
+        best = min(best, time.perf_counter() - start)
+    return best / len(sessions) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000, help="messages per synthetic session")
+    parser.add_argument("--sessions", type=int, default=20, help="number of synthetic sessions")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds (best is reported)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # Analysis logs at INFO for every call; keep the benchmark output readable
+    logging.disable(logging.INFO)
+
+    rng = random.Random(args.seed)
+    sessions = [make_session(rng, args.messages) for _ in range(args.sessions)]
+
+    for messages in sessions:
+        if legacy_analyze_messages(messages) != analyze_messages(messages):
+            raise SystemExit("Mismatch between legacy and compiled analysis results")
+
+    legacy_ms = time_it(legacy_analyze_messages, sessions, args.repeat)
+    compiled_ms = time_it(analyze_messages, sessions, args.repeat)
+
+    print(f"Sessions: {args.sessions} x {args.messages} messages (results identical)")
+    print(f"legacy   : {legacy_ms:8.2f} ms/session")
+    print(f"compiled : {compiled_ms:8.2f} ms/session")
+    print(f"speedup  : {legacy_ms / compiled_ms:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
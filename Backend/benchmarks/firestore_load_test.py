@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Load test for the Firestore data access layer.
+
+Serves the same read path (session document + last 20 messages) through three
+FastAPI handlers and drives each with concurrent clients:
+
+- blocking: synchronous client called directly inside ``async def`` (the
+  pattern the routers used before ``core.repository``)
+- threaded: ``core.repository.ThreadedClient`` over the synchronous client
+- async: native ``google.cloud.firestore.AsyncClient``
+
+Requests go through ``httpx.ASGITransport`` so the numbers reflect the event
+loop and Firestore client only, not socket overhead.
+
+Requires the Firestore emulator (no production data is touched):
+    gcloud emulators firestore start --host-port=localhost:8081
+    export FIRESTORE_EMULATOR_HOST=localhost:8081
+
+Run from the Backend directory:
+    python benchmarks/firestore_load_test.py --clients 200 --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+from google.cloud import firestore
+
+from core.repository import ThreadedClient, collect
+
+PROJECT = "demo-therapyapp"
+TAIL = 20
+
+
+def seed(client: firestore.Client, sessions: int, messages: int) -> List[str]:
+    """Create sessions with subcollection messages in the emulator."""
+    session_ids = []
+    for i in range(sessions):
+        ref = client.collection("sessions").document(f"loadtest-{i}")
+        batch = client.batch()
+        batch.set(ref, {
+            "user_id": "loadtest-user",
+            "created_at": datetime.now(),
+            "message_storage": "subcollection",
+            "message_count": messages,
+        })
+        for seq in range(messages):
+            batch.set(ref.collection("messages").document(f"{seq:010d}"), {
+                "text": f"message {seq}", "role": "user", "seq": seq, "time": datetime.now().isoformat()
+            })
+        batch.commit()
+        session_ids.append(ref.id)
+    return session_ids
+
+
+def build_app(sync_client: firestore.Client, async_client: firestore.AsyncClient) -> FastAPI:
+    app = FastAPI()
+    threaded_client = ThreadedClient(sync_client)
+
+    @app.get("/blocking/{session_id}")
+    async def blocking(session_id: str):
+        ref = sync_client.collection("sessions").document(session_id)
+        session = ref.get()
+        query = ref.collection("messages").order_by("seq", direction=firestore.Query.DESCENDING).limit(TAIL)
+        tail = [doc.to_dict() for doc in query.stream()]
+        return {"count": session.to_dict()["message_count"], "tail": len(tail)}
+
+    async def non_blocking(client, session_id: str):
+        ref = client.collection("sessions").document(session_id)
+        session = await ref.get()
+        query = ref.collection("messages").order_by("seq", direction=firestore.Query.DESCENDING).limit(TAIL)
+        tail = [doc.to_dict() for doc in await collect(query)]
+        return {"count": session.to_dict()["message_count"], "tail": len(tail)}
+
+    @app.get("/threaded/{session_id}")
+    async def threaded(session_id: str):
+        return await non_blocking(threaded_client, session_id)
+
+    @app.get("/async/{session_id}")
+    async def native_async(session_id: str):
+        return await non_blocking(async_client, session_id)
+
+    return app
+
+
+async def run_mode(app: FastAPI, mode: str, session_ids: List[str], clients: int, total: int) -> dict:
+    latencies: List[float] = []
+    counter = iter(range(total))
+
+    async def worker(http: httpx.AsyncClient):
+        for n in counter:
+            start = time.perf_counter()
+            response = await http.get(f"/{mode}/{session_ids[n % len(session_ids)]}")
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as http:
+        # Warm up connections and the thread pool
+        await asyncio.gather(*(http.get(f"/{mode}/{sid}") for sid in session_ids[:10]))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max": latencies[-1] * 1000,
+    }
+
+
+async def run_all(args):
+    sync_client = firestore.Client(project=PROJECT)
+    # The async client binds its channel to the running loop, so create it here
+    async_client = firestore.AsyncClient(project=PROJECT)
+    session_ids = seed(sync_client, args.sessions, args.messages)
+    app = build_app(sync_client, async_client)
+
+    print(f"{args.clients} clients, {args.requests} requests per mode, "
+          f"{args.sessions} sessions x {args.messages} messages")
+    print(f"{'mode':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for mode in args.modes.split(","):
+        result = await run_mode(app, mode, session_ids, args.clients, args.requests)
+        print(f"{result['mode']:<10} {result['rps']:>9.1f} {result['p50']:>9.1f} "
+              f"{result['p95']:>9.1f} {result['max']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per mode")
+    parser.add_argument("--sessions", type=int, default=50, help="Sessions to seed")
+    parser.add_argument("--messages", type=int, default=100, help="Messages per seeded session")
+    parser.add_argument("--modes", default="blocking,threaded,async", help="Comma-separated modes to run")
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set - start the Firestore emulator first")
+
+    asyncio.run(run_all(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Match quality and speed of goal deduplication.
+
+Quality: runs the labelled cases in ``benchmarks/data/goal_match_labels.json``
+(a user's existing goals, a detected goal and the goal it should match, or
+none) through the original first-loose-match heuristic and through
+``core.goal_index.GoalIndex`` at several thresholds, and reports precision
+(matches that picked the right goal), recall (expected matches found) and
+accuracy over all cases, including "no match" ones.
+
+Speed: indexes synthetic users with up to thousands of goals (from their
+stored ``match_terms``, as session close does) and times matching one
+detected goal with each approach.
+
+Run from the Backend directory:
+    python benchmarks/goal_match_eval.py
+    python benchmarks/goal_match_eval.py --thresholds 0.3,0.4,0.5 --show-errors
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Callable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from core.config import settings
+from core.goal_index import TERMS_FIELD, GoalIndex, goal_terms
+
+LABELS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "goal_match_labels.json")
+
+WORDS = ("sleep run walk read call write cook save quit join meditate breathe drink eat study clean paint "
+         "garden swim stretch journal travel budget plan finish learn practice visit stop start reduce").split()
+OBJECTS = ("mom friends water book thesis dog job money phone coffee guitar spanish yoga kitchen bills "
+           "morning evening weekend meetings family partner sister gym club diary music piano").split()
+
+
+def legacy_match(goal_text: str, existing: List[str]) -> Optional[int]:
+    """The original matcher: first goal with a substring or two-shared-words overlap."""
+    goal_text = goal_text.lower().strip()
+    for i, text in enumerate(existing):
+        existing_text = text.lower().strip()
+        if goal_text in existing_text or existing_text in goal_text or \
+           len(set(goal_text.split()) & set(existing_text.split())) >= 2:
+            return i
+    return None
+
+
+def index_matcher(threshold: float) -> Callable[[str, List[str]], Optional[int]]:
+    def match(goal_text: str, existing: List[str]) -> Optional[int]:
+        index = GoalIndex.from_goals({str(i): {"goal": text} for i, text in enumerate(existing)}, threshold)
+        goal_id, _ = index.best_match(goal_terms(goal_text))
+        return None if goal_id is None else int(goal_id)
+    return match
+
+
+def evaluate(cases: List[dict], match: Callable, show_errors: bool) -> dict:
+    correct = predicted = expected = true_positive = 0
+    for case in cases:
+        result = match(case["detected"], case["existing"])
+        correct += result == case["match"]
+        predicted += result is not None
+        expected += case["match"] is not None
+        true_positive += result is not None and result == case["match"]
+        if show_errors and result != case["match"]:
+            got = "new goal" if result is None else repr(case["existing"][result])
+            want = "new goal" if case["match"] is None else repr(case["existing"][case["match"]])
+            print(f"    {case['detected']!r}: got {got}, expected {want}")
+    return {
+        "precision": true_positive / predicted if predicted else 0.0,
+        "recall": true_positive / expected if expected else 0.0,
+        "accuracy": correct / len(cases),
+    }
+
+
+def synthetic_goals(count: int, rng: random.Random) -> List[str]:
+    return [f"{rng.choice(WORDS)} {rng.choice(OBJECTS)} {rng.choice(WORDS)} {rng.choice(OBJECTS)} {i}"
+            for i in range(count)]
+
+
+def time_match(sizes: List[int], repeats: int):
+    rng = random.Random(7)
+    print(f"\n{'goals':>7} {'legacy ms':>10} {'index build ms':>15} {'index match ms':>15}")
+    for size in sizes:
+        existing = synthetic_goals(size, rng)
+        queries = [f"{rng.choice(WORDS)} more {rng.choice(OBJECTS)} every day" for _ in range(repeats)]
+
+        start = time.perf_counter()
+        for query in queries:
+            legacy_match(query, existing)
+        legacy_ms = (time.perf_counter() - start) / repeats * 1000
+
+        # Goals are stored with their terms, so building the index does not normalize text
+        goals = {str(i): {"goal": text, TERMS_FIELD: goal_terms(text)} for i, text in enumerate(existing)}
+        start = time.perf_counter()
+        index = GoalIndex.from_goals(goals)
+        index.best_match(goal_terms(queries[0]))  # Builds the posting arrays
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for query in queries:
+            index.best_match(goal_terms(query))
+        match_ms = (time.perf_counter() - start) / repeats * 1000
+        print(f"{size:>7} {legacy_ms:>10.3f} {build_ms:>15.2f} {match_ms:>15.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--thresholds", default="0.3,0.4,0.45,0.5,0.6", help="Comma-separated index thresholds")
+    parser.add_argument("--sizes", default="100,1000,5000", help="Goals per user for the timing run")
+    parser.add_argument("--repeats", type=int, default=50, help="Detected goals matched per size")
+    parser.add_argument("--show-errors", action="store_true", help="List the cases each matcher gets wrong")
+    args = parser.parse_args()
+
+    with open(LABELS) as f:
+        cases = json.load(f)["cases"]
+    positives = sum(case["match"] is not None for case in cases)
+    print(f"{len(cases)} labelled cases ({positives} matches, {len(cases) - positives} new goals); "
+          f"configured threshold {settings.goal_match_threshold}")
+    print(f"{'matcher':<16} {'precision':>9} {'recall':>7} {'accuracy':>9}")
+
+    matchers = [("legacy", legacy_match)]
+    matchers += [(f"index@{t}", index_matcher(float(t))) for t in args.thresholds.split(",")]
+    for name, match in matchers:
+        if args.show_errors:
+            print(f"  {name}:")
+        result = evaluate(cases, match, args.show_errors)
+        print(f"{name:<16} {result['precision']:>9.2f} {result['recall']:>7.2f} {result['accuracy']:>9.2f}")
+
+    time_match([int(size) for size in args.sizes.split(",")], args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+End-to-end goal tracking write time for a session with many detected goals.
+
+Compares, for the same detected goals (by default 20, half matching goals the
+user already has):
+
+- legacy: the original loop in ``track_goals_from_session``, one query for the
+  user's goals followed by one ``update()`` or ``set()`` round trip per goal,
+  with read-modify-write of ``session_mentions``
+- transaction: ``core.goal_tracking.save_goals``, which reads and writes all
+  goals in one transaction with ``ArrayUnion`` mentions
+
+Each run uses a fresh user so both modes see identical starting data. The
+second transaction run for the same session also checks idempotency (no goal
+created twice, no mention appended twice).
+
+Requires the Firestore emulator (no production data is touched):
+    gcloud emulators firestore start --host-port=localhost:8081
+    export FIRESTORE_EMULATOR_HOST=localhost:8081
+
+Run from the Backend directory:
+    python benchmarks/goal_tracking_benchmark.py --goals 20 --runs 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.cloud import firestore
+
+import core.goal_tracking as goal_tracking
+import core.repository as repository
+from core.repository import collect
+
+PROJECT = "demo-therapyapp"
+CATEGORIES = ["anxiety", "relationships", "work", "health", "personal_growth", "sleep"]
+
+
+def detected(goals: int) -> List[dict]:
+    return [{
+        "goal": f"habit{i} routine{i} plan{i}",
+        "status": "started",
+        "category": CATEGORIES[i % len(CATEGORIES)],
+        "confidence": 0.9,
+        "evidence": f"I want to practice habit {i}"
+    } for i in range(goals)]
+
+
+async def seed(client: firestore.AsyncClient, user_id: str, goals: List[dict]) -> None:
+    """Give the user existing goals matching every other detected goal."""
+    batch = client.batch()
+    for goal in goals[::2]:
+        batch.set(client.collection("goals").document(), {
+            "user_id": user_id, "goal": goal["goal"], "status": "imagined",
+            "created_at": datetime.now().isoformat(), "last_mentioned": datetime.now().isoformat(),
+            "session_mentions": ["earlier-session"], "confidence_score": 0.8, "category": goal["category"]
+        })
+    await batch.commit()
+
+
+def legacy_match(goal_text: str, goals: dict):
+    """The original matcher: first goal with a substring or two-shared-words overlap."""
+    for goal_id, goal_data in goals.items():
+        existing_text = goal_data.get("goal", "").lower().strip()
+        if goal_text in existing_text or existing_text in goal_text or \
+           len(set(goal_text.split()) & set(existing_text.split())) >= 2:
+            return goal_id
+    return None
+
+
+async def legacy_track(client: firestore.AsyncClient, session_id: str, user_id: str, detected_goals: List[dict]):
+    """The original per-goal write loop."""
+    existing_goals = {doc.id: doc.to_dict() for doc in
+                      await collect(client.collection("goals").where("user_id", "==", user_id))}
+    for detected_goal in detected_goals:
+        goal_text = detected_goal.get("goal", "").lower().strip()
+        if not goal_text or detected_goal.get("confidence", 0) < 0.6:
+            continue
+        existing_goal_id = legacy_match(goal_text, existing_goals)
+        current_time = datetime.now().isoformat()
+        if existing_goal_id:
+            existing_goal = existing_goals[existing_goal_id]
+            update_data = {
+                "last_mentioned": current_time,
+                "session_mentions": existing_goal.get("session_mentions", []) + [session_id]
+            }
+            if goal_tracking.status_progresses(existing_goal.get("status", "imagined"), detected_goal["status"]):
+                update_data["status"] = detected_goal["status"]
+            await client.collection("goals").document(existing_goal_id).update(update_data)
+        else:
+            await client.collection("goals").document().set({
+                "user_id": user_id, "goal": detected_goal["goal"], "status": detected_goal["status"],
+                "created_at": current_time, "last_mentioned": current_time, "session_mentions": [session_id],
+                "confidence_score": detected_goal["confidence"], "category": detected_goal["category"]
+            })
+
+
+async def check_idempotent(client: firestore.AsyncClient, session_id: str, user_id: str, goals: int) -> bool:
+    docs = [doc.to_dict() for doc in await collect(client.collection("goals").where("user_id", "==", user_id))]
+    mentions_ok = all(doc["session_mentions"].count(session_id) <= 1 for doc in docs)
+    return len(docs) == goals and mentions_ok
+
+
+async def run_all(args):
+    client = firestore.AsyncClient(project=PROJECT)
+    # Route the data layer used by save_goals to the emulator client
+    repository.db = goal_tracking.db = client
+    goals = detected(args.goals)
+    timings = {"legacy": [], "transaction": []}
+    idempotent = True
+
+    for run in range(args.runs):
+        for mode in ("legacy", "transaction"):
+            user_id, session_id = f"bench-{mode}-{run}-{time.time_ns()}", f"session-{run}"
+            await seed(client, user_id, goals)
+            start = time.perf_counter()
+            if mode == "legacy":
+                await legacy_track(client, session_id, user_id, goals)
+            else:
+                await goal_tracking.save_goals(session_id, user_id, goals)
+            timings[mode].append(time.perf_counter() - start)
+            if mode == "transaction":
+                # Re-closing the same session must not duplicate goals or mentions
+                await goal_tracking.save_goals(session_id, user_id, goals)
+                idempotent &= await check_idempotent(client, session_id, user_id, args.goals)
+
+    print(f"{args.goals} detected goals ({len(goals[::2])} matching existing goals), {args.runs} runs")
+    print(f"{'mode':<12} {'mean ms':>9} {'p50 ms':>9} {'max ms':>9}")
+    for mode, samples in timings.items():
+        print(f"{mode:<12} {statistics.mean(samples) * 1000:>9.1f} {statistics.median(samples) * 1000:>9.1f} "
+              f"{max(samples) * 1000:>9.1f}")
+    print(f"Re-close idempotent: {'yes' if idempotent else 'NO'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--goals", type=int, default=20, help="Detected goals per session")
+    parser.add_argument("--runs", type=int, default=10, help="Sessions per mode")
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set - start the Firestore emulator first")
+
+    asyncio.run(run_all(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Startup cost audit: import time and resident memory of every module ``main:app`` loads.
+
+Imports ``main`` once with every module's execution timed, and the process's
+resident set size (RSS, from ``/proc/self/statm``) read before and after it.
+Two tables are printed:
+
+- packages: the time and RSS each third-party package (or app module) adds
+  by itself, excluding what it imports from other packages; the rows add up
+  to the total cost of ``import main``
+- app modules: each ``main``/``api``/``core``/``models`` module with
+  everything it was first to import, which shows where a dependency enters
+  the import graph
+
+The hooks add some overhead of their own, so totals are a little above a
+plain ``import main`` (see ``startup_benchmark.py``). RSS is Linux-only;
+elsewhere only times are reported. Runs with ``ENVIRONMENT=dev`` and no
+credentials, so no Google service is contacted.
+
+Run from the Backend directory:
+    python benchmarks/import_audit.py --top 20
+    python benchmarks/import_audit.py --app-dir /tmp/before/Backend
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PACKAGES = ("main", "api", "core", "models")
+HEAVY_MODULES = ("google.generativeai", "firebase_admin", "google.cloud.firestore_v1", "numpy", "jwt")
+PAGE_MB = os.sysconf("SC_PAGE_SIZE") / 2 ** 20 if hasattr(os, "sysconf") else 0.0
+
+
+def rss_mb() -> float:
+    """Current resident set size in MiB (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * PAGE_MB
+    except OSError:
+        return 0.0
+
+
+def package_of(module: str) -> str:
+    """Reporting group of a module: the app module itself, or its top-level package."""
+    parts = module.split(".")
+    if parts[0] in APP_PACKAGES:
+        return module
+    # Namespace packages: report google.cloud.firestore_v1 and google.api_core separately
+    if parts[0] == "google":
+        return ".".join(parts[:3] if len(parts) > 2 and parts[1] == "cloud" else parts[:2])
+    return parts[0]
+
+
+class ImportAudit:
+    """Meta path hook that times the execution of every module imported while installed."""
+
+    def __init__(self):
+        self.records = {}  # module -> [cumulative s, self s, cumulative MiB, self MiB, first in package]
+        self._stack = []
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader.exec_module = self._timed(name, spec.loader.exec_module)
+        return spec
+
+    def _timed(self, name: str, exec_module):
+        def timed_exec_module(module):
+            parent = self._stack[-1] if self._stack else None
+            # Frame: [children s, children MiB]
+            self._stack.append((name, [0.0, 0.0]))
+            start, start_rss = time.perf_counter(), rss_mb()
+            try:
+                exec_module(module)
+            finally:
+                _, children = self._stack.pop()
+                elapsed, grown = time.perf_counter() - start, rss_mb() - start_rss
+                new_package = parent is None or package_of(parent[0]) != package_of(name)
+                self.records[name] = [elapsed, elapsed - children[0], grown, grown - children[1], new_package]
+                if parent is not None:
+                    parent[1][0] += elapsed
+                    parent[1][1] += grown
+        return timed_exec_module
+
+
+def print_packages(audit: ImportAudit, top: int) -> None:
+    packages = {}
+    for module, (_, self_time, _, self_rss, _) in audit.records.items():
+        row = packages.setdefault(package_of(module), [0.0, 0.0, 0])
+        row[0] += self_time
+        row[1] += self_rss
+        row[2] += 1
+
+    print(f"\n{'package':<34} {'modules':>7} {'self ms':>8} {'self MiB':>9}")
+    for package, (self_time, self_rss, count) in sorted(packages.items(), key=lambda item: -item[1][0])[:top]:
+        print(f"{package:<34} {count:>7} {self_time * 1000:>8.1f} {self_rss:>9.1f}")
+
+
+def print_app_modules(audit: ImportAudit, top: int) -> None:
+    app_modules = [(module, record) for module, record in audit.records.items()
+                   if module.split(".")[0] in APP_PACKAGES and module != "main"]
+    print(f"\n{'app module (with first imports)':<34} {'ms':>8} {'MiB':>9}")
+    for module, (elapsed, _, grown, _, _) in sorted(app_modules, key=lambda item: -item[1][0])[:top]:
+        print(f"{module:<34} {elapsed * 1000:>8.1f} {grown:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=BACKEND_DIR, help="Backend directory to audit")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    args = parser.parse_args()
+
+    os.environ.update(ENVIRONMENT="dev", JOB_STORE="memory", GOOGLE_APPLICATION_CREDENTIALS="/nonexistent")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.chdir(args.app_dir)
+    sys.path.insert(0, args.app_dir)
+
+    audit = ImportAudit()
+    sys.meta_path.insert(0, audit)
+    before_modules, before_rss = len(sys.modules), rss_mb()
+    start = time.perf_counter()
+    import main  # noqa: F401
+    elapsed = time.perf_counter() - start
+    sys.meta_path.remove(audit)
+
+    print(f"{args.app_dir}: import main {elapsed * 1000:.0f} ms, "
+          f"RSS {before_rss:.1f} -> {rss_mb():.1f} MiB, {len(sys.modules) - before_modules} modules")
+    print_packages(audit, args.top)
+    print_app_modules(audit, args.top)
+    print()
+    for module in HEAVY_MODULES:
+        print(f"{module:<34} {'imported' if module in sys.modules else 'not imported'} at startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Overload benchmark for Gemini call execution.
+
+Replaces the Gemini model with a fake whose ``generate_content`` sleeps for a
+fixed latency, then sends follow-up question requests at a constant arrival
+rate above the model's capacity. Two modes are compared:
+
+- default: the blocking call on the event loop's default executor, as
+  ``core.genkit_gemini`` did before ``core.llm_executor`` (no cap, no shedding)
+- bounded: ``core.llm_executor.LLMExecutor`` with a concurrency limit, a
+  bounded queue and load shedding to the fallback reply
+
+Alongside the LLM requests a probe runs a 1 ms job on the default executor
+every 10 ms (standing in for Firestore work sharing that pool) to show
+starvation. Reported per mode: request latency percentiles, shed requests
+and probe latency.
+
+Run from the Backend directory (no network or API key needed):
+    python benchmarks/llm_overload_benchmark.py --rate 60 --seconds 5 --latency 1.0
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from core import genkit_gemini
+from core.config import settings
+from core.llm_executor import LLMExecutor
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeSlowModel:
+    """Stands in for ``genai.GenerativeModel``: blocks the calling thread for ``latency`` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        time.sleep(self.latency)
+        return FakeResponse("That sounds like a lot to carry. Would you like to share more?")
+
+
+class DefaultExecutor:
+    """The previous behaviour: every call goes straight to the loop's default thread pool."""
+
+    async def run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def stats(self) -> dict:
+        return {"shed": 0}
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000
+
+
+async def run_mode(executor, args) -> dict:
+    genkit_gemini.llm_executor = executor
+    latencies: List[float] = []
+    fallbacks = 0
+    probe_latencies: List[float] = []
+    stop = asyncio.Event()
+
+    async def request(n: int):
+        nonlocal fallbacks
+        history = [{"role": "user", "text": f"request {n}: work has been stressful lately"}]
+        start = time.perf_counter()
+        reply = await genkit_gemini.generate_followup_question(history)
+        latencies.append(time.perf_counter() - start)
+        if reply == genkit_gemini.FOLLOWUP_FALLBACK:
+            fallbacks += 1
+
+    async def probe():
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            start = time.perf_counter()
+            await loop.run_in_executor(None, time.sleep, 0.001)
+            probe_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    probe_task = asyncio.create_task(probe())
+    tasks = []
+    total = int(args.rate * args.seconds)
+    start = time.perf_counter()
+    for n in range(total):
+        # Open-loop arrivals: requests keep coming whether or not earlier ones finished
+        await asyncio.sleep(max(0.0, start + n / args.rate - time.perf_counter()))
+        tasks.append(asyncio.create_task(request(n)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+
+    latencies.sort()
+    probe_latencies.sort()
+    return {
+        "requests": total,
+        "elapsed": elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1] * 1000,
+        "fallbacks": fallbacks,
+        "shed": executor.stats()["shed"],
+        "probe_p95": percentile(probe_latencies, 0.95),
+        "probe_max": probe_latencies[-1] * 1000,
+    }
+
+
+async def run_all(args):
+    # Prompts differ per request anyway; keep the cache out of the measurement
+    settings.llm_cache_enabled = False
+    genkit_gemini.model = FakeSlowModel(args.latency)
+    capacity = args.concurrency / args.latency
+    print(f"Fake model latency {args.latency:.2f}s, arrival rate {args.rate:.0f}/s for {args.seconds:.0f}s "
+          f"(bounded capacity {capacity:.0f}/s, concurrency {args.concurrency}, "
+          f"queue {args.queue}, queue timeout {args.queue_timeout}s)")
+    print(f"{'mode':<8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'fallback':>9} "
+          f"{'shed':>6} {'probe p95':>10} {'probe max':>10} {'wall s':>7}")
+
+    modes = {
+        "default": lambda: DefaultExecutor(),
+        "bounded": lambda: LLMExecutor(args.concurrency, args.concurrency, args.queue, args.queue_timeout),
+    }
+    for name in args.modes.split(","):
+        result = await run_mode(modes[name](), args)
+        print(f"{name:<8} {result['p50']:>9.0f} {result['p95']:>9.0f} {result['p99']:>9.0f} "
+              f"{result['max']:>9.0f} {result['fallbacks']:>9} {result['shed']:>6} "
+              f"{result['probe_p95']:>10.1f} {result['probe_max']:>10.1f} {result['elapsed']:>7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=60, help="Requests per second")
+    parser.add_argument("--seconds", type=float, default=5, help="Duration of the arrival phase")
+    parser.add_argument("--latency", type=float, default=1.0, help="Fake model latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=settings.llm_max_concurrency, help="Bounded mode: calls in flight")
+    parser.add_argument("--queue", type=int, default=settings.llm_max_queue, help="Bounded mode: callers allowed to wait")
+    parser.add_argument("--queue-timeout", type=float, default=2.0, help="Bounded mode: seconds to wait for a slot")
+    parser.add_argument("--modes", default="default,bounded", help="Comma-separated modes to run")
+    args = parser.parse_args()
+
+    asyncio.run(run_all(args))
+
+
+if __name__ == "__main__":
+    main()
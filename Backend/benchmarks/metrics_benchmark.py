@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Cost of the in-process metrics (``core/metrics.py``).
+
+Measures, without any Prometheus server:
+
+- observe: one histogram observation through a cached child, and through
+  ``labels()`` as the middleware records it
+- firestore get: ``await ref.get()`` on an in-memory document reference,
+  bare and wrapped in ``MeasuredDocument`` (what ``METRICS_ENABLED`` adds to
+  every Firestore call, excluding the network round trip)
+- render: ``GET /metrics`` output for the app's registry filled with
+  ``--series`` label combinations per histogram
+
+Run from the Backend directory:
+    python benchmarks/metrics_benchmark.py --iterations 200000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+import main as app_module  # noqa: F401  (registers every metric family of the app)
+from core.metrics import registry
+from core.middleware import REQUEST_DURATION
+from core.repository import MeasuredDocument, OPERATION_DURATION
+
+
+class MemoryDocument:
+    """Document reference answering ``get()`` without I/O."""
+
+    id = "benchmark"
+
+    async def get(self, field_paths=None, transaction=None):
+        return self
+
+
+def per_call_ns(function, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+async def per_await_ns(make_awaitable, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await make_awaitable()
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+async def run_all(args):
+    child = REQUEST_DURATION.labels("GET", "/health", 200)
+    observe = per_call_ns(lambda: child.observe(0.0042), args.iterations)
+    labelled = per_call_ns(lambda: REQUEST_DURATION.labels("GET", "/health", 200).observe(0.0042), args.iterations)
+
+    document = MemoryDocument()
+    measured = MeasuredDocument(document, "benchmark")
+    bare_get = await per_await_ns(document.get, args.iterations)
+    measured_get = await per_await_ns(measured.get, args.iterations)
+
+    for i in range(args.series):
+        REQUEST_DURATION.labels("GET", f"/route/{i}", 200).observe(0.01 * i)
+        OPERATION_DURATION.labels(f"collection_{i}", "get").observe(0.001 * i)
+    start = time.perf_counter()
+    text = registry.render()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{args.iterations} iterations")
+    print(f"{'observe (cached child)':<28} {observe:>8.0f} ns")
+    print(f"{'labels() + observe':<28} {labelled:>8.0f} ns")
+    print(f"{'firestore get, bare':<28} {bare_get:>8.0f} ns")
+    print(f"{'firestore get, measured':<28} {measured_get:>8.0f} ns")
+    print(f"{'render':<28} {render_ms:>8.2f} ms  ({len(text.splitlines())} lines, {len(text) / 1024:.0f} KiB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000, help="Calls per measurement")
+    parser.add_argument("--series", type=int, default=50, help="Label combinations added per histogram before rendering")
+    args = parser.parse_args()
+    asyncio.run(run_all(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Throughput of ``GET /health`` with and without the middleware stack.
+
+Builds the same minimal app (the ``/health`` handler from ``main`` behind
+CORS, plus a server-sent events endpoint) three ways:
+
+- bare: CORS only
+- base-http: authentication and timing as Starlette ``BaseHTTPMiddleware``
+  subclasses (how ``AuthMiddleware`` used to be written)
+- asgi: ``core.middleware.AuthMiddleware`` and ``TimingMiddleware``
+
+Requests are driven straight through the ASGI interface (no sockets or HTTP
+client), ``--concurrency`` at a time, so the numbers are the app's own
+per-request cost. Authentication uses a locally generated key set and one
+token per client, so verification hits the claims cache as in steady state.
+For the SSE endpoint, which sends a chunk every 50 ms, the time until the
+first chunk reaches the server shows whether the stack streams it through.
+
+Run from the Backend directory (no network or Firebase project needed):
+    python benchmarks/middleware_benchmark.py --requests 20000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+import core.middleware as middleware
+from auth_benchmark import PROJECT, local_fetch, make_key_set, make_token
+from core.config import settings
+from core.token_verifier import TokenVerifier
+
+
+class BaseHTTPAuthMiddleware(BaseHTTPMiddleware):
+    """The previous ``AuthMiddleware``, with the local verifier."""
+
+    async def dispatch(self, request: Request, call_next):
+        auth_header = request.headers.get("authorization")
+        if not auth_header:
+            return JSONResponse({"detail": "Missing Authorization header"}, status_code=401)
+        try:
+            scheme, token = auth_header.split(" ")
+            request.state.user = await middleware.token_verifier.verify(token)
+        except Exception:
+            return JSONResponse({"detail": "Invalid or expired token"}, status_code=401)
+        return await call_next(request)
+
+
+class BaseHTTPTimingMiddleware(BaseHTTPMiddleware):
+    """``TimingMiddleware`` written as ``BaseHTTPMiddleware``."""
+
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        response.headers["server-timing"] = f"app;dur={(time.perf_counter() - start) * 1000:.1f}"
+        return response
+
+
+def make_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy", "service": "therapy-app-backend", "version": "0.1.0"}
+
+    @app.get("/events")
+    async def events():
+        async def body():
+            for i in range(5):
+                yield f"event: token\ndata: {i}\n\n"
+                await asyncio.sleep(0.05)
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    if stack == "base-http":
+        app.add_middleware(BaseHTTPAuthMiddleware)
+        app.add_middleware(BaseHTTPTimingMiddleware)
+    elif stack == "asgi":
+        app.add_middleware(middleware.AuthMiddleware)
+        app.add_middleware(middleware.TimingMiddleware)
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    return app
+
+
+async def call(app, path: str, token: str) -> Tuple[int, float, float]:
+    """One request through the ASGI interface; returns (status, first body chunk s, total s)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"origin", b"http://app"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    status, first_chunk, requested = 0, None, False
+    finished = asyncio.Event()
+    start = time.perf_counter()
+
+    async def receive():
+        # The request body once, then a disconnect only after the response is complete
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, first_chunk
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            if message.get("body") and first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return status, first_chunk or 0.0, time.perf_counter() - start
+
+
+async def throughput(app, tokens: List[str], requests: int) -> Tuple[float, float]:
+    """Requests per second and median latency (ms) for /health from len(tokens) clients."""
+    per_client = requests // len(tokens)
+    latencies: List[float] = []
+
+    async def client(token: str):
+        for _ in range(per_client):
+            status, _, elapsed = await call(app, "/health", token)
+            assert status == 200, status
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(token) for token in tokens))
+    total = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / total, latencies[len(latencies) // 2] * 1000
+
+
+async def run_all(args):
+    private_key, jwks = make_key_set()
+    middleware.token_verifier = TokenVerifier(PROJECT, fetch=local_fetch(jwks, []))
+    tokens = [make_token(private_key, f"user-{i}") for i in range(args.concurrency)]
+    # The auth middleware's development bypass only applies to ENVIRONMENT=dev
+    settings.environment = "benchmark"
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent clients")
+    print(f"{'stack':<10} {'req/s':>9} {'p50 ms':>8} {'SSE first chunk ms':>19} {'SSE total ms':>13}")
+    for stack in ("bare", "base-http", "asgi"):
+        app = make_app(stack)
+        # Warm up (key set, routing, first streamed response)
+        await throughput(app, tokens, min(args.requests, 1000))
+        await call(app, "/events", tokens[0])
+        rate, p50 = await throughput(app, tokens, args.requests)
+        _, first_chunk, total = await call(app, "/events", tokens[0])
+        print(f"{stack:<10} {rate:>9,.0f} {p50:>8.3f} {first_chunk * 1000:>19.1f} {total * 1000:>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="Timed /health requests per stack")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients")
+    args = parser.parse_args()
+    asyncio.run(run_all(args))
+
+
+if __name__ == "__main__":
+    main()
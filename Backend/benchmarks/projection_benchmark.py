@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Bytes read and latency of session reads with and without field masks.
+
+Seeds one user with ``--sessions`` array-layout sessions (default 500) of
+``--messages`` messages each (default 200), with running analytics state as
+the API writes it, and then times the reads behind:
+
+- listing: the ``debug_sessions`` query over all of the user's sessions
+- close check: the ``close_session`` read of one session document
+
+each with whole documents and with the projection declared in
+``core.projections``. The listing projection includes ``messages`` (so the
+debug endpoint can show first messages without a read per session), so for
+these array-layout sessions it saves only the analytics and other fields. Bytes are the JSON-encoded size of the document data
+received, which tracks the payload Firestore sends.
+
+Requires the Firestore emulator (no production data is touched):
+    gcloud emulators firestore start --host-port=localhost:8081
+    export FIRESTORE_EMULATOR_HOST=localhost:8081
+
+Run from the Backend directory:
+    python benchmarks/projection_benchmark.py --sessions 500 --messages 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from google.cloud import firestore
+
+from core.cache import json_size
+from core.message_store import message_count
+from core.projections import PROJECTIONS
+from core.repository import collect
+from core.session_analytics import ANALYTICS_FIELD, accumulate
+
+PROJECT = "demo-therapyapp"
+
+
+async def seed(client: firestore.AsyncClient, user_id: str, sessions: int, messages: int) -> None:
+    """Create array-layout sessions with running analytics state."""
+    batch, writes = client.batch(), 0
+    for i in range(sessions):
+        history = [{"text": f"Message {m}: work has been stressful and I feel tired this week.",
+                    "role": "user" if m % 2 == 0 else "generated", "time": datetime.now()}
+                   for m in range(messages)]
+        batch.set(client.collection("sessions").document(f"{user_id}-{i}"), {
+            "user_id": user_id, "created_at": datetime.now(), "messages": history,
+            ANALYTICS_FIELD: accumulate(history)
+        })
+        writes += 1
+        if writes >= 20:  # Keep each commit well under the request size limit
+            await batch.commit()
+            batch, writes = client.batch(), 0
+    await batch.commit()
+
+
+async def timed(read, runs: int):
+    """Median latency (ms) and bytes received of a read returning document dicts."""
+    samples, received = [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        docs = await read()
+        samples.append(time.perf_counter() - start)
+        received = sum(json_size(doc) for doc in docs)
+    return statistics.median(samples) * 1000, received
+
+
+async def run_all(args):
+    client = firestore.AsyncClient(project=PROJECT)
+    user_id = f"bench-projection-{time.time_ns()}"
+    await seed(client, user_id, args.sessions, args.messages)
+    query = client.collection("sessions").where("user_id", "==", user_id)
+    session_ref = client.collection("sessions").document(f"{user_id}-0")
+
+    async def listing(masked: bool):
+        selected = query.select(list(PROJECTIONS["debug_sessions"])) if masked else query
+        return [doc.to_dict() for doc in await collect(selected)]
+
+    async def close_check(masked: bool):
+        field_paths = list(PROJECTIONS["close_session"]) if masked else None
+        return [(await session_ref.get(field_paths=field_paths)).to_dict()]
+
+    print(f"{args.sessions} sessions x {args.messages} messages; median of {args.runs} runs")
+    print(f"{'read':<12} {'mode':<8} {'ms':>8} {'bytes':>12}")
+    for name, read in (("listing", listing), ("close check", close_check)):
+        for masked in (False, True):
+            latency_ms, received = await timed(lambda: read(masked), args.runs)
+            print(f"{name:<12} {'masked' if masked else 'full':<8} {latency_ms:>8.1f} {received:>12,}")
+
+    # Counts from the projection must match the full documents
+    full = await listing(False)
+    masked = await listing(True)
+    same = sorted(map(message_count, full)) == sorted(map(message_count, masked))
+    print(f"Message counts match: {'yes' if same else 'NO'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=500, help="Sessions of the benchmark user")
+    parser.add_argument("--messages", type=int, default=200, help="Messages per session")
+    parser.add_argument("--runs", type=int, default=5, help="Timed reads per mode")
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set - start the Firestore emulator first")
+
+    asyncio.run(run_all(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Cold-start cost of the app: importing ``main`` and time to the first ``/health``.
+
+Each run uses a fresh interpreter, as a new Cloud Run instance would:
+
+- import: seconds to ``import main`` (``python -c``)
+- first /health: seconds from spawning ``uvicorn main:app`` until ``GET /health``
+  first answers 200
+- RSS: resident memory of the server at the first /health, and ``--settle``
+  seconds later, once the startup warm-up (``CLIENT_WARMUP``) has created the
+  clients (Linux only)
+- ``--importtime``: the slowest imports of ``python -X importtime -c "import main"``
+  (cumulative microseconds, as reported by the interpreter), plus whether the
+  heavy SDKs (Gemini, Firebase Admin, Firestore, NumPy) were imported at all;
+  with ``--baseline-dir`` the same imports of another checkout are listed
+  alongside, so a change's effect shows per module
+
+``import_audit.py`` breaks the import cost down by package, with memory.
+
+Point ``--app-dir`` at another checkout (for example a ``git worktree`` of an
+older commit) to compare before and after. Runs with ``ENVIRONMENT=dev`` and no
+credentials, so no Google service is contacted; with real credentials the
+eager version also spends time on credential lookup and client setup.
+
+Run from the Backend directory:
+    python benchmarks/startup_benchmark.py --runs 5
+    git worktree add /tmp/before <commit> && \\
+        python benchmarks/startup_benchmark.py --app-dir /tmp/before/Backend
+    python benchmarks/startup_benchmark.py --importtime --baseline-dir /tmp/before/Backend
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("google.generativeai", "firebase_admin", "google.cloud.firestore_v1", "numpy")
+
+
+def app_env(args) -> dict:
+    env = dict(os.environ, ENVIRONMENT="dev", GEMINI_API_KEY="benchmark", JOB_STORE="memory",
+               GOOGLE_APPLICATION_CREDENTIALS="/nonexistent")
+    if args.warmup:
+        env["CLIENT_WARMUP"] = args.warmup
+    return env
+
+
+def time_import(args) -> float:
+    code = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=args.app_dir, env=app_env(args),
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid: int) -> float:
+    """Resident set size of a process in MiB (0 where /proc is unavailable)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def time_first_health(args) -> Tuple[float, float, float]:
+    """Seconds until /health answers, and the server's RSS then and after settling."""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                              cwd=args.app_dir, env=app_env(args), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < 60:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        elapsed, first_rss = time.perf_counter() - start, rss_mb(server.pid)
+                        time.sleep(args.settle)
+                        return elapsed, first_rss, rss_mb(server.pid)
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("Server did not answer /health within 60 s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def import_times(app_dir: str, args) -> Dict[str, int]:
+    """Cumulative import time (us) of every module ``import main`` loads from a Backend directory."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=app_dir,
+                            env=app_env(args), capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def import_breakdown(args) -> None:
+    after = import_times(args.app_dir, args)
+    if not args.baseline_dir:
+        print(f"\nSlowest imports (cumulative us) of {args.app_dir}:")
+        for name, cumulative in sorted(after.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{cumulative:>10,}  {name}")
+        for module in HEAVY_MODULES:
+            print(f"{module:<28} {'imported' if module in after else 'not imported'} at startup")
+        return
+
+    before = import_times(args.baseline_dir, args)
+    print(f"\nSlowest imports (cumulative us): before = {args.baseline_dir}, after = {args.app_dir}")
+    print(f"{'before':>10}  {'after':>10}  module")
+    slowest = sorted(set(before) | set(after), key=lambda name: -max(before.get(name, 0), after.get(name, 0)))
+    for name in slowest[:args.top]:
+        print(f"{before.get(name, 0):>10,}  {after.get(name, 0):>10,}  {name}")
+    for module in HEAVY_MODULES:
+        states = ["imported" if module in times else "not imported" for times in (before, after)]
+        print(f"{module:<28} {states[0]} -> {states[1]} at startup")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=BACKEND_DIR, help="Backend directory to measure")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--warmup", choices=["background", "startup", "off"],
+                        help="CLIENT_WARMUP for the server (default: the app's setting)")
+    parser.add_argument("--settle", type=float, default=3.0, help="Seconds to wait before the second RSS reading")
+    parser.add_argument("--importtime", action="store_true", help="Also print the slowest imports")
+    parser.add_argument("--baseline-dir", help="Backend directory to list alongside with --importtime (before)")
+    parser.add_argument("--top", type=int, default=15, help="Imports listed with --importtime")
+    args = parser.parse_args()
+
+    imports = [time_import(args) for _ in range(args.runs)]
+    first_health, first_rss, settled_rss = zip(*(time_first_health(args) for _ in range(args.runs)))
+    print(f"{args.app_dir}: median of {args.runs} runs")
+    print(f"{'import main':<18}{statistics.median(imports):.3f} s")
+    print(f"{'first /health':<18}{statistics.median(first_health):.3f} s")
+    print(f"{'RSS at /health':<18}{statistics.median(first_rss):.1f} MiB")
+    print(f"{f'RSS after {args.settle:g} s':<18}{statistics.median(settled_rss):.1f} MiB")
+    if args.importtime:
+        import_breakdown(args)
+
+
+if __name__ == "__main__":
+    main()
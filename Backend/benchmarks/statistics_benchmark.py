@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Read time of the statistics endpoints by number of sessions per user.
+
+For users with 100, 1,000 and 5,000 sessions spread over ``--days`` days
+(each session holding ``--messages`` messages and a summary), compares:
+
+- legacy: the original reads, streaming every session document (with its
+  messages) and every session summary for ``GET /statistics/``, and every
+  mood entry and summary for ``GET /statistics/mood-trends``
+- aggregates: ``core.daily_stats.list_daily_stats``, one document per active
+  day, which serves both endpoints
+
+Aggregates are seeded directly from the generated sessions, as
+``scripts/backfill_daily_stats.py`` would compute them.
+
+Requires the Firestore emulator (no production data is touched):
+    gcloud emulators firestore start --host-port=localhost:8081
+    export FIRESTORE_EMULATOR_HOST=localhost:8081
+
+Run from the Backend directory:
+    python benchmarks/statistics_benchmark.py --sizes 100,1000,5000 --days 90
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.cloud import firestore
+
+import core.daily_stats as daily_stats
+import core.repository as repository
+from core.daily_stats import add_summary, daily_ref, list_daily_stats, new_day
+from core.repository import collect
+
+PROJECT = "demo-therapyapp"
+EMOTION_COUNTS = {"anxiety": 2, "sad": 1, "happy": 1}
+
+
+async def seed(client: firestore.AsyncClient, user_id: str, sessions: int, days: int, messages: int) -> None:
+    """Create sessions, summaries and the matching daily aggregates."""
+    start = datetime(2025, 1, 1, 12)
+    aggregates: Dict[str, Dict] = {}
+    batch, writes = client.batch(), 0
+    for i in range(sessions):
+        created_at = start + timedelta(days=i % days, minutes=i)
+        summary = {"session_id": f"{user_id}-{i}", "user_id": user_id, "summary": "You talked about work.",
+                   "analytics": {"emotion_counts": EMOTION_COUNTS, "avg_intensity": 5},
+                   "created_at": created_at, daily_stats.COUNTED_FIELD: True}
+        batch.set(client.collection("sessions").document(f"{user_id}-{i}"), {
+            "user_id": user_id, "created_at": created_at,
+            "messages": [{"text": f"message {m} about my week", "role": "user", "time": created_at}
+                         for m in range(messages)]
+        })
+        batch.set(client.collection("session_summaries").document(f"{user_id}-{i}"), summary)
+        day_stats = aggregates.setdefault(created_at.date().isoformat(), new_day(created_at.date().isoformat()))
+        day_stats["sessions"] += 1
+        add_summary(day_stats, summary)
+        writes += 2
+        if writes >= 400:
+            await batch.commit()
+            batch, writes = client.batch(), 0
+    for day, day_stats in aggregates.items():
+        batch.set(daily_ref(user_id, day), day_stats)
+        writes += 1
+        if writes >= 400:
+            await batch.commit()
+            batch, writes = client.batch(), 0
+    await batch.commit()
+
+
+async def legacy_reads(client: firestore.AsyncClient, user_id: str) -> None:
+    """The documents the endpoints used to stream for one call each."""
+    await collect(client.collection("sessions").where("user_id", "==", user_id))
+    await collect(client.collection("session_summaries").where("user_id", "==", user_id))
+    await collect(client.collection("moods").where("user_id", "==", user_id))
+    await collect(client.collection("session_summaries").where("user_id", "==", user_id))
+
+
+async def aggregate_reads(client: firestore.AsyncClient, user_id: str) -> None:
+    """The aggregate reads of the same two endpoint calls."""
+    await list_daily_stats(user_id)
+    await list_daily_stats(user_id)
+
+
+async def timed(func, client, user_id: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await func(client, user_id)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def run_all(args):
+    client = firestore.AsyncClient(project=PROJECT)
+    # Route the data layer used by list_daily_stats to the emulator client
+    repository.db = daily_stats.db = client
+
+    print(f"{args.days} days, {args.messages} messages per session; median of {args.runs} runs")
+    print(f"{'sessions':>8} {'legacy ms':>10} {'aggregates ms':>14}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        user_id = f"bench-stats-{size}-{time.time_ns()}"
+        await seed(client, user_id, size, args.days, args.messages)
+        legacy_ms = await timed(legacy_reads, client, user_id, args.runs)
+        aggregate_ms = await timed(aggregate_reads, client, user_id, args.runs)
+        print(f"{size:>8} {legacy_ms:>10.1f} {aggregate_ms:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,5000", help="Comma-separated sessions per user")
+    parser.add_argument("--days", type=int, default=90, help="Days the sessions are spread over")
+    parser.add_argument("--messages", type=int, default=20, help="Messages stored per session")
+    parser.add_argument("--runs", type=int, default=5, help="Timed calls per mode")
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST is not set - start the Firestore emulator first")
+
+    asyncio.run(run_all(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Latency and relevance of past-session retrieval for question generation.
+
+Builds a synthetic user with N closed sessions (default 1000), each summary
+about one of several topics (work stress, sleep, family, ...), stores their
+embeddings as ``process_close`` does, and loads them into a
+``core.summary_index.SummaryIndex``. Then, for conversation tails about a
+random topic, it times ``related_summaries`` (tail embedding plus top-k
+search) and reports how often the chosen summaries are about the same topic,
+compared with picking the most recent sessions (the original behaviour).
+
+The retrieval target is under 5 ms per question for 1,000 past sessions.
+It also times keeping a loaded index current in place: adding a closed
+session's summary and removing a reopened one.
+
+Ranking runs in memory; no Firestore or Gemini is needed. With the Firestore
+emulator running, the summaries are also written to it for a fresh user and
+the index is loaded the way question generation does (``_summary_index``):
+a cold load reads every summary with its embedding, while syncing a cached
+index after its TTL lists the summaries without them:
+    gcloud emulators firestore start --host-port=localhost:8081
+    export FIRESTORE_EMULATOR_HOST=localhost:8081
+
+Run from the Backend directory:
+    python benchmarks/summary_retrieval_benchmark.py --sessions 1000 --queries 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+import api.session as session_api
+import core.repository as repository
+from api.session import related_summaries
+from core.summary_index import EMBEDDING_FIELD, SummaryIndex, embed_text
+
+TOPICS = {
+    "work": (["deadline pressure at work", "conflict with your manager", "overtime and burnout",
+              "a difficult project review"],
+             ["My boss keeps piling on tasks and the deadline is Friday.",
+              "I stayed late at the office again and I'm burned out.",
+              "The project review went badly and my manager was annoyed."]),
+    "sleep": (["trouble falling asleep", "waking up at night", "feeling exhausted from poor sleep",
+               "a new bedtime routine"],
+              ["I can't fall asleep, I lie awake until 3am.",
+               "I keep waking up at night and I'm exhausted all day.",
+               "I tried going to bed earlier but my sleep is still bad."]),
+    "family": (["an argument with your sister", "worry about your mother's health", "tension at family dinners",
+                "feeling distant from your parents"],
+               ["My sister and I had a huge argument about mom.",
+                "I'm worried about my mother, she has been sick.",
+                "Family dinner was tense again, my parents kept criticizing me."]),
+    "relationship": (["trust issues with your partner", "a breakup", "loneliness since the breakup",
+                      "planning a date night"],
+                     ["My partner and I keep fighting about trust.",
+                      "Since the breakup I feel so lonely.",
+                      "We planned a date night to reconnect."]),
+    "exercise": (["starting to run in the mornings", "joining a gym", "a knee injury stopping workouts",
+                  "feeling better after exercise"],
+                 ["I went for a run this morning and felt great.",
+                  "I finally joined the gym near my place.",
+                  "My knee hurts so I had to stop working out."]),
+    "money": (["stress about rent and bills", "debt from credit cards", "saving for a trip",
+               "a conversation about budgeting"],
+              ["I don't know how I'll pay rent this month.",
+               "The credit card debt keeps growing and it scares me.",
+               "I started a budget to save some money."]),
+}
+
+FILLER = ["You shared how this has been affecting your mood.", "You reflected on what might help next.",
+          "You noticed some progress compared to last time.", "You talked about how tired you have been."]
+
+
+class Snapshot:
+    """Stand-in for a ``session_summaries`` document snapshot."""
+
+    def __init__(self, doc_id: str, data: dict):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self) -> dict:
+        return self._data
+
+
+def make_summaries(count: int, rng: random.Random) -> List[Snapshot]:
+    """Closed sessions, most recent first, with embeddings stored at close."""
+    docs = []
+    for i in range(count):
+        topic = rng.choice(list(TOPICS))
+        text = f"You talked about {rng.choice(TOPICS[topic][0])}. {rng.choice(FILLER)}"
+        docs.append(Snapshot(f"{topic}-{i}", {"summary": text, "created_at": f"2025-01-01T00:00:{i:06d}",
+                                              EMBEDDING_FIELD: embed_text(text)}))
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000, help="Past sessions of the user")
+    parser.add_argument("--queries", type=int, default=500, help="Conversation tails to retrieve for")
+    args = parser.parse_args()
+
+    rng = random.Random(17)
+    docs = make_summaries(args.sessions, rng)
+    start = time.perf_counter()
+    index = SummaryIndex.from_docs(docs)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    latencies, related_hits, recent_hits, total = [], 0, 0, 0
+    recent = index.entries[:2]
+    for _ in range(args.queries):
+        topic = rng.choice(list(TOPICS))
+        messages = [{"role": "user" if i % 2 == 0 else "generated",
+                     "text": rng.choice(TOPICS[topic][1]) if i % 2 == 0 else "How did that feel?"}
+                    for i in range(6)]
+        start = time.perf_counter()
+        chosen = related_summaries(index, "current-session", messages)
+        latencies.append((time.perf_counter() - start) * 1000)
+        related_hits += sum(entry["session_id"].startswith(topic) for entry, _ in chosen)
+        recent_hits += sum(entry["session_id"].startswith(topic) for entry in recent)
+        total += 2
+
+    latencies.sort()
+    print(f"{args.sessions} past sessions, {args.queries} queries; index built in {build_ms:.1f} ms "
+          f"({index.nbytes / 1024:.0f} KiB)")
+    print(f"retrieval ms: p50 {statistics.median(latencies):.3f}  "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.3f}  max {latencies[-1]:.3f}")
+    print(f"summaries on the current topic: related {related_hits / total:.0%}, "
+          f"most recent {recent_hits / total:.0%}")
+
+    # A just-closed session is the most recent one
+    closed = {**make_summaries(1, rng)[0].to_dict(), "created_at": "2025-01-02T00:00:000000"}
+    add_times, remove_times = [], []
+    for _ in range(20):
+        start = time.perf_counter()
+        index.add("closed-session", closed, limit=args.sessions + 1)
+        add_times.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        index.remove("closed-session")
+        remove_times.append((time.perf_counter() - start) * 1000)
+    add_ms, remove_ms = statistics.median(add_times), statistics.median(remove_times)
+    print(f"in-place update ms: add on close {add_ms:.2f}  remove on reopen {remove_ms:.2f}")
+
+    if os.getenv("FIRESTORE_EMULATOR_HOST"):
+        asyncio.run(time_firestore_load(docs))
+    else:
+        print("Firestore load: skipped (FIRESTORE_EMULATOR_HOST is not set)")
+
+
+async def time_firestore_load(docs: List[Snapshot]) -> None:
+    """Load the index from the emulator cold and sync it as a cached index past its TTL."""
+    from google.cloud import firestore
+
+    client = firestore.AsyncClient(project="demo-therapyapp")
+    # Route the data layer used by _summary_index to the emulator client
+    repository.db = session_api.db = client
+    user_id = f"bench-summaries-{time.time_ns()}"
+    for first in range(0, len(docs), 500):
+        batch = client.batch()
+        for doc in docs[first:first + 500]:
+            batch.set(client.collection("session_summaries").document(f"{user_id}-{doc.id}"),
+                      {**doc.to_dict(), "user_id": user_id})
+        await batch.commit()
+
+    start = time.perf_counter()
+    index = await session_api._summary_index(user_id)
+    cold_ms = (time.perf_counter() - start) * 1000
+    index.synced_at -= session_api.settings.context_cache_ttl
+    start = time.perf_counter()
+    await session_api._summary_index(user_id)
+    sync_ms = (time.perf_counter() - start) * 1000
+    print(f"Firestore load ms ({len(index)} summaries): cold {cold_ms:.1f}  sync after TTL {sync_ms:.1f}")
+
+
+if __name__ == "__main__":
+    main()
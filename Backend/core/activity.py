@@ -0,0 +1,119 @@
+"""
+User Activity Streak Module
+
+This module keeps each user's activity counters up to date as sessions start,
+so ``GET /statistics/`` reads them from one document instead of parsing every
+session's ``created_at``.
+
+Storage:
+- user_summaries/{uid}.activity:
+    total_sessions: sessions started
+    active_dates: distinct days with a session
+    last_active_date: latest such day (``YYYY-MM-DD``)
+    current_streak: consecutive days ending at last_active_date
+    longest_streak: longest run of consecutive days so far
+    timezone: IANA time zone the days are counted in
+
+Days are calendar days in the user's time zone (sent when a session starts,
+otherwise the last one used, otherwise ``settings.default_timezone``), so a
+late-evening session counts towards the user's day rather than the server's.
+The same local day is stored on the session as ``day`` and used for its
+daily statistics. ``scripts/backfill_activity.py`` computes the counters for
+users whose sessions predate them.
+
+Usage:
+    from core.activity import local_day, record_activity
+
+    day = local_day(timezone_name)
+    activity = record_activity(activity, day, timezone_name)
+"""
+
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from core.config import settings
+import logging
+
+# Configure logging for activity tracking
+logger = logging.getLogger(__name__)
+
+# user_summaries field holding the counters, and the session field holding its local day
+ACTIVITY_FIELD = "activity"
+DAY_FIELD = "day"
+
+
+def resolve_timezone(name: Optional[str]) -> str:
+    """A valid IANA time zone name: ``name`` if known, else the default."""
+    if name:
+        try:
+            ZoneInfo(name)
+            return name
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning(f"Unknown time zone {name!r}, using {settings.default_timezone}")
+    return settings.default_timezone
+
+
+def local_day(timezone_name: str, moment: Optional[datetime] = None) -> str:
+    """
+    The calendar day (``YYYY-MM-DD``) of a moment in a time zone.
+
+    Args:
+        timezone_name (str): IANA time zone (see ``resolve_timezone``)
+        moment (datetime, optional): Defaults to now; naive values are taken
+            as server local time, as ``created_at`` is stored
+    """
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return moment.astimezone(ZoneInfo(timezone_name)).date().isoformat()
+
+
+def new_activity(timezone_name: str) -> Dict[str, Any]:
+    """Counters for a user without sessions."""
+    return {
+        "total_sessions": 0,
+        "active_dates": 0,
+        "last_active_date": None,
+        "current_streak": 0,
+        "longest_streak": 0,
+        "timezone": timezone_name,
+    }
+
+
+def record_activity(activity: Optional[Dict[str, Any]], day: str, timezone_name: str) -> Dict[str, Any]:
+    """
+    Return the counters after a session started on ``day``.
+
+    A session on the day after ``last_active_date`` extends the streak, one on
+    the same day only counts the session, and a later gap starts a new streak.
+    Days before ``last_active_date`` (for example after a time zone change)
+    only count the session, since whether that day was already active is unknown.
+    """
+    activity = dict(activity or new_activity(timezone_name))
+    activity["total_sessions"] += 1
+    activity["timezone"] = timezone_name
+    last = activity["last_active_date"]
+
+    if last is None or day > last:
+        gap = (date.fromisoformat(day) - date.fromisoformat(last)).days if last else None
+        activity["current_streak"] = activity["current_streak"] + 1 if gap == 1 else 1
+        activity["active_dates"] += 1
+        activity["last_active_date"] = day
+        activity["longest_streak"] = max(activity["longest_streak"], activity["current_streak"])
+    return activity
+
+
+def activity_from_days(days: Iterable[str], total_sessions: int, timezone_name: str) -> Dict[str, Any]:
+    """Counters recomputed from every day with a session (used by the backfill)."""
+    activity = new_activity(timezone_name)
+    previous = None
+    for day in sorted(set(days)):
+        current = date.fromisoformat(day)
+        activity["current_streak"] = activity["current_streak"] + 1 \
+            if previous and (current - previous).days == 1 else 1
+        activity["longest_streak"] = max(activity["longest_streak"], activity["current_streak"])
+        activity["active_dates"] += 1
+        activity["last_active_date"] = day
+        previous = current
+    activity["total_sessions"] = total_sessions
+    return activity
@@ -2,11 +2,14 @@
 Authentication Module
 
 This module provides authentication functionality for the therapy app API.
-It handles Firebase ID token verification and provides development bypasses
-for easier testing and development.
+Firebase ID tokens are verified by ``core.middleware.AuthMiddleware`` (see
+``core.token_verifier``), which stores the decoded claims on
+``request.state.user``; the dependency here only reads them, so endpoints
+never verify a token themselves. Without the middleware (demo mode) a test
+user is returned.
 
 Features:
-- Firebase ID token validation
+- Firebase ID token claims from the auth middleware
 - Development mode authentication bypass
 - FastAPI dependency injection for protected endpoints
 - User context extraction from JWT tokens
@@ -21,9 +24,8 @@ Usage:
         # ... endpoint logic
 """
 
-from fastapi import Header, HTTPException, Depends
+from fastapi import HTTPException, Depends, Request
 from core.config import settings
-from core.firebase import auth_client
 from typing import Dict, Any
 import logging
 
@@ -31,19 +33,23 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-async def get_current_user(authorization: str = Header(None)) -> Dict[str, Any]:
+async def get_current_user(request: Request) -> Dict[str, Any]:
     """
     FastAPI dependency for user authentication and authorization.
     
-    For demo purposes, this always returns a test user to make the API
-    easily accessible without authentication setup.
+    Returns the claims the auth middleware verified for this request. When
+    the middleware is not installed (AUTH_ENABLED=false, the demo setup) a
+    test user is returned so the API stays accessible without authentication.
     
     Args:
-        authorization (str, optional): Authorization header (ignored in demo mode)
+        request (Request): Incoming request carrying ``state.user``
         
     Returns:
-        Dict[str, Any]: Test user information for demo purposes
+        Dict[str, Any]: Verified token claims (``uid``, ``email``, ...) or the test user
     """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
     
     # Demo mode: always return test user for easy demonstration
     logger.debug("Demo mode: using test user for all requests")
@@ -0,0 +1,318 @@
+"""
+Caching Module
+
+This module provides the cache tiers used to avoid repeating expensive work
+(such as identical Gemini calls):
+
+- LRUCache: in-process, least-recently-used eviction bounded by entry count
+  and total size, with per-entry TTLs
+- SQLiteCache: optional on-disk tier in a local SQLite file, bounded by total
+  size, so entries survive restarts and are shared by worker processes
+- TieredCache: memory first, then disk (disk hits are promoted to memory)
+
+Every tier counts hits, misses, evictions and expirations; ``stats()`` returns
+them for monitoring.
+
+Usage:
+    from core.cache import LRUCache, SQLiteCache, TieredCache
+
+    cache = TieredCache(LRUCache(max_entries=1024, ttl=3600), SQLiteCache("cache.sqlite3"))
+    value = await cache.get(key)
+    if value is MISSING:
+        value = await compute()
+        await cache.set(key, value)
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Returned by get() when a key is absent or expired (so None can be cached)
+MISSING = object()
+
+
+def json_size(value: Any) -> int:
+    """Approximate the size of a value as its JSON encoding in bytes."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+def _new_stats() -> Dict[str, int]:
+    return {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expirations": 0}
+
+
+def hit_rate(stats: Dict[str, Any]) -> float:
+    """Fraction of lookups that were hits."""
+    lookups = stats["hits"] + stats["misses"]
+    return round(stats["hits"] / lookups, 4) if lookups else 0.0
+
+
+class LRUCache:
+    """
+    In-memory LRU cache with TTLs and entry-count / byte-size bounds.
+
+    Args:
+        max_entries (int): Maximum number of entries
+        max_bytes (int, optional): Maximum total size of values (per ``sizeof``)
+        ttl (float, optional): Default time to live in seconds (None = no expiry)
+        sizeof (Callable): Estimates the size of a value in bytes
+    """
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None, ttl: Optional[float] = None,
+                 sizeof: Callable[[Any], int] = json_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = _new_stats()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return MISSING
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Larger than the whole cache; never worth storing
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            self._stats["sets"] += 1
+            while len(self._entries) > self.max_entries or \
+                    (self.max_bytes is not None and self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def peek(self, key: str) -> Any:
+        """Like ``get``, but without counting a lookup or refreshing the entry's recency."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+                return MISSING
+            return entry[0]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every key starting with ``prefix``; returns how many were removed."""
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+        stats["hit_rate"] = hit_rate(stats)
+        return stats
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+class SQLiteCache:
+    """
+    On-disk cache tier in a SQLite file, evicting least recently used entries by size.
+
+    Values must be JSON-serializable. Methods are synchronous; ``TieredCache``
+    calls them from a worker thread.
+
+    Args:
+        path (str): SQLite database file
+        max_bytes (int): Maximum total size of stored values
+        ttl (float, optional): Default time to live in seconds (None = no expiry)
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            expires_at REAL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at);
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, ttl: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stats = _new_stats()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened lazily so importing the module never touches the filesystem
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self._SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Any:
+        return self.get_with_ttl(key)[0]
+
+    def get_with_ttl(self, key: str) -> Tuple[Any, Optional[float]]:
+        """Value of a key (or ``MISSING``) and its remaining time to live in seconds (None = no expiry)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return MISSING, None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return MISSING, None
+            conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._stats["hits"] += 1
+        return json.loads(value), expires_at - now if expires_at is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        encoded = json.dumps(value, default=str)
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, size, expires_at, now)
+            )
+            self._stats["sets"] += 1
+            self._evict(conn, now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            cursor = self._connection().execute(
+                "DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+            stats = dict(self._stats, entries=entries, bytes=total)
+        stats["hit_rate"] = hit_rate(stats)
+        return stats
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        removed = conn.execute(
+            "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        self._stats["expirations"] += max(removed, 0)
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the tier is back under its bound
+        excess = total - self.max_bytes
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed_at").fetchall():
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._stats["evictions"] += 1
+            excess -= size
+            if excess <= 0:
+                break
+
+
+class TieredCache:
+    """
+    Memory tier in front of an optional disk tier.
+
+    Lookups check memory, then disk; a disk hit is copied into memory for the
+    rest of its lifetime on disk. Writes go to both tiers.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    async def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not MISSING or self.disk is None:
+            return value
+        value, ttl = await asyncio.to_thread(self.disk.get_with_ttl, key)
+        if value is not MISSING:
+            # Entries without an expiry get the memory tier's default TTL
+            self.memory.set(key, value, ttl)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.delete, key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        self.memory.delete_prefix(prefix)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.delete_prefix, prefix)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tier counters plus overall hits/misses (a miss is a miss in every tier)."""
+        memory = self.memory.stats()
+        stats: Dict[str, Any] = {"memory": memory}
+        if self.disk is None:
+            stats.update(hits=memory["hits"], misses=memory["misses"])
+        else:
+            disk = self.disk.stats()
+            stats.update(disk=disk, hits=memory["hits"] + disk["hits"], misses=disk["misses"])
+        stats["hit_rate"] = hit_rate(stats)
+        return stats
@@ -34,6 +34,32 @@ class Settings(BaseSettings):
     # Firebase/Google Cloud configuration
     google_application_credentials: Optional[str] = None  # Path to service account JSON file
     
+    # Firebase ID token verification (see core/token_verifier.py): AUTH_ENABLED
+    # installs the auth middleware; tokens are checked against Google's signing
+    # keys (cached for their Cache-Control max-age) and the verified claims of up
+    # to auth_token_cache_size tokens are kept until each token expires
+    auth_enabled: bool = False
+    firebase_project_id: Optional[str] = None  # Defaults to the Firebase app's project
+    auth_jwks_url: str = "https://www.googleapis.com/service_accounts/v1/jwk/securetoken@system.gserviceaccount.com"
+    auth_token_cache_size: int = 10000
+    auth_clock_skew: int = 0
+    
+    # Firestore and Gemini clients are created on first use; at startup they
+    # are warmed up concurrently while serving ("background"), before serving
+    # ("startup") or not at all ("off")
+    client_warmup: str = "background"
+    
+    # Requests taking at least slow_request_ms (until the last response chunk)
+    # are logged as warnings by the timing middleware
+    slow_request_ms: float = 5000
+    
+    # Prometheus metrics at GET /metrics; when disabled the endpoint is not
+    # served and Firestore calls are not wrapped for timing. With auth enabled
+    # /metrics needs a token like any route unless metrics_public is set (only
+    # when the endpoint is reachable from the scraper's private network alone)
+    metrics_enabled: bool = True
+    metrics_public: bool = False
+    
     # SSL configuration for HTTPS (optional in development)
     ssl_cert_file: Optional[str] = None  # Path to SSL certificate file
     
@@ -43,6 +69,90 @@ class Settings(BaseSettings):
     # Database configuration (inherited from Firebase)
     # Firestore is configured through the service account credentials
     
+    # Session message storage for new sessions: "subcollection" (sessions/{id}/messages)
+    # or "array" (messages array on the session document, original layout)
+    message_storage: str = "subcollection"
+    
+    # Question generation context: the most recent question_context_window
+    # messages verbatim, trimmed to question_context_tokens (estimated locally);
+    # older messages are folded into a rolling summary that is refreshed every
+    # question_summary_step messages
+    question_context_window: int = 20
+    question_context_tokens: int = 1500
+    question_summary_step: int = 10
+    
+    # Time zone that activity streaks and daily statistics count days in for
+    # users whose app has not sent one (IANA name, see core/activity.py)
+    default_timezone: str = "UTC"
+    
+    # Firestore data access: "async" (native AsyncClient) or "threaded"
+    # (synchronous client on a dedicated thread pool of firestore_threads workers)
+    firestore_client: str = "async"
+    firestore_threads: int = 32
+    # Read only the fields each endpoint uses (see core/projections.py)
+    firestore_field_masks: bool = True
+    
+    # Per-stage timeouts (seconds) for session close; a stage that times out
+    # contributes a fallback value and the close returns partial results
+    close_summary_timeout: float = 30.0
+    close_goals_timeout: float = 30.0
+    close_overall_summary_timeout: float = 30.0
+    
+    # Background jobs (session close post-processing): store is "sqlite"
+    # (job_store_path, persistent) or "memory"; failed attempts are retried with
+    # exponential backoff starting at job_retry_base_delay seconds; finished
+    # jobs are kept job_retention_seconds for status polls, then deleted
+    job_store: str = "sqlite"
+    job_store_path: str = "jobs.sqlite3"
+    job_workers: int = 4
+    job_max_attempts: int = 4
+    job_retry_base_delay: float = 2.0
+    job_retry_max_delay: float = 60.0
+    job_lease_seconds: float = 300.0
+    job_retention_seconds: float = 7 * 86400
+    
+    # Gemini response cache: in-memory LRU (entry and byte bounds) plus an
+    # optional SQLite tier at llm_cache_path; TTLs in seconds, shorter for
+    # follow-up questions so regenerating one eventually yields a fresh reply
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024
+    llm_cache_max_bytes: int = 16 * 1024 * 1024
+    llm_cache_ttl: float = 24 * 3600
+    llm_cache_followup_ttl: float = 300
+    llm_cache_path: Optional[str] = None
+    llm_cache_disk_max_bytes: int = 256 * 1024 * 1024
+    
+    # Per-user historical context for question generation (recent session
+    # summaries and active goals), invalidated when sessions close or goals are
+    # tracked; the TTL bounds staleness across processes sharing context_cache_path
+    context_cache_enabled: bool = True
+    context_cache_max_entries: int = 4096
+    context_cache_ttl: float = 600
+    context_cache_path: Optional[str] = None
+    
+    # Minimum TF-IDF cosine similarity for a detected goal to count as one of
+    # the user's existing goals (see benchmarks/goal_match_eval.py to tune)
+    goal_match_threshold: float = 0.45
+    
+    # Past sessions related to the current conversation: summaries are hashed
+    # into summary_embedding_dims dimensions at close, and each user's
+    # summary_retrieval_max_sessions latest ones are ranked against the last
+    # summary_retrieval_tail messages; results below summary_retrieval_min_score
+    # give way to the most recent sessions
+    summary_embedding_dims: int = 256
+    summary_retrieval_max_sessions: int = 1000
+    summary_retrieval_tail: int = 6
+    summary_retrieval_min_score: float = 0.1
+    summary_index_max_bytes: int = 64 * 1024 * 1024
+    
+    # Gemini calls run on their own pool of llm_threads threads with at most
+    # llm_max_concurrency in flight; up to llm_max_queue callers wait (each for
+    # llm_queue_timeout seconds) and further calls get a fallback response
+    llm_threads: int = 16
+    llm_max_concurrency: int = 16
+    llm_max_queue: int = 64
+    llm_queue_timeout: float = 10.0
+    
     class Config:
         """
         Pydantic configuration for settings loading.
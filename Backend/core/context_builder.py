@@ -0,0 +1,149 @@
+"""
+Conversation Context Builder Module
+
+This module bounds the conversation part of follow-up question prompts, so
+prompt size, latency and cost stay flat however long a session grows:
+
+- the most recent turns are kept verbatim, newest first, until the token
+  budget is used up (tokens are counted locally, no API call)
+- older turns are folded into a short rolling summary stored on the session
+  document; it is only recomputed when the window has slid by a full step,
+  and then only from the previous summary plus the turns that slid out
+
+Storage:
+- sessions/{session_id}.context_summary: {"text": rolling summary,
+  "through": number of leading messages it covers}
+
+Usage:
+    from core.context_builder import build_context
+
+    context = await build_context(session_ref, session_data)
+    prompt_turns, earlier_summary = context["turns"], context["summary"]
+"""
+
+import math
+import re
+from typing import Any, Dict, List
+from core.config import settings
+from core.genkit_gemini import summarize_conversation_window
+from core.message_store import message_count, page_messages, tail_messages
+import logging
+
+# Configure logging for context building
+logger = logging.getLogger(__name__)
+
+# Session document field holding the rolling summary of older turns
+SUMMARY_FIELD = "context_summary"
+
+# Words, numbers and individual punctuation marks
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+# Per-turn overhead for the speaker label and line break
+TURN_OVERHEAD = 3
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the model tokens in a text locally.
+
+    Every punctuation mark is one token and words cost one token per six
+    characters, which slightly overestimates typical subword tokenizers on
+    English prose, so budgets are conservative.
+    """
+    return sum(math.ceil(len(piece) / 6) for piece in _PIECES.findall(text))
+
+
+def turn_tokens(message: Dict[str, Any]) -> int:
+    """Estimated tokens a message contributes to a prompt."""
+    return count_tokens(message.get("text", "")) + TURN_OVERHEAD
+
+
+def fit_turns(messages: List[dict], budget: int) -> List[dict]:
+    """
+    Keep the most recent messages whose estimated tokens fit the budget.
+
+    The newest message is always kept, so a prompt never loses the turn being
+    answered.
+
+    Args:
+        messages (List[dict]): Messages in chronological order
+        budget (int): Token budget for the kept messages
+
+    Returns:
+        List[dict]: The kept messages in chronological order
+    """
+    kept: List[dict] = []
+    used = 0
+    for message in reversed(messages):
+        if not message.get("text", "").strip():
+            continue
+        tokens = turn_tokens(message)
+        if kept and used + tokens > budget:
+            break
+        kept.append(message)
+        used += tokens
+    kept.reverse()
+    return kept
+
+
+def summary_target(total: int, window: int, step: int) -> int:
+    """
+    Number of leading messages the rolling summary should cover.
+
+    Advances in multiples of ``step`` so the summary is recomputed once every
+    ``step`` messages, leaving between ``window`` and ``window + step - 1``
+    messages after it.
+    """
+    if total <= window:
+        return 0
+    return (total - window) // step * step
+
+
+async def build_context(session_ref, session_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the token-budgeted conversation context for a follow-up prompt.
+
+    Folds messages that slid out of the verbatim window into the stored rolling
+    summary first, when due. If summarizing fails the previous summary is kept
+    and retried on the next call; an empty summary still counts as done, so
+    the same turns are not summarized again.
+
+    Args:
+        session_ref: Firestore reference of the session document
+        session_data (Dict[str, Any]): Session document
+
+    Returns:
+        Dict[str, Any]: ``turns`` (recent messages, chronological), ``summary``
+            (rolling summary of older messages, may be empty), ``tokens``
+            (estimated total) and ``summarized_through``
+    """
+    total = message_count(session_data)
+    window = settings.question_context_window
+    step = max(1, settings.question_summary_step)
+
+    state = session_data.get(SUMMARY_FIELD) or {}
+    summary, through = state.get("text", ""), state.get("through", 0)
+    if through > total:
+        summary, through = "", 0
+
+    target = summary_target(total, window, step)
+    if target > through:
+        slid_out, _ = await page_messages(session_ref, session_data,
+                                          cursor=through - 1 if through else None, limit=target - through)
+        updated = await summarize_conversation_window(summary, slid_out)
+        if updated is not None:
+            summary, through = updated, target
+            await session_ref.update({SUMMARY_FIELD: {"text": summary, "through": through}})
+            logger.info(f"Context summary for session {session_ref.id} now covers {through} messages")
+
+    # Messages after the summary; capped in case summarizing keeps failing
+    limit = min(total - through, window + step)
+    recent = await tail_messages(session_ref, session_data, limit) if limit > 0 else []
+    summary_tokens = count_tokens(summary) if summary else 0
+    turns = fit_turns(recent, settings.question_context_tokens - summary_tokens)
+    return {
+        "turns": turns,
+        "summary": summary,
+        "tokens": summary_tokens + sum(turn_tokens(message) for message in turns),
+        "summarized_through": through,
+    }
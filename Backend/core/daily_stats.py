@@ -0,0 +1,172 @@
+"""
+Daily Statistics Module
+
+This module maintains per-user, per-day aggregates so the statistics endpoints
+read one small document per active day instead of every session (with its
+messages), summary and mood entry the user has.
+
+Storage:
+- users/{uid}/daily_stats/{YYYY-MM-DD}:
+    date: the day (also the document id)
+    sessions: sessions started that day
+    summaries: sessions of that day that are summarized
+    moods: per-mood counts from summary analytics and direct mood entries
+    mood_entries: direct ``moods`` entries recorded that day
+    emotion_sums: per-emotion sum of the summaries' emotion counts
+
+Days are the user's local days stored on the session (``core.activity``);
+older sessions fall back to the server date of ``created_at``. ``sessions`` is
+incremented in the transaction that creates a session. Summary fields are
+updated inside the close and reopen transactions: a close adds the summary's
+contribution to the day the session started (re-closing first
+subtracts the previous summary) and a reopen subtracts it. Summaries carry a
+``daily_counted`` flag once they are part of an aggregate, so summaries stored
+before the aggregates existed are never subtracted. Users with such history
+are filled in by ``scripts/backfill_daily_stats.py``, which can also be re-run
+to correct drift.
+
+Usage:
+    from core.daily_stats import list_daily_stats, record_session
+
+    record_session(transaction, user_id, day)
+    days = await list_daily_stats(user_id)
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from core.activity import DAY_FIELD
+from core.emotion_analysis import EMOTIONS
+from core.repository import collect, db
+import logging
+
+# Configure logging for daily statistics
+logger = logging.getLogger(__name__)
+
+# Collection layout
+USERS_COLLECTION = "users"
+DAILY_SUBCOLLECTION = "daily_stats"
+
+# session_summaries flag marking a summary counted in its day's aggregate
+COUNTED_FIELD = "daily_counted"
+
+
+def day_key(value: Any) -> Optional[str]:
+    """
+    The day (``YYYY-MM-DD``) of a stored timestamp.
+
+    Handles datetime objects, Firestore timestamps and ISO strings; returns
+    None for values that cannot be parsed.
+    """
+    if not value:
+        return None
+    try:
+        if hasattr(value, "date"):
+            return value.date().isoformat()
+        if hasattr(value, "seconds"):  # Firestore timestamp
+            return datetime.fromtimestamp(value.seconds).date().isoformat()
+        return datetime.fromisoformat(str(value)).date().isoformat()
+    except Exception as e:
+        logger.warning(f"Could not parse date {value}: {e}")
+        return None
+
+
+def summary_day(document: Dict[str, Any]) -> Optional[str]:
+    """The day a session or session summary counts towards."""
+    return document.get(DAY_FIELD) or day_key(document.get("created_at"))
+
+
+def daily_ref(user_id: str, day: str):
+    """Firestore reference of a user's aggregate for one day."""
+    return db.collection(USERS_COLLECTION).document(user_id)\
+        .collection(DAILY_SUBCOLLECTION).document(day)
+
+
+def new_day(day: str) -> Dict[str, Any]:
+    """Aggregate for a day with no activity."""
+    return {
+        "date": day,
+        "sessions": 0,
+        "summaries": 0,
+        "moods": {},
+        "mood_entries": 0,
+        "emotion_sums": {emotion: 0 for emotion in EMOTIONS},
+    }
+
+
+def record_session(writer, user_id: str, day: str) -> None:
+    """Count a new session on its day through a batch or transaction."""
+    from google.cloud.firestore_v1 import Increment
+
+    writer.set(daily_ref(user_id, day), {"date": day, "sessions": Increment(1)}, merge=True)
+
+
+def add_summary(day_stats: Dict[str, Any], session_summary: Dict[str, Any], sign: int = 1) -> None:
+    """
+    Add (``sign=1``) or subtract (``sign=-1``) one session summary's contribution in place.
+
+    Args:
+        day_stats (Dict[str, Any]): Aggregate of the summary's day
+        session_summary (Dict[str, Any]): A ``session_summaries`` document
+        sign (int): 1 to add, -1 to subtract
+    """
+    analytics = session_summary.get("analytics") or {}
+    day_stats["summaries"] = day_stats.get("summaries", 0) + sign
+    moods = day_stats.setdefault("moods", {})
+    for mood, count in analytics.get("mood_counts", {}).items():
+        moods[mood] = moods.get(mood, 0) + sign * count
+    sums = day_stats.setdefault("emotion_sums", {})
+    for emotion, count in analytics.get("emotion_counts", {}).items():
+        sums[emotion] = sums.get(emotion, 0) + sign * count
+
+
+def add_mood_entry(day_stats: Dict[str, Any], mood_entry: Dict[str, Any]) -> None:
+    """Add one direct ``moods`` entry in place."""
+    mood = mood_entry.get("mood")
+    if mood:
+        day_stats["mood_entries"] = day_stats.get("mood_entries", 0) + 1
+        day_stats.setdefault("moods", {})[mood] = day_stats.get("moods", {}).get(mood, 0) + 1
+
+
+async def apply_summary_change(transaction, added: Optional[Dict[str, Any]],
+                               removed: Optional[Dict[str, Any]] = None) -> List[Tuple[Any, Dict[str, Any]]]:
+    """
+    Read, inside a transaction, the aggregates touched by replacing one summary with another.
+
+    ``removed`` (a stored summary, subtracted only if it was counted) and
+    ``added`` (the summary about to be written, which is flagged as counted)
+    may each be None. No writes are made, so the caller can keep doing its
+    own reads; pass the result to ``write_days`` afterwards.
+
+    Returns:
+        List of (reference, updated aggregate) pairs to write
+    """
+    days: Dict[Tuple[str, str], Tuple[Any, Dict[str, Any]]] = {}
+    for session_summary, sign in ((removed, -1), (added, 1)):
+        if not session_summary or (sign < 0 and not session_summary.get(COUNTED_FIELD)):
+            continue
+        user_id, day = session_summary.get("user_id"), summary_day(session_summary)
+        if not user_id or not day:
+            continue
+        if (user_id, day) not in days:
+            ref = daily_ref(user_id, day)
+            snapshot = await ref.get(transaction=transaction)
+            days[(user_id, day)] = (ref, {**new_day(day), **(snapshot.to_dict() or {})})
+        add_summary(days[(user_id, day)][1], session_summary, sign)
+        if sign > 0:
+            session_summary[COUNTED_FIELD] = True
+    return list(days.values())
+
+
+def write_days(writer, days: List[Tuple[Any, Dict[str, Any]]]) -> None:
+    """Write back the summary fields of aggregates from ``apply_summary_change``."""
+    for ref, day_stats in days:
+        # "sessions" is left out so concurrent session starts are never overwritten
+        writer.set(ref, {field: day_stats[field] for field in ("date", "summaries", "moods", "emotion_sums")},
+                   merge=True)
+
+
+async def list_daily_stats(user_id: str) -> List[Dict[str, Any]]:
+    """All of a user's daily aggregates, most recent day first."""
+    query = db.collection(USERS_COLLECTION).document(user_id).collection(DAILY_SUBCOLLECTION)
+    days = [{**new_day(doc.id), **(doc.to_dict() or {})} for doc in await collect(query)]
+    return sorted(days, key=lambda day_stats: day_stats["date"], reverse=True)
@@ -0,0 +1,367 @@
+"""
+Emotion Analysis Module
+
+This module provides the keyword-based emotion and intensity analysis used for
+session analytics. The emotion lexicon, intensifier words and punctuation
+features are compiled once at import time into a single trie-shaped regular
+expression, so each message is classified in one pass instead of re-searching
+the text once per keyword. Per-token results are memoized, which keeps the
+cost of long sessions proportional to the number of words analyzed.
+
+Matching semantics are the same as plain substring checks (``keyword in text``):
+every term that occurs anywhere in the lowercased message is detected, including
+terms that overlap or are contained in longer terms.
+
+The analysis is expressed as additive totals (a "running-analytics state"),
+so a session's analytics can be maintained one message at a time and
+materialized in O(1) with ``analytics_from_state``; ``analyze_messages`` is the
+same computation applied to a full message list.
+
+Usage:
+    from core.emotion_analysis import analyze_messages
+
+    analytics = analyze_messages(session_data.get("messages", []))
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+import logging
+
+# Configure logging for emotion analysis
+logger = logging.getLogger(__name__)
+
+# Emotions reported by the analysis, in the order they appear in results
+EMOTIONS = (
+    "anxiety", "happy", "sad", "disgust", "fear",
+    "anger", "envy", "embarrassment", "content", "relief"
+)
+
+# Comprehensive emotion keywords - each message can contribute to multiple emotions
+EMOTION_KEYWORDS = {
+    "anxiety": ["anxious", "worried", "nervous", "stress", "panic", "fear", "scared", "overwhelmed", "tense", "uneasy"],
+    "happy": ["happy", "joy", "joyful", "excited", "great", "wonderful", "amazing", "fantastic", "thrilled", "cheerful", "delighted"],
+    "sad": ["sad", "depressed", "down", "unhappy", "miserable", "tearful", "crying", "grieving", "heartbroken", "melancholy"],
+    "disgust": ["disgusted", "grossed out", "revolted", "sickened", "repulsed", "appalled", "nauseated"],
+    "fear": ["afraid", "terrified", "frightened", "scared", "fearful", "petrified", "alarmed", "spooked"],
+    "anger": ["angry", "mad", "furious", "irritated", "frustrated", "rage", "annoyed", "livid", "pissed", "heated"],
+    "envy": ["envious", "jealous", "resentful", "covet", "bitter", "green with envy", "wish I had"],
+    "embarrassment": ["embarrassed", "ashamed", "humiliated", "mortified", "awkward", "self-conscious", "uncomfortable"],
+    "content": ["content", "satisfied", "peaceful", "calm", "serene", "comfortable", "at ease", "relaxed"],
+    "relief": ["relieved", "grateful", "thankful", "better", "freed", "unburdened", "lifted weight"]
+}
+
+# Words that raise the intensity of a message
+INTENSIFIERS = ["very", "extremely", "really", "so", "too"]
+
+# Feature tags produced by the matcher alongside emotion names
+EXCLAMATION = "!"
+QUESTION = "?"
+INTENSIFIER = "intensifier"
+
+# Number of distinct tokens whose classification is memoized
+TOKEN_CACHE_SIZE = 65536
+
+# Fallback distribution used when no emotion keywords are detected
+DEFAULT_EMOTION_PERCENTAGES = {
+    "anxiety": 0.05, "happy": 0.10, "sad": 0.05, "disgust": 0.05, "fear": 0.05,
+    "anger": 0.05, "envy": 0.05, "embarrassment": 0.05, "content": 0.50, "relief": 0.05
+}
+
+
+def _build_term_tags() -> Dict[str, FrozenSet[str]]:
+    """
+    Map every lexicon term to the set of tags it implies.
+
+    A term also implies the tags of every shorter term it contains (e.g.
+    "fearful" contains "fear"), which lets the matcher report only the longest
+    term starting at each position without losing substring matches.
+    """
+    tags: Dict[str, set] = {}
+    for emotion, keywords in EMOTION_KEYWORDS.items():
+        for keyword in keywords:
+            tags.setdefault(keyword, set()).add(emotion)
+    for word in INTENSIFIERS:
+        tags.setdefault(word, set()).add(INTENSIFIER)
+    tags.setdefault(EXCLAMATION, set()).add(EXCLAMATION)
+    tags.setdefault(QUESTION, set()).add(QUESTION)
+
+    return {
+        term: frozenset().union(*(other_tags for other, other_tags in tags.items() if other in term))
+        for term in tags
+    }
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Build a regex that matches the longest of ``terms`` at a position.
+
+    Terms are folded into a character trie so the regex engine rejects a
+    position after a single character comparison instead of trying every
+    alternative in turn.
+    """
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if "" in node:
+            # A term ends here; prefer the longer continuation (greedy) when present
+            return "(?:" + "|".join(branches) + ")?"
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    return render(trie)
+
+
+_TERM_TAGS = _build_term_tags()
+_TERM_PATTERN = re.compile(_trie_pattern(_TERM_TAGS))
+_MULTIWORD_TERMS = tuple((term, tags) for term, tags in _TERM_TAGS.items() if any(c.isspace() for c in term))
+_NO_TAGS: FrozenSet[str] = frozenset()
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _token_tags(token: str) -> FrozenSet[str]:
+    """
+    Return the tags present in a single whitespace-free token.
+
+    Searching again from the character after each match start visits every
+    position where a term could begin, so overlapping terms are all found.
+    Results are memoized because conversational vocabulary repeats heavily.
+    """
+    found = set()
+    search = _TERM_PATTERN.search
+    match = search(token)
+    while match:
+        found |= _TERM_TAGS[match.group()]
+        match = search(token, match.start() + 1)
+    return frozenset(found)
+
+
+def match_tags(text: str) -> FrozenSet[str]:
+    """
+    Return every emotion and feature tag present in an already-lowercased text.
+
+    A term without whitespace can only occur inside a single token, so the
+    text is split once and each distinct token is classified from the
+    memoized token table; the few multi-word terms are checked directly.
+    """
+    found = _NO_TAGS.union(*map(_token_tags, set(text.split())))
+    for term, tags in _MULTIWORD_TERMS:
+        if term in text:
+            found |= tags
+    return found
+
+
+def score_message(text: str) -> Tuple[float, FrozenSet[str]]:
+    """
+    Score a single message text.
+
+    Args:
+        text (str): Raw message text
+
+    Returns:
+        Tuple[float, FrozenSet[str]]: Intensity (0-10 scale) and the emotions detected
+    """
+    text = text.lower()
+    tags = match_tags(text)
+
+    # Calculate basic intensity based on text characteristics
+    intensity = 5  # Base intensity
+    if EXCLAMATION in tags:
+        intensity += 1
+    if QUESTION in tags:
+        intensity += 0.5
+    if INTENSIFIER in tags:
+        intensity += 1
+    if len(text) > 100:  # Longer messages might indicate more emotional content
+        intensity += 0.5
+
+    # Cap intensity at 10
+    intensity = min(10, intensity)
+    return intensity, tags.intersection(EMOTIONS)
+
+
+def new_analytics_state() -> Dict[str, Any]:
+    """
+    Create an empty running-analytics state.
+
+    The state holds only additive totals, so it can be maintained one message
+    at a time (for example with Firestore ``Increment`` transforms) and turned
+    into the full analytics structure with ``analytics_from_state``.
+    """
+    return {
+        "emotion_counts": {emotion: 0 for emotion in EMOTIONS},
+        "intensity_sum": 0,
+        "intensity_count": 0,
+        "total_messages": 0,
+        "user_messages": 0,
+        "total_length": 0,
+    }
+
+
+def message_deltas(message: dict) -> Dict[str, Any]:
+    """
+    Compute how a single message changes the running-analytics state.
+
+    Args:
+        message (dict): Message object as stored in the session
+
+    Returns:
+        Dict[str, Any]: Non-zero increments keyed by dotted state path
+            (e.g. ``"emotion_counts.anxiety"``)
+    """
+    deltas: Dict[str, Any] = {"total_messages": 1}
+    if message.get("role") != "user":
+        return deltas
+
+    text = message.get("text", "")
+    deltas["user_messages"] = 1
+    if text:
+        deltas["total_length"] = len(text)
+    if not text.strip():
+        return deltas
+
+    intensity, emotions = score_message(text)
+    deltas["intensity_sum"] = intensity
+    deltas["intensity_count"] = 1
+    for emotion in emotions:
+        deltas[f"emotion_counts.{emotion}"] = 1
+    return deltas
+
+
+def apply_deltas(state: Dict[str, Any], deltas: Dict[str, Any]) -> Dict[str, Any]:
+    """Add ``message_deltas`` output to ``state`` in place and return it."""
+    for path, value in deltas.items():
+        target = state
+        *parents, leaf = path.split(".")
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = target.get(leaf, 0) + value
+    return state
+
+
+def accumulate(messages: List[dict]) -> Dict[str, Any]:
+    """
+    Build the running-analytics state for a complete list of messages.
+
+    Scores are added straight into the state; the dotted-path form of
+    ``message_deltas`` is only needed to build per-field ``Increment`` transforms.
+    """
+    state = new_analytics_state()
+    emotion_counts = state["emotion_counts"]
+    intensity_sum = 0
+    intensity_count = user_messages = total_length = 0
+    for message in messages:
+        if message.get("role") != "user":
+            continue
+        text = message.get("text", "")
+        user_messages += 1
+        total_length += len(text)
+        if not text.strip():
+            continue
+        intensity, emotions = score_message(text)
+        intensity_sum += intensity
+        intensity_count += 1
+        for emotion in emotions:
+            emotion_counts[emotion] += 1
+
+    state.update(
+        intensity_sum=intensity_sum,
+        intensity_count=intensity_count,
+        total_messages=len(messages),
+        user_messages=user_messages,
+        total_length=total_length,
+    )
+    return state
+
+
+def analyze_messages(messages: List[dict]) -> Dict[str, Any]:
+    """
+    Analyze conversation messages for emotional patterns and intensity.
+
+    This function processes conversation messages to understand the emotional landscape
+    from the actual text content using comprehensive keyword analysis.
+
+    Args:
+        messages (List[dict]): List of message objects from the session
+
+    Returns:
+        Dict[str, Any]: Analytics containing:
+            - emotion_percentages: All emotions as percentages that sum to 1.0
+            - avg_intensity: Average emotional intensity (0-10 scale)
+            - message_analysis: Breakdown of analysis
+    """
+    logger.info(f"Analyzing {len(messages)} messages for emotional insights")
+    return analytics_from_state(accumulate(messages))
+
+
+def analytics_from_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn a running-analytics state into the analytics structure.
+
+    Intensities are multiples of 0.5, so their float sum is exact and
+    ``intensity_sum / intensity_count`` equals the arithmetic mean of the
+    individual values. Like ``statistics.mean``, an all-integer sum with an
+    integral mean yields an ``int``.
+    """
+    # Rebuild counts in canonical order; stored maps may come back key-sorted
+    stored_counts = state.get("emotion_counts") or {}
+    emotion_counts = {emotion: stored_counts.get(emotion, 0) for emotion in EMOTIONS}
+    intensity_sum = state.get("intensity_sum", 0)
+    intensity_count = state.get("intensity_count", 0)
+    user_messages = state.get("user_messages", 0)
+    total_length = state.get("total_length", 0)
+
+    logger.info(f"Analyzing {user_messages} user messages out of {state.get('total_messages', 0)} total messages")
+
+    # Calculate average intensity
+    if not intensity_count:
+        avg_intensity = 5.0
+    elif isinstance(intensity_sum, int) and intensity_sum % intensity_count == 0:
+        avg_intensity = intensity_sum // intensity_count
+    else:
+        avg_intensity = intensity_sum / intensity_count
+
+    # Convert counts to percentages that sum to 1.0
+    total_emotions = sum(emotion_counts.values())
+
+    if total_emotions == 0:
+        # If no emotions detected, distribute evenly with slight bias toward content
+        emotion_percentages = dict(DEFAULT_EMOTION_PERCENTAGES)
+    else:
+        # Calculate percentages based on detected emotions
+        emotion_percentages = {
+            emotion: round(count / total_emotions, 3) for emotion, count in emotion_counts.items()
+        }
+
+        # Ensure they sum to exactly 1.0 by adjusting the largest percentage if needed
+        current_sum = sum(emotion_percentages.values())
+        if current_sum != 1.0:
+            # Find the emotion with the highest percentage and adjust
+            max_emotion = max(emotion_percentages.keys(), key=lambda k: emotion_percentages[k])
+            emotion_percentages[max_emotion] += round(1.0 - current_sum, 3)
+
+    analytics = {
+        "emotion_percentages": emotion_percentages,
+        "emotion_counts": emotion_counts,  # Keep raw counts for debugging
+        "avg_intensity": round(avg_intensity, 2),
+        "message_analysis": {
+            "total_messages": state.get("total_messages", 0),
+            "user_messages": user_messages,
+            "analyzed_messages": intensity_count,
+            "avg_message_length": round(total_length / user_messages, 2) if user_messages else 0
+        }
+    }
+
+    # Verify percentages sum to 1.0
+    percentage_sum = sum(emotion_percentages.values())
+    logger.info(f"Session analysis complete: {len([k for k, v in emotion_counts.items() if v > 0])} emotions detected, avg intensity {avg_intensity:.2f}, percentages sum: {percentage_sum}")
+    return analytics
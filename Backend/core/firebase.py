@@ -6,6 +6,9 @@ This module initializes and configures Firebase services for the therapy app:
 - Firestore database client for data persistence
 - Firebase Auth client for user authentication
 
+Nothing is initialized at import: the Admin SDK is imported and initialized
+when a client is first used (or warmed up at startup, see core/providers.py).
+
 Firestore Collections Used:
 - sessions: Active therapy conversation sessions
 - session_summaries: Analyzed and summarized completed sessions
@@ -23,84 +26,115 @@ Usage:
     user = auth_client.verify_id_token(token)
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore, auth
 from core.config import settings
+from core.providers import LazyClient
 import logging
 import os
 
 # Configure logging for Firebase operations
 logger = logging.getLogger(__name__)
 
-# Initialize Firebase services with error handling for different environments
-try:
-    # Check if we should use Cloud Run's default service account
-    use_service_account = os.getenv('USE_SERVICE_ACCOUNT', 'false').lower() == 'true'
+
+def _initialize_app() -> bool:
+    """Initialize the Firebase Admin SDK; returns False when it is unavailable in dev/demo."""
+    # Imported here so importing this module does not load the Admin SDK
+    import firebase_admin
+    from firebase_admin import credentials
     
-    if use_service_account:
-        # Cloud Run production mode - use default service account
-        logger.info("Using Cloud Run service account for Firebase authentication")
-        firebase_admin.initialize_app()
-        logger.info("Firebase Admin SDK initialized with Cloud Run service account")
+    # Initialize Firebase services with error handling for different environments
+    try:
+        # Check if we should use Cloud Run's default service account
+        use_service_account = os.getenv('USE_SERVICE_ACCOUNT', 'false').lower() == 'true'
         
-    elif settings.is_development():
-        # Development mode - check for credentials file or use default
-        if hasattr(settings, 'google_application_credentials') and os.path.exists(settings.google_application_credentials):
-            # Use local service account file
-            cred = credentials.Certificate(settings.google_application_credentials)
-            firebase_admin.initialize_app(cred)
-            logger.info("Firebase Admin SDK initialized with local service account file")
+        if use_service_account:
+            # Cloud Run production mode - use default service account
+            logger.info("Using Cloud Run service account for Firebase authentication")
+            firebase_admin.initialize_app()
+            logger.info("Firebase Admin SDK initialized with Cloud Run service account")
+            
+        elif settings.is_development():
+            # Development mode - check for credentials file or use default
+            if hasattr(settings, 'google_application_credentials') and os.path.exists(settings.google_application_credentials):
+                # Use local service account file
+                cred = credentials.Certificate(settings.google_application_credentials)
+                firebase_admin.initialize_app(cred)
+                logger.info("Firebase Admin SDK initialized with local service account file")
+            else:
+                # Try default credentials or create mock setup
+                try:
+                    firebase_admin.initialize_app()
+                    logger.info("Firebase Admin SDK initialized with default credentials")
+                except Exception as dev_e:
+                    logger.warning(f"Could not initialize Firebase with default credentials: {dev_e}")
+                    logger.warning("Running in mock mode - some features will be limited")
+                    
         else:
-            # Try default credentials or create mock setup
-            try:
-                firebase_admin.initialize_app()
-                logger.info("Firebase Admin SDK initialized with default credentials")
-            except Exception as dev_e:
-                logger.warning(f"Could not initialize Firebase with default credentials: {dev_e}")
-                logger.warning("Running in mock mode - some features will be limited")
-                
-    else:
-        # Fallback to credential file for other environments
-        if hasattr(settings, 'google_application_credentials'):
-            cred = credentials.Certificate(settings.google_application_credentials)
-            firebase_admin.initialize_app(cred)
-            logger.info("Firebase Admin SDK initialized with credential file")
+            # Fallback to credential file for other environments
+            if hasattr(settings, 'google_application_credentials'):
+                cred = credentials.Certificate(settings.google_application_credentials)
+                firebase_admin.initialize_app(cred)
+                logger.info("Firebase Admin SDK initialized with credential file")
+            else:
+                raise ValueError("No Firebase credentials configuration found")
+            
+    except Exception as e:
+        logger.error(f"Failed to initialize Firebase Admin SDK: {e}")
+        if settings.environment.lower() in ["dev", "development", "demo"]:
+            # In development/demo, log the error but continue
+            logger.warning(f"Continuing in {settings.environment} mode without Firebase services")
+            logger.info("API will use mock data for demonstration purposes")
+            return False
         else:
-            raise ValueError("No Firebase credentials configuration found")
-        
-except Exception as e:
-    logger.error(f"Failed to initialize Firebase Admin SDK: {e}")
-    if settings.environment.lower() in ["dev", "development", "demo"]:
-        # In development/demo, log the error but continue
-        logger.warning(f"Continuing in {settings.environment} mode without Firebase services")
-        logger.info("API will use mock data for demonstration purposes")
-    else:
-        # In production, this is a critical error
-        raise
+            # In production, this is a critical error
+            raise
+    return True
+
 
-try:
-    # Initialize Firestore client for database operations
-    db = firestore.client()
-    logger.info("Firestore client initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize Firestore client: {e}")
-    if settings.is_development() or settings.environment.lower() == "demo":
-        # Create a mock db object for development/demo
-        db = None
-        logger.warning(f"Using mock database in {settings.environment} mode - Firestore not available")
-    else:
+def _create_firestore():
+    """Synchronous Firestore client, or None in dev/demo when Firestore is not available."""
+    from firebase_admin import firestore
+    
+    firebase_app.get()
+    try:
+        # Initialize Firestore client for database operations
+        client = firestore.client()
+        logger.info("Firestore client initialized successfully")
+        return client
+    except Exception as e:
+        logger.error(f"Failed to initialize Firestore client: {e}")
+        if settings.is_development() or settings.environment.lower() == "demo":
+            # Use a mock (absent) db object for development/demo
+            logger.warning(f"Using mock database in {settings.environment} mode - Firestore not available")
+            return None
         raise
 
-try:
-    # Initialize Firebase Auth client for user authentication
-    auth_client = auth
-    logger.info("Firebase Auth client initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize Firebase Auth client: {e}")
-    if settings.is_development() or settings.environment.lower() == "demo":
-        auth_client = None
-        logger.warning(f"Using mock auth in {settings.environment} mode - Firebase Auth not available")
-    else:
+
+def _create_auth():
+    """Firebase Auth module, or None in dev/demo when it is not available."""
+    try:
+        # Initialize Firebase Auth client for user authentication
+        from firebase_admin import auth
+        firebase_app.get()
+        logger.info("Firebase Auth client initialized successfully")
+        return auth
+    except Exception as e:
+        logger.error(f"Failed to initialize Firebase Auth client: {e}")
+        if settings.is_development() or settings.environment.lower() == "demo":
+            logger.warning(f"Using mock auth in {settings.environment} mode - Firebase Auth not available")
+            return None
         raise
 
-logger.info("Firebase services configuration completed")
+
+# Created on first use (see core/providers.py)
+firebase_app = LazyClient("Firebase app", _initialize_app)
+firestore_client = LazyClient("Firestore (sync)", _create_firestore)
+auth_provider = LazyClient("Firebase Auth", _create_auth)
+
+
+def __getattr__(name: str):
+    """``db`` and ``auth_client``: the clients themselves (None when unavailable), created on first access."""
+    if name == "db":
+        return firestore_client.get()
+    if name == "auth_client":
+        return auth_provider.get()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
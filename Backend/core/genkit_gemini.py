@@ -1,13 +1,169 @@
 import asyncio
-from typing import List
-import google.generativeai as genai
+import hashlib
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+from core.cache import MISSING, LRUCache, SQLiteCache, TieredCache
 from core.config import settings
+from core.llm_executor import LLMOverloaded, llm_executor
+from core.metrics import SIZE_BUCKETS, registry
+from core.providers import LazyClient
+from core.singleflight import SingleFlight
+import logging
 
-# Configure the Google Generative AI client
-genai.configure(api_key=settings.gemini_api_key)
+# Configure logging for Gemini calls
+logger = logging.getLogger(__name__)
 
-# Initialize the Gemini 2.5 Flash model
-model = genai.GenerativeModel('gemini-2.5-flash')
+MODEL_NAME = 'gemini-2.5-flash'
+
+
+def _create_model():
+    """Configure the Google Generative AI client and create the Gemini 2.5 Flash model."""
+    # Imported here: the SDK takes a large share of startup time to import
+    import google.generativeai as genai
+    genai.configure(api_key=settings.gemini_api_key)
+    return genai.GenerativeModel(MODEL_NAME)
+
+
+# Created on first use, which happens on an LLM pool thread (see _generate_content)
+model = LazyClient("Gemini", _create_model)
+
+# Reply used when a follow-up question cannot be generated (errors or overload)
+FOLLOWUP_FALLBACK = "I'm here if you'd like to share anything."
+
+
+class StreamInterrupted(Exception):
+    """Raised when a streamed response fails after part of it was yielded."""
+
+# Gemini responses keyed by (function, model, prompt): identical prompts, e.g.
+# repeated summaries of an unchanged session, are answered without a model call
+response_cache = TieredCache(
+    LRUCache(settings.llm_cache_max_entries, settings.llm_cache_max_bytes, settings.llm_cache_ttl),
+    SQLiteCache(settings.llm_cache_path, settings.llm_cache_disk_max_bytes, settings.llm_cache_ttl)
+    if settings.llm_cache_path else None
+)
+
+# Identical calls made while one is in flight (retries, double taps) share its generation
+inflight = SingleFlight()
+
+# Per-function call metrics; result is "cache", "model", "shed" or "error"
+CALL_DURATION = registry.histogram("gemini_call_duration_seconds", "Gemini call time by function and result",
+                                   ("function", "result"))
+PROMPT_SIZE = registry.histogram("gemini_prompt_chars", "Gemini prompt size in characters by function",
+                                 ("function",), SIZE_BUCKETS)
+RESPONSE_SIZE = registry.histogram("gemini_response_chars", "Gemini response size in characters by function",
+                                   ("function",), SIZE_BUCKETS)
+registry.watch_cache("llm_response", response_cache.stats)
+
+def cache_key(function: str, prompt: str) -> str:
+    """Content-addressed cache key; prefixed with the function name for per-function invalidation."""
+    digest = hashlib.sha256("\0".join((function, MODEL_NAME, prompt)).encode("utf-8")).hexdigest()
+    return f"{function}:{digest}"
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss, eviction and size counters of the response cache."""
+    return response_cache.stats()
+
+async def _generate(function: str, prompt: str, ttl: Optional[float] = None) -> str:
+    """
+    Generate text for a prompt, serving repeated identical calls from the cache.
+    
+    Concurrent identical calls are coalesced into one model call. Only
+    successful responses are cached; errors propagate to every waiting
+    caller's fallback handling.
+    """
+    start = time.perf_counter()
+    PROMPT_SIZE.labels(function).observe(len(prompt))
+    result = "error"
+    try:
+        key = cache_key(function, prompt)
+        text = MISSING
+        if settings.llm_cache_enabled:
+            text = await response_cache.get(key)
+        if text is not MISSING:
+            result = "cache"
+        else:
+            text = await inflight.do(key, lambda: _call_and_cache(key, prompt, ttl))
+            result = "model"
+    except LLMOverloaded:
+        result = "shed"
+        raise
+    finally:
+        CALL_DURATION.labels(function, result).observe(time.perf_counter() - start)
+    RESPONSE_SIZE.labels(function).observe(len(text))
+    return text
+
+async def _call_and_cache(key: str, prompt: str, ttl: Optional[float]) -> str:
+    text = await _call_model(prompt)
+    if settings.llm_cache_enabled:
+        await response_cache.set(key, text, ttl)
+    return text
+
+async def _call_model(prompt: str) -> str:
+    # Run the blocking call on the dedicated LLM pool (raises LLMOverloaded when saturated)
+    response = await llm_executor.run(_generate_content, prompt)
+    return response.text
+
+def _generate_content(prompt: str):
+    # Resolved on the pool thread, so creating the model never blocks the event loop
+    return model.generate_content(prompt)
+
+async def _stream_model(prompt: str) -> AsyncIterator[str]:
+    """Yield text chunks from Gemini's streaming API as they arrive."""
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue()
+    done = object()
+    
+    def produce():
+        # The SDK's stream is a blocking iterator; drain it on an LLM pool thread
+        try:
+            for chunk in model.generate_content(prompt, stream=True):
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue  # Chunk without text parts (e.g. only safety metadata)
+                if text:
+                    loop.call_soon_threadsafe(chunks.put_nowait, text)
+        except Exception as e:
+            loop.call_soon_threadsafe(chunks.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(chunks.put_nowait, done)
+    
+    # Holds an LLM slot until the stream is drained
+    await llm_executor.submit(produce)
+    while True:
+        item = await chunks.get()
+        if item is done:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+# Function label of streamed generations in the call metrics
+STREAM_FUNCTION = "stream_contextual_followup_question"
+
+# Time to first token (seconds) of recent streamed generations
+_ttft_samples: Deque[float] = deque(maxlen=1000)
+
+def coalescing_stats() -> Dict[str, Any]:
+    """Model calls executed vs coalesced into an identical in-flight call."""
+    return inflight.stats()
+
+def executor_stats() -> Dict[str, Any]:
+    """Queue depth, in-flight and shed counters of the LLM executor."""
+    return llm_executor.stats()
+
+def streaming_stats() -> Dict[str, Any]:
+    """Time-to-first-token summary (milliseconds) over recent streamed generations."""
+    samples = sorted(_ttft_samples)
+    if not samples:
+        return {"samples": 0}
+    return {
+        "samples": len(samples),
+        "ttft_ms_mean": round(sum(samples) / len(samples) * 1000, 1),
+        "ttft_ms_p50": round(samples[len(samples) // 2] * 1000, 1),
+        "ttft_ms_p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 1),
+    }
 
 async def generate_followup_question(history: List[dict]) -> str:
     """
@@ -41,19 +197,20 @@ Your response should be:
 
 Response:"""
 
-        # Run the blocking call in a thread pool
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, model.generate_content, prompt)
+        response_text = await _generate("generate_followup_question", prompt, settings.llm_cache_followup_ttl)
         
-        return response.text
+        return response_text
     except Exception as e:
         print(f"Error generating follow-up question: {e}")
         # Return a gentle, supportive fallback response
-        return "I'm here if you'd like to share anything."
+        return FOLLOWUP_FALLBACK
 
-async def summarize_text_flow(text: str) -> str:
+async def summarize_text_flow(text: str, raise_errors: bool = False) -> str:
     """
     Summarizes the given text in a friendly, supportive way. Provides a warm reflection if person is wrong. Say in nice way.
+    
+    With ``raise_errors`` a Gemini failure is raised instead of returning the
+    fallback summary, so background jobs can retry it.
     """
     try:
         prompt = f"""Write a warm, friendly summary of this conversation as if you're a supportive friend reflecting back on what was shared. Focus on:
@@ -70,19 +227,21 @@ Conversation:
 
 Friendly Summary:"""
 
-        # Run the blocking call in a thread pool
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, model.generate_content, prompt)
+        response_text = await _generate("summarize_text_flow", prompt)
         
-        return response.text
+        return response_text
     except Exception as e:
         print(f"Error summarizing text: {e}")
+        if raise_errors:
+            raise
         # Return a friendly fallback summary
         return "It sounds like you shared some meaningful thoughts and feelings in this conversation. Thanks for opening up."
 
-async def analyze_goals_from_session(messages: List[dict]) -> dict:
+async def analyze_goals_from_session(messages: List[dict], raise_errors: bool = False) -> dict:
     """
     Analyzes session messages to identify, track, and update goals automatically.
+    
+    With ``raise_errors`` a Gemini failure is raised instead of returning no goals.
     """
     try:
         # Extract only user messages for goal analysis
@@ -123,18 +282,16 @@ Return ONLY a JSON object in this exact format:
 
 If no clear goals are found, return: {{"goals": []}}"""
 
-        # Run the blocking call in a thread pool
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, model.generate_content, prompt)
+        response_text = await _generate("analyze_goals_from_session", prompt)
         
         # Parse the JSON response
         import json
         try:
-            result = json.loads(response.text.strip())
+            result = json.loads(response_text.strip())
             return result
         except json.JSONDecodeError:
             # Try to extract JSON from response if it has extra text
-            text = response.text.strip()
+            text = response_text.strip()
             start = text.find('{')
             end = text.rfind('}') + 1
             if start != -1 and end != -1:
@@ -147,45 +304,77 @@ If no clear goals are found, return: {{"goals": []}}"""
         
     except Exception as e:
         print(f"Error analyzing goals from session: {e}")
+        if raise_errors:
+            raise
         return {"goals": []}
 
-async def generate_contextual_followup_question(current_history: List[dict], historical_context: dict) -> str:
+async def summarize_conversation_window(previous_summary: str, messages: List[dict]) -> Optional[str]:
     """
-    Generates a follow-up question that prioritizes the current conversation 
-    while incorporating relevant context from previous SESSION SUMMARIES ONLY.
+    Fold turns that slid out of the follow-up prompt's window into a running mini-summary.
     
-    Weighting: 80% current conversation, 20% historical summaries + goals
-    Privacy-focused: Uses only processed summaries, never raw messages from previous sessions.
+    Only the previous summary and the new turns are sent, so the cost does not
+    grow with the session. Returns None on failure so the caller keeps the
+    previous summary.
     """
     try:
-        # Extract current conversation context with speaker roles
-        current_parts = []
-        for msg in current_history:
+        turns = []
+        for msg in messages:
             if "text" in msg and msg["text"].strip():
-                role = msg.get("role", "user")
-                speaker = "You" if role == "user" else "AI"
-                current_parts.append(f"{speaker}: {msg['text']}")
-        
-        current_conversation = "\n".join(current_parts)
+                speaker = "You" if msg.get("role", "user") == "user" else "AI"
+                turns.append(f"{speaker}: {msg['text']}")
+        if not turns:
+            return previous_summary
         
-        # Build historical context from summaries and goals only (keep very brief)
-        background_info = []
-        
-        # Add recent goals context (if any)
-        recent_goals = historical_context.get("recent_goals", [])
-        if recent_goals:
-            goals_text = ", ".join([f"{g['goal']} ({g['status']})" for g in recent_goals[:2]])
-            background_info.append(f"Current goals: {goals_text}")
-        
-        # Add brief context from session summaries (already pre-processed and truncated)
-        summary_context = historical_context.get("historical_context", "")
-        if summary_context:
-            background_info.append(summary_context)
-        
-        background_text = " | ".join(background_info) if background_info else ""
-        
-        # Create weighted prompt - heavily favor current conversation, light touch of summary context
-        prompt = f"""Generate a gentle, supportive response (1-2 lines maximum) that focuses primarily on the current conversation, with optional light reference to background context when naturally relevant.
+        prompt = f"""Update the running summary of an ongoing supportive conversation with the turns below.
+
+Running summary so far:
+{previous_summary or "(none yet)"}
+
+New turns:
+{chr(10).join(turns)}
+
+Write the updated summary in at most 80 words, addressing the person as "you". Keep the topics, feelings and any goals that came up; drop small talk.
+
+Updated summary:"""
+
+        response_text = await _generate("summarize_conversation_window", prompt)
+        return response_text.strip()
+    except Exception as e:
+        logger.warning(f"Error summarizing conversation window: {e}")
+        return None
+
+def _contextual_followup_prompt(current_history: List[dict], historical_context: dict,
+                                earlier_summary: str = "") -> str:
+    """Build the weighted follow-up prompt: current conversation first, light background context."""
+    # Extract current conversation context with speaker roles, after a summary
+    # of the session's older turns when the history has been windowed
+    current_parts = [f"(Earlier in this conversation: {earlier_summary})"] if earlier_summary else []
+    for msg in current_history:
+        if "text" in msg and msg["text"].strip():
+            role = msg.get("role", "user")
+            speaker = "You" if role == "user" else "AI"
+            current_parts.append(f"{speaker}: {msg['text']}")
+    
+    current_conversation = "\n".join(current_parts)
+    
+    # Build historical context from summaries and goals only (keep very brief)
+    background_info = []
+    
+    # Add recent goals context (if any)
+    recent_goals = historical_context.get("recent_goals", [])
+    if recent_goals:
+        goals_text = ", ".join([f"{g['goal']} ({g['status']})" for g in recent_goals[:2]])
+        background_info.append(f"Current goals: {goals_text}")
+    
+    # Add brief context from session summaries (already pre-processed and truncated)
+    summary_context = historical_context.get("historical_context", "")
+    if summary_context:
+        background_info.append(summary_context)
+    
+    background_text = " | ".join(background_info) if background_info else ""
+    
+    # Create weighted prompt - heavily favor current conversation, light touch of summary context
+    prompt = f"""Generate a gentle, supportive response (1-2 lines maximum) that focuses primarily on the current conversation, with optional light reference to background context when naturally relevant.
 
 **CURRENT CONVERSATION** (Primary focus - 80% weight):
 {current_conversation}
@@ -208,14 +397,89 @@ async def generate_contextual_followup_question(current_history: List[dict], his
 - Don't force historical connections - current conversation takes priority
 
 **Response:**"""
+    
+    return prompt
 
-        # Run the blocking call in a thread pool
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, model.generate_content, prompt)
+async def generate_contextual_followup_question(current_history: List[dict], historical_context: dict,
+                                                earlier_summary: str = "") -> str:
+    """
+    Generates a follow-up question that prioritizes the current conversation 
+    while incorporating relevant context from previous SESSION SUMMARIES ONLY.
+    
+    Weighting: 80% current conversation, 20% historical summaries + goals
+    Privacy-focused: Uses only processed summaries, never raw messages from previous sessions.
+    ``earlier_summary`` summarizes turns of this session older than ``current_history``.
+    """
+    try:
+        prompt = _contextual_followup_prompt(current_history, historical_context, earlier_summary)
+        response_text = await _generate("generate_contextual_followup_question", prompt, settings.llm_cache_followup_ttl)
         
-        return response.text
+        return response_text
         
+    except LLMOverloaded as e:
+        # Another model call would only queue behind the same backlog
+        logger.warning(f"Contextual follow-up question shed: {e}")
+        return FOLLOWUP_FALLBACK
     except Exception as e:
         print(f"Error generating contextual follow-up question: {e}")
         # Fallback to simple current conversation analysis
         return await generate_followup_question(current_history)
+
+async def stream_contextual_followup_question(current_history: List[dict], historical_context: dict,
+                                              earlier_summary: str = "") -> AsyncIterator[str]:
+    """
+    Streaming variant of ``generate_contextual_followup_question``.
+    
+    Yields text chunks as Gemini produces them and records the time to the
+    first chunk. A cached response is yielded in one piece, and the assembled
+    response is cached under the same key as the non-streaming call. If the
+    stream fails before any text arrives, the non-streaming fallback is
+    yielded instead.
+
+    Raises:
+        StreamInterrupted: If the stream fails after some text was yielded;
+            the partial response is incomplete and must not be stored
+    """
+    prompt = _contextual_followup_prompt(current_history, historical_context, earlier_summary)
+    key = cache_key("generate_contextual_followup_question", prompt)
+    start = time.perf_counter()
+    PROMPT_SIZE.labels(STREAM_FUNCTION).observe(len(prompt))
+    result = "error"
+    parts: List[str] = []
+    
+    try:
+        if settings.llm_cache_enabled:
+            cached = await response_cache.get(key)
+            if cached is not MISSING:
+                _ttft_samples.append(time.perf_counter() - start)
+                result = "cache"
+                parts.append(cached)
+                yield cached
+                return
+        
+        try:
+            async for text in _stream_model(prompt):
+                if not parts:
+                    _ttft_samples.append(time.perf_counter() - start)
+                parts.append(text)
+                yield text
+        except LLMOverloaded as e:
+            logger.warning(f"Streamed contextual follow-up question shed: {e}")
+            result = "shed"
+            yield FOLLOWUP_FALLBACK
+            return
+        except Exception as e:
+            logger.error(f"Error streaming contextual follow-up question: {e}")
+            if parts:
+                raise StreamInterrupted(str(e)) from e
+            yield await generate_followup_question(current_history)
+            return
+        
+        result = "model"
+        if settings.llm_cache_enabled and parts:
+            await response_cache.set(key, "".join(parts), settings.llm_cache_followup_ttl)
+    finally:
+        # Until the stream ended; "error" also covers clients that disconnected mid-stream
+        CALL_DURATION.labels(STREAM_FUNCTION, result).observe(time.perf_counter() - start)
+        if parts:
+            RESPONSE_SIZE.labels(STREAM_FUNCTION).observe(sum(len(part) for part in parts))
@@ -0,0 +1,164 @@
+"""
+Goal Similarity Index Module
+
+This module finds which of a user's existing goals a newly detected goal
+refers to. Each goal is reduced to a set of normalized terms (lower-cased
+words without stop words or frequency words, lightly stemmed), stored on the
+goal document as ``match_terms`` when the goal is written. A per-user index holds every goal's
+terms as flat NumPy posting arrays, and a detected goal is scored against all
+goals at once by TF-IDF cosine similarity; the best-scoring goal matches if it
+reaches the threshold.
+
+Scoring touches each stored term once per query (no per-pair Python loops),
+so it stays fast with thousands of goals per user.
+
+Usage:
+    from core.goal_index import GoalIndex, goal_terms
+
+    index = GoalIndex.from_goals(goals_by_id)
+    goal_id, score = index.best_match(goal_terms("Sleep 8 hours a night"))
+    index.add(new_goal_id, terms)
+"""
+
+import math
+import re
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+from core.config import settings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Goal document field holding the precomputed terms
+TERMS_FIELD = "match_terms"
+
+_WORDS = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+    a an and are as at be been being but by can could do for from get go going have i im
+    in into is it its just like make me more my of on or out so some than that the their
+    them then to try trying up want wanting was will with would you your
+""".split())
+
+# Words saying how often or how much rather than what the goal is
+FILLER_WORDS = frozenset("""
+    every each daily day days week weeks weekly month monthly night time times often regularly
+    better less good
+""".split())
+
+# Checked in order; only the first matching suffix is stripped
+_SUFFIXES = ("ing", "ies", "ed", "es", "ly", "s")
+
+
+def stem(word: str) -> str:
+    """
+    Strip one common English suffix and a final "e", keeping at least three characters.
+
+    Deliberately crude, but consistent: "exercise", "exercises" and
+    "exercising" all become "exercis"; "runs" and "running" become "run".
+    """
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not (suffix == "s" and word.endswith("ss")):
+            word = word[:-len(suffix)] + ("y" if suffix == "ies" else "")
+            if suffix in ("ing", "ed") and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]  # running -> run
+            break
+    if word.endswith("e") and len(word) >= 4:
+        word = word[:-1]
+    return word
+
+
+def text_terms(text: str, ignore: frozenset = STOP_WORDS) -> List[str]:
+    """Stemmed words of a text in order, leaving out the ``ignore`` words."""
+    return [stem(word) for word in _WORDS.findall(text.lower()) if word not in ignore]
+
+
+def goal_terms(text: str) -> List[str]:
+    """Normalized, de-duplicated terms of a goal description (sorted, for storage)."""
+    return sorted(set(text_terms(text, STOP_WORDS | FILLER_WORDS)))
+
+
+class GoalIndex:
+    """
+    TF-IDF cosine similarity search over one user's goals.
+
+    Args:
+        threshold (float, optional): Minimum similarity for a match
+            (defaults to ``settings.goal_match_threshold``)
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = settings.goal_match_threshold if threshold is None else threshold
+        self._goal_ids: List[str] = []
+        self._goal_terms: List[List[int]] = []
+        self._vocabulary: Dict[str, int] = {}
+        self._arrays = None  # (posting goal rows, posting term ids, idf, goal norms), built lazily
+
+    @classmethod
+    def from_goals(cls, goals: Dict[str, Dict[str, Any]], threshold: Optional[float] = None) -> "GoalIndex":
+        """Index goal documents by id, using stored terms or computing them for older goals."""
+        index = cls(threshold)
+        for goal_id, goal_data in goals.items():
+            terms = goal_data.get(TERMS_FIELD)
+            index.add(goal_id, terms if terms is not None else goal_terms(goal_data.get("goal", "")))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._goal_ids)
+
+    def add(self, goal_id: str, terms: Iterable[str]) -> None:
+        """Add a goal (e.g. one created earlier in the same session) to the index."""
+        term_ids = [self._vocabulary.setdefault(term, len(self._vocabulary)) for term in set(terms)]
+        self._goal_ids.append(goal_id)
+        self._goal_terms.append(term_ids)
+        self._arrays = None
+
+    def scores(self, terms: Iterable[str]) -> "np.ndarray":
+        """Cosine similarity of a term set to every indexed goal, in insertion order."""
+        import numpy as np  # Imported on first use to keep it off the startup path
+
+        if not self._goal_ids:
+            return np.zeros(0)
+        rows, term_ids, idf, norms = self._build()
+
+        query = [self._vocabulary.get(term, -1) for term in set(terms)]
+        known = np.array([term_id for term_id in query if term_id >= 0], dtype=np.int64)
+        # Terms no goal contains weigh as much as the rarest possible term
+        unseen_idf = math.log(1 + len(self._goal_ids)) + 1
+        query_norm = math.sqrt(float(np.sum(idf[known] ** 2)) + (len(query) - len(known)) * unseen_idf ** 2)
+        if not known.size or query_norm == 0:
+            return np.zeros(len(self._goal_ids))
+
+        hits = np.isin(term_ids, known)
+        dots = np.bincount(rows[hits], weights=idf[term_ids[hits]] ** 2, minlength=len(self._goal_ids))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.nan_to_num(dots / (norms * query_norm))
+
+    def best_match(self, terms: Iterable[str]) -> Tuple[Optional[str], float]:
+        """
+        Find the most similar goal.
+
+        Returns:
+            Tuple[Optional[str], float]: The best goal id (None if below the
+                threshold or the index is empty) and its similarity
+        """
+        scores = self.scores(terms)
+        if not scores.size:
+            return None, 0.0
+        best = int(scores.argmax())
+        score = float(scores[best])
+        return (self._goal_ids[best] if score >= self.threshold else None), score
+
+    def _build(self):
+        import numpy as np
+
+        if self._arrays is None:
+            lengths = [len(term_ids) for term_ids in self._goal_terms]
+            rows = np.repeat(np.arange(len(self._goal_terms)), lengths)
+            term_ids = np.fromiter((t for term_ids in self._goal_terms for t in term_ids),
+                                   dtype=np.int64, count=sum(lengths))
+            # Smoothed inverse document frequency over this user's goals
+            df = np.bincount(term_ids, minlength=len(self._vocabulary))
+            idf = np.log((1 + len(self._goal_terms)) / (1 + df)) + 1
+            norms = np.sqrt(np.bincount(rows, weights=idf[term_ids] ** 2, minlength=len(self._goal_terms)))
+            self._arrays = (rows, term_ids, idf, norms)
+        return self._arrays
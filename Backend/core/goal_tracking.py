@@ -0,0 +1,166 @@
+"""
+Goal Tracking Storage Module
+
+This module stores the goals detected in a session. Each detected goal is
+first matched to its most similar existing goal (``core.goal_index``, over the
+stored ``match_terms`` of the user's goals) before any transaction starts, so
+building the index never holds a transaction open or repeats on a contention
+retry. The transaction then reads only the goals being touched and commits
+all of the session's creates and updates together.
+
+Writes are idempotent, so a retried or repeated close of the same session
+does not duplicate anything:
+- mentions are added with ``ArrayUnion``, which never appends a session twice
+- a goal first detected in a session gets a deterministic document id derived
+  from (user, session, goal text), the idempotency key, so re-running the
+  session updates that goal instead of creating a second one
+
+Two sessions of the same user closing at the same moment can each create a
+goal the other would have matched, since matching does not see goals created
+after its read.
+
+Usage:
+    from core.goal_tracking import save_goals
+
+    counts = await save_goals(session_id, user_id, detected_goals)
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List
+from core.goal_index import TERMS_FIELD, GoalIndex, goal_terms
+from core.projections import project
+from core.repository import collect, db, run_transaction
+import logging
+
+# Configure logging for goal tracking
+logger = logging.getLogger(__name__)
+
+GOALS = "goals"
+
+# Goals below this detection confidence are ignored
+MIN_CONFIDENCE = 0.6
+
+# Statuses only move forward, except that any goal can be abandoned
+STATUS_ORDER = {"imagined": 0, "started": 1, "done": 2}
+
+
+def goal_doc_id(user_id: str, session_id: str, goal_text: str) -> str:
+    """Deterministic document id for a goal first detected in a session (idempotency key)."""
+    return hashlib.sha256(f"{user_id}\0{session_id}\0{goal_text}".encode("utf-8")).hexdigest()[:20]
+
+
+def status_progresses(current_status: str, new_status: str) -> bool:
+    """Only allow forward progression or to abandoned."""
+    return new_status == "abandoned" or STATUS_ORDER.get(new_status, 0) > STATUS_ORDER.get(current_status, 0)
+
+
+async def save_goals(session_id: str, user_id: str, detected_goals: List[dict]) -> Dict[str, int]:
+    """
+    Create or update the goals detected in a session in a single transaction.
+
+    Args:
+        session_id (str): Session the goals were detected in
+        user_id (str): Owner of the session
+        detected_goals (List[dict]): Goals from ``analyze_goals_from_session``
+
+    Returns:
+        Dict[str, int]: ``new_goals`` and ``updated_goals`` counts
+    """
+    matches = await _match_goals(session_id, user_id, detected_goals)
+    if not matches:
+        return {"new_goals": 0, "updated_goals": 0}
+    return await run_transaction(_save_goals, session_id, user_id, matches)
+
+
+async def _match_goals(session_id: str, user_id: str, detected_goals: List[dict]) -> Dict[str, Dict[str, Any]]:
+    """
+    Match each detected goal to an existing goal or a new goal id, outside the transaction.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per goal id (in detection order), the first
+            detection (``detected``), its ``terms``, whether the goal already
+            existed (``existing``) and every detected status in order (``statuses``)
+    """
+    query = project(db.collection(GOALS).where("user_id", "==", user_id), "goal_match")
+    index = GoalIndex.from_goals({doc.id: doc.to_dict() or {} for doc in await collect(query)})
+
+    matches: Dict[str, Dict[str, Any]] = {}
+    for detected_goal in detected_goals:
+        goal_text = detected_goal.get("goal", "").lower().strip()
+        if not goal_text or detected_goal.get("confidence", 0) < MIN_CONFIDENCE:
+            continue  # Skip low-confidence goals
+
+        terms = goal_terms(goal_text)
+        goal_id, score = index.best_match(terms)
+        status = detected_goal.get("status", "imagined")
+        if goal_id in matches:
+            # Another detection of a goal already matched or created by this session
+            matches[goal_id]["statuses"].append(status)
+            continue
+        if goal_id is None:
+            goal_id = goal_doc_id(user_id, session_id, goal_text)
+            # Later detections in this session can match the new goal
+            index.add(goal_id, terms)
+        else:
+            logger.info(f"Matched goal {goal_id} (similarity {score:.2f}): {goal_text}")
+        matches[goal_id] = {"detected": detected_goal, "terms": terms, "statuses": [status]}
+    return matches
+
+
+async def _save_goals(transaction, session_id: str, user_id: str,
+                      matches: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    from google.cloud.firestore_v1 import ArrayUnion
+
+    goals_ref = db.collection(GOALS)
+    refs = {goal_id: goals_ref.document(goal_id) for goal_id in matches}
+    stored = {
+        snapshot.id: snapshot.to_dict() or {}
+        async for snapshot in db.get_all(list(refs.values()), transaction=transaction)
+        if snapshot.exists
+    }
+
+    current_time = datetime.now().isoformat()
+    counts = {"new_goals": 0, "updated_goals": 0}
+    for goal_id, match in matches.items():
+        detected_goal, statuses = match["detected"], match["statuses"]
+        goal_text = detected_goal.get("goal", "").lower().strip()
+        goal_data = stored.get(goal_id)
+
+        if goal_data is None:
+            # New goal (or a matched goal deleted since matching): create it
+            status = statuses[0]
+            for new_status in statuses[1:]:
+                if status_progresses(status, new_status):
+                    status = new_status
+            transaction.set(refs[goal_id], {
+                "user_id": user_id,
+                "goal": detected_goal.get("goal", ""),
+                "status": status,
+                "created_at": current_time,
+                "last_mentioned": current_time,
+                "session_mentions": [session_id],
+                "confidence_score": detected_goal.get("confidence", 0.0),
+                "category": detected_goal.get("category", "other"),
+                TERMS_FIELD: match["terms"]
+            })
+            counts["new_goals"] += 1
+            logger.info(f"Created new goal ({status}): {goal_text}")
+            continue
+
+        update_data: Dict[str, Any] = {
+            "last_mentioned": current_time,
+            "session_mentions": ArrayUnion([session_id])
+        }
+        if TERMS_FIELD not in goal_data:
+            # Goals stored before the index get their terms on first update
+            update_data[TERMS_FIELD] = goal_terms(goal_data.get("goal", ""))
+        current_status = goal_data.get("status", "imagined")
+        for new_status in statuses:
+            if status_progresses(current_status, new_status):
+                logger.info(f"Updated goal status from {current_status} to {new_status}: {goal_text}")
+                current_status = update_data["status"] = new_status
+        transaction.update(refs[goal_id], update_data)
+        counts["updated_goals"] += 1
+
+    return counts
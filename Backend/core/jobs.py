@@ -0,0 +1,481 @@
+"""
+Background Job Queue Module
+
+This module runs slow post-processing (such as summarizing a closed session)
+outside the HTTP request. Jobs are persisted in a pluggable store and executed
+by in-process asyncio workers started with the application.
+
+Stores:
+- SQLiteJobStore: local SQLite file (``settings.job_store_path``), survives
+  restarts and can be shared by several worker processes on one host (default)
+- MemoryJobStore: process memory only, for development
+
+Semantics:
+- Jobs carry a dedupe key: enqueueing while a job with the same key is queued
+  or running returns that job instead of creating a second one
+- A handler that raises is retried with exponential backoff until
+  ``settings.job_max_attempts`` is reached, then the job is marked failed
+- A running job holds a lease; if its worker dies, the job becomes claimable
+  again once the lease expires. Outcomes are recorded only for the attempt
+  that currently holds the job, so a worker that outlived its lease cannot
+  overwrite the status or result of the attempt that re-claimed it
+- Succeeded and failed jobs are deleted ``settings.job_retention_seconds``
+  after they finished
+
+Usage:
+    from core.jobs import job_queue, register_handler
+
+    register_handler("close_session", process_close)
+    job = await job_queue.enqueue("close_session", {"session_id": sid}, dedupe_key=sid)
+    job = await job_queue.get(job["job_id"])
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from core.config import settings
+import logging
+
+# Configure logging for background job processing
+logger = logging.getLogger(__name__)
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Handler signature: handler(payload, final_attempt) -> result dict.
+# ``final_attempt`` lets a handler accept a partial result instead of raising.
+JobHandler = Callable[[Dict[str, Any], bool], Awaitable[Dict[str, Any]]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def register_handler(kind: str, handler: JobHandler) -> None:
+    """Register the coroutine that executes jobs of ``kind``."""
+    _handlers[kind] = handler
+
+
+class JobStore(ABC):
+    """
+    Persistence interface for jobs.
+
+    Methods are synchronous and called from a worker thread; implementations
+    must be thread-safe. Job records are plain dicts with the keys job_id,
+    kind, dedupe_key, payload, status, attempts, run_after, result, error,
+    created_at and updated_at (timestamps are epoch seconds).
+    """
+
+    @abstractmethod
+    def enqueue(self, kind: str, payload: Dict[str, Any], dedupe_key: Optional[str]) -> Dict[str, Any]:
+        """Insert a queued job, or return the active job with the same dedupe key."""
+
+    @abstractmethod
+    def claim(self, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """Atomically take the next due job, mark it running and count the attempt."""
+
+    # complete/retry/fail take the attempt number returned by ``claim`` and
+    # return False without changing the job if that attempt no longer holds it
+
+    @abstractmethod
+    def complete(self, job_id: str, attempt: int, result: Dict[str, Any]) -> bool:
+        """Mark a job succeeded with its result."""
+
+    @abstractmethod
+    def retry(self, job_id: str, attempt: int, error: str, run_after: float) -> bool:
+        """Put a job back in the queue to run again after ``run_after``."""
+
+    @abstractmethod
+    def fail(self, job_id: str, attempt: int, error: str) -> bool:
+        """Mark a job permanently failed."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job record, or None if unknown."""
+
+    @abstractmethod
+    def prune(self, finished_before: float) -> int:
+        """Delete succeeded and failed jobs last updated before ``finished_before``; returns the count."""
+
+
+class MemoryJobStore(JobStore):
+    """Job store kept in process memory (jobs are lost on restart)."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._leases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], dedupe_key: Optional[str]) -> Dict[str, Any]:
+        with self._lock:
+            if dedupe_key is not None:
+                for job in self._jobs.values():
+                    if job["dedupe_key"] == dedupe_key and job["status"] in (QUEUED, RUNNING):
+                        return dict(job)
+            job = _new_job(kind, payload, dedupe_key)
+            self._jobs[job["job_id"]] = job
+            return dict(job)
+
+    def claim(self, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            due = [
+                job for job in self._jobs.values()
+                if (job["status"] == QUEUED and job["run_after"] <= now)
+                or (job["status"] == RUNNING and self._leases.get(job["job_id"], 0) <= now)
+            ]
+            if not due:
+                return None
+            job = min(due, key=lambda j: j["run_after"])
+            job.update(status=RUNNING, attempts=job["attempts"] + 1, updated_at=now)
+            self._leases[job["job_id"]] = now + lease_seconds
+            return dict(job)
+
+    def complete(self, job_id: str, attempt: int, result: Dict[str, Any]) -> bool:
+        return self._update(job_id, attempt, status=SUCCEEDED, result=result, error=None)
+
+    def retry(self, job_id: str, attempt: int, error: str, run_after: float) -> bool:
+        return self._update(job_id, attempt, status=QUEUED, error=error, run_after=run_after)
+
+    def fail(self, job_id: str, attempt: int, error: str) -> bool:
+        return self._update(job_id, attempt, status=FAILED, error=error)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def prune(self, finished_before: float) -> int:
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job["status"] in (SUCCEEDED, FAILED) and job["updated_at"] < finished_before]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+    def _update(self, job_id: str, attempt: int, **fields) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != RUNNING or job["attempts"] != attempt:
+                return False
+            job.update(fields, updated_at=time.time())
+            self._leases.pop(job_id, None)
+            return True
+
+
+class SQLiteJobStore(JobStore):
+    """Job store in a local SQLite database file."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            dedupe_key TEXT,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            run_after REAL NOT NULL,
+            lease_until REAL,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_dedupe_key
+            ON jobs (dedupe_key) WHERE status IN ('queued', 'running');
+        CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, run_after);
+        CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (status, updated_at);
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened lazily so importing the module never touches the filesystem
+        if self._conn is None:
+            conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self._SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                value = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return value
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], dedupe_key: Optional[str]) -> Dict[str, Any]:
+        def insert(conn: sqlite3.Connection) -> Dict[str, Any]:
+            if dedupe_key is not None:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE dedupe_key = ? AND status IN (?, ?)",
+                    (dedupe_key, QUEUED, RUNNING)
+                ).fetchone()
+                if row is not None:
+                    return _row_to_job(row)
+            job = _new_job(kind, payload, dedupe_key)
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, dedupe_key, payload, status, attempts, run_after, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job["job_id"], kind, dedupe_key, _dumps(payload), QUEUED, 0,
+                 job["run_after"], job["created_at"], job["updated_at"])
+            )
+            return job
+
+        return self._transaction(insert)
+
+    def claim(self, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        def take(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            now = time.time()
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE (status = ? AND run_after <= ?) OR (status = ? AND lease_until <= ?) "
+                "ORDER BY run_after LIMIT 1",
+                (QUEUED, now, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                (RUNNING, now + lease_seconds, now, row["job_id"])
+            )
+            job = _row_to_job(row)
+            job.update(status=RUNNING, attempts=job["attempts"] + 1, updated_at=now)
+            return job
+
+        return self._transaction(take)
+
+    def complete(self, job_id: str, attempt: int, result: Dict[str, Any]) -> bool:
+        return self._update(job_id, attempt, status=SUCCEEDED, result=_dumps(result), error=None)
+
+    def retry(self, job_id: str, attempt: int, error: str, run_after: float) -> bool:
+        return self._update(job_id, attempt, status=QUEUED, error=error, run_after=run_after)
+
+    def fail(self, job_id: str, attempt: int, error: str) -> bool:
+        return self._update(job_id, attempt, status=FAILED, error=error)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row is not None else None
+
+    def prune(self, finished_before: float) -> int:
+        return self._transaction(lambda conn: conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (SUCCEEDED, FAILED, finished_before)
+        ).rowcount)
+
+    def _update(self, job_id: str, attempt: int, **fields) -> bool:
+        fields.update(lease_until=None, updated_at=time.time())
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        return self._transaction(lambda conn: conn.execute(
+            f"UPDATE jobs SET {assignments} WHERE job_id = ? AND status = ? AND attempts = ?",
+            (*fields.values(), job_id, RUNNING, attempt)
+        ).rowcount == 1)
+
+
+def _new_job(kind: str, payload: Dict[str, Any], dedupe_key: Optional[str]) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        "job_id": uuid.uuid4().hex,
+        "kind": kind,
+        "dedupe_key": dedupe_key,
+        "payload": payload,
+        "status": QUEUED,
+        "attempts": 0,
+        "run_after": now,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _dumps(value: Any) -> str:
+    # Firestore timestamps and datetimes are stored as strings
+    return json.dumps(value, default=str)
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job.pop("lease_until", None)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+    return job
+
+
+class JobQueue:
+    """
+    Runs queued jobs on a pool of asyncio worker tasks.
+
+    Args:
+        store (JobStore): Where jobs are persisted
+        workers (int): Number of concurrent worker tasks
+        max_attempts (int): Attempts before a job is marked failed
+        retry_base_delay (float): Backoff before the first retry, doubled per attempt
+        retry_max_delay (float): Upper bound on the backoff
+        lease_seconds (float): How long a claimed job is reserved for its worker
+        retention_seconds (float): How long finished jobs are kept for status polls
+        poll_interval (float): Idle workers re-check for due retries this often
+        prune_interval (float): Finished jobs are pruned at most this often
+    """
+
+    def __init__(self, store: JobStore, workers: int, max_attempts: int, retry_base_delay: float,
+                 retry_max_delay: float, lease_seconds: float, retention_seconds: float = 7 * 86400,
+                 poll_interval: float = 1.0, prune_interval: float = 3600.0):
+        self.store = store
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self.poll_interval = poll_interval
+        self.prune_interval = prune_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._next_prune = 0.0
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any], dedupe_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Queue a job (or return the active job with the same dedupe key).
+
+        Returns:
+            Dict[str, Any]: The job record
+        """
+        if kind not in _handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job = await asyncio.to_thread(self.store.enqueue, kind, payload, dedupe_key)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job record, or None if unknown."""
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work(n)) for n in range(self.workers)]
+        logger.info(f"Started {self.workers} background job workers")
+
+    async def stop(self) -> None:
+        """
+        Cancel the worker tasks.
+
+        Jobs interrupted mid-run stay leased and are picked up again when the
+        lease expires.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _work(self, worker: int) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Job worker {worker} could not claim a job: {e}")
+                job = None
+
+            if job is None:
+                await self._prune()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._execute(job)
+            except Exception as e:
+                # Recording the outcome failed (e.g. the store is locked); the
+                # job stays leased and runs again once the lease expires
+                logger.error(f"Job worker {worker} could not finish job {job['job_id']} ({job['kind']}): {e}")
+
+    async def _prune(self) -> None:
+        """Delete expired finished jobs, at most once per ``prune_interval`` (from an idle worker)."""
+        now = time.monotonic()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.prune_interval
+        try:
+            pruned = await asyncio.to_thread(self.store.prune, time.time() - self.retention_seconds)
+        except Exception as e:
+            logger.error(f"Could not prune finished jobs: {e}")
+            return
+        if pruned:
+            logger.info(f"Pruned {pruned} finished background jobs")
+
+    async def _record(self, method: Callable[..., bool], job_id: str, *args) -> None:
+        """Record an attempt's outcome, unless the job was re-claimed after the lease expired."""
+        if not await asyncio.to_thread(method, job_id, *args):
+            logger.warning(f"Job {job_id} outcome of attempt {args[0]} discarded: "
+                           f"the lease expired and the job was claimed again")
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        job_id, kind, attempt = job["job_id"], job["kind"], job["attempts"]
+        handler = _handlers.get(kind)
+        if handler is None:
+            await self._record(self.store.fail, job_id, attempt, f"No handler registered for job kind '{kind}'")
+            return
+
+        final_attempt = attempt >= self.max_attempts
+        start = time.perf_counter()
+        try:
+            result = await handler(job["payload"], final_attempt)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if final_attempt:
+                logger.error(f"Job {job_id} ({kind}) failed after {attempt} attempts: {error}")
+                await self._record(self.store.fail, job_id, attempt, error)
+                return
+            delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt - 1))
+            delay *= random.uniform(0.8, 1.2)
+            logger.warning(f"Job {job_id} ({kind}) attempt {attempt} failed, retrying in {delay:.1f}s: {error}")
+            await self._record(self.store.retry, job_id, attempt, error, time.time() + delay)
+            return
+
+        await self._record(self.store.complete, job_id, attempt, result)
+        logger.info(f"Job {job_id} ({kind}) succeeded on attempt {attempt} in "
+                    f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def _create_store() -> JobStore:
+    if settings.job_store == "memory":
+        return MemoryJobStore()
+    return SQLiteJobStore(settings.job_store_path)
+
+
+# Global job queue; workers are started from the application lifespan
+job_queue = JobQueue(
+    _create_store(),
+    workers=settings.job_workers,
+    max_attempts=settings.job_max_attempts,
+    retry_base_delay=settings.job_retry_base_delay,
+    retry_max_delay=settings.job_retry_max_delay,
+    lease_seconds=settings.job_lease_seconds,
+    retention_seconds=settings.job_retention_seconds,
+)
@@ -0,0 +1,153 @@
+"""
+LLM Execution Module
+
+This module runs the blocking Gemini SDK calls on their own bounded thread
+pool instead of the event loop's default executor, so a burst of generation
+requests cannot exhaust the threads other work (such as Firestore calls)
+relies on.
+
+- At most ``max_concurrency`` calls run at once (semaphore); a call holds its
+  slot until the SDK call returns, even if the caller stopped waiting
+- Up to ``max_queue`` callers wait for a slot, each for at most
+  ``queue_timeout`` seconds; beyond that calls are shed with ``LLMOverloaded``
+  so callers can answer with a fallback immediately instead of queueing
+- ``stats()`` reports in-flight and queued calls, queue wait times and
+  completed / shed counts for monitoring
+
+Usage:
+    from core.llm_executor import LLMOverloaded, llm_executor
+
+    try:
+        response = await llm_executor.run(model.generate_content, prompt)
+    except LLMOverloaded:
+        return fallback
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+from core.config import settings
+from core.metrics import registry
+
+
+class LLMOverloaded(Exception):
+    """Raised when a call is shed because the LLM queue is saturated."""
+
+
+class LLMExecutor:
+    """
+    Bounded thread pool with a concurrency limit and load shedding.
+
+    Args:
+        threads (int): Worker threads for blocking SDK calls
+        max_concurrency (int): Calls allowed to run at once
+        max_queue (int): Callers allowed to wait for a slot; more are shed
+        queue_timeout (float, optional): Seconds a caller waits for a slot
+            before it is shed (None = wait indefinitely)
+    """
+
+    def __init__(self, threads: int, max_concurrency: int, max_queue: int,
+                 queue_timeout: Optional[float] = None):
+        self.threads = threads
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="llm")
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._wait_samples: Deque[float] = deque(maxlen=1000)
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "shed": 0, "queue_timeouts": 0, "max_waiting": 0}
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """Run a blocking call on the pool once a slot is free and return its result."""
+        return await (await self.submit(func, *args))
+
+    async def submit(self, func: Callable[..., Any], *args) -> "asyncio.Future":
+        """
+        Wait for a slot, start ``func(*args)`` on the pool and return its future.
+
+        The slot is released when ``func`` returns, which lets long-running
+        producers (such as streaming responses) hold a slot for their whole run.
+
+        Raises:
+            LLMOverloaded: If the queue is full or no slot frees up in time
+        """
+        await self._acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        self._stats["submitted"] += 1
+        future.add_done_callback(lambda f: self._release_threadsafe(loop, f))
+        return asyncio.wrap_future(future, loop=loop)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, concurrency and shedding counters."""
+        waits = sorted(self._wait_samples)
+        stats = dict(
+            self._stats,
+            in_flight=self._in_flight,
+            waiting=self._waiting,
+            threads=self.threads,
+            max_concurrency=self.max_concurrency,
+            max_queue=self.max_queue,
+        )
+        if waits:
+            stats["queue_wait_ms_p50"] = round(waits[len(waits) // 2] * 1000, 1)
+            stats["queue_wait_ms_p95"] = round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1)
+        return stats
+
+    async def _acquire(self) -> None:
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self._stats["shed"] += 1
+            raise LLMOverloaded(f"LLM queue is full ({self._waiting} waiting)")
+
+        self._waiting += 1
+        self._stats["max_waiting"] = max(self._stats["max_waiting"], self._waiting)
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self._stats["shed"] += 1
+            self._stats["queue_timeouts"] += 1
+            raise LLMOverloaded(f"No LLM slot within {self.queue_timeout}s") from None
+        finally:
+            self._waiting -= 1
+        self._wait_samples.append(time.perf_counter() - start)
+        self._in_flight += 1
+
+    def _release(self, future) -> None:
+        self._in_flight -= 1
+        if future is not None:
+            failed = future.cancelled() or future.exception() is not None
+            self._stats["failed" if failed else "completed"] += 1
+        self._semaphore.release()
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop, future) -> None:
+        # Runs on the worker thread; the semaphore belongs to the event loop
+        try:
+            loop.call_soon_threadsafe(self._release, future)
+        except RuntimeError:
+            pass  # Loop already closed (shutdown); nothing left to release to
+
+
+# Shared executor for all Gemini calls
+llm_executor = LLMExecutor(
+    settings.llm_threads,
+    settings.llm_max_concurrency,
+    settings.llm_max_queue,
+    settings.llm_queue_timeout,
+)
+
+registry.register_callback("llm_calls_in_flight", "Gemini calls running on the LLM pool",
+                           lambda: llm_executor._in_flight)
+registry.register_callback("llm_calls_waiting", "Gemini calls waiting for an LLM slot",
+                           lambda: llm_executor._waiting)
+registry.register_callback("llm_calls_shed_total", "Gemini calls shed because the LLM queue was full",
+                           lambda: llm_executor._stats["shed"], kind="counter")
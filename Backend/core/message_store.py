@@ -0,0 +1,190 @@
+"""
+Session Message Storage Module
+
+This module hides how a session's messages are stored in Firestore. Two storage
+modes are supported side by side:
+
+- array: messages live in the ``messages`` array on the session document
+  (original layout, appended with ``ArrayUnion``)
+- subcollection: messages live in ``sessions/{id}/messages`` as individual
+  documents ordered by a monotonic ``seq`` number, and the session document
+  only keeps ``message_count``
+
+New sessions use ``settings.message_storage``; existing sessions keep the mode
+recorded on their document (no ``message_storage`` field means array), so both
+layouts can be served while ``scripts/migrate_messages_to_subcollection.py``
+converts old sessions.
+
+Usage:
+    from core.message_store import append_messages, load_messages, tail_messages
+
+    await append_messages(session_ref, session_data, [msg_data])
+    recent = await tail_messages(session_ref, session_data, 20)
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from core.config import settings
+from core.repository import collect, db, run_transaction
+from core.emotion_analysis import new_analytics_state
+from core.session_analytics import ANALYTICS_FIELD, analytics_update
+from core.session_index import INDEXED_FIELD, append_writes
+import logging
+
+# Configure logging for message storage operations
+logger = logging.getLogger(__name__)
+
+# Storage modes and the fields that describe them on the session document
+ARRAY = "array"
+SUBCOLLECTION = "subcollection"
+STORAGE_FIELD = "message_storage"
+COUNT_FIELD = "message_count"
+MESSAGES_SUBCOLLECTION = "messages"
+
+
+def new_session_fields() -> Dict[str, Any]:
+    """
+    Fields to include when creating a session document.
+
+    Returns:
+        Dict[str, Any]: Storage layout fields, an empty running-analytics state
+            and the index flag (the caller writes the matching index entry)
+    """
+    fields: Dict[str, Any] = {ANALYTICS_FIELD: new_analytics_state(), INDEXED_FIELD: True}
+    if settings.message_storage == SUBCOLLECTION:
+        fields.update({STORAGE_FIELD: SUBCOLLECTION, COUNT_FIELD: 0})
+    else:
+        fields["messages"] = []
+    return fields
+
+
+def uses_subcollection(session_data: Dict[str, Any]) -> bool:
+    """Check whether a session document stores its messages in the subcollection."""
+    return session_data.get(STORAGE_FIELD) == SUBCOLLECTION
+
+
+def message_count(session_data: Dict[str, Any]) -> int:
+    """
+    Number of messages in a session, without reading the messages themselves.
+
+    Also works on documents read without the ``messages`` array (see
+    ``core.projections``): array-layout sessions are then counted from the
+    running analytics state.
+    """
+    if uses_subcollection(session_data):
+        return session_data.get(COUNT_FIELD, 0)
+    if "messages" not in session_data and ANALYTICS_FIELD in session_data:
+        return session_data[ANALYTICS_FIELD].get("total_messages", 0)
+    return len(session_data.get("messages", []))
+
+
+def count_available(session_data: Dict[str, Any]) -> bool:
+    """Whether ``message_count`` is exact for a document that may lack the ``messages`` array."""
+    return uses_subcollection(session_data) or "messages" in session_data or ANALYTICS_FIELD in session_data
+
+
+def message_doc_id(seq: int) -> str:
+    """Zero-padded document id so lexical and numeric ordering agree."""
+    return f"{seq:010d}"
+
+
+async def append_messages(session_ref, session_data: Dict[str, Any], new_messages: List[dict]) -> None:
+    """
+    Append messages to a session, updating its running analytics and index entry.
+
+    Args:
+        session_ref: Firestore reference of the session document
+        session_data (Dict[str, Any]): Session document as read before the append
+        new_messages (List[dict]): Messages to append, in order
+    """
+    from google.cloud.firestore_v1 import ArrayUnion
+
+    index_doc, index_fields, index_session_fields = append_writes(session_ref.id, session_data, new_messages)
+    session_fields = {**analytics_update(session_data, new_messages), **index_session_fields}
+
+    if not uses_subcollection(session_data):
+        batch = db.batch()
+        batch.update(session_ref, {"messages": ArrayUnion(new_messages), **session_fields})
+        if index_doc is not None:
+            batch.set(index_doc, index_fields, merge=True)
+        await batch.commit()
+        return
+
+    # Sequence numbers are assigned inside a transaction so concurrent appends
+    # to the same session never share or skip a number
+    await run_transaction(_append_to_subcollection, session_ref, new_messages, session_fields,
+                          index_doc, index_fields)
+
+
+async def _append_to_subcollection(transaction, session_ref, new_messages: List[dict],
+                                   extra_updates: Dict[str, Any], index_doc, index_fields: Dict[str, Any]) -> None:
+    snapshot = await session_ref.get(transaction=transaction)
+    next_seq = (snapshot.to_dict() or {}).get(COUNT_FIELD, 0)
+
+    messages_ref = session_ref.collection(MESSAGES_SUBCOLLECTION)
+    for message in new_messages:
+        transaction.set(messages_ref.document(message_doc_id(next_seq)), {**message, "seq": next_seq})
+        next_seq += 1
+
+    transaction.update(session_ref, {COUNT_FIELD: next_seq, **extra_updates})
+    if index_doc is not None:
+        transaction.set(index_doc, index_fields, merge=True)
+
+
+async def load_messages(session_ref, session_data: Dict[str, Any]) -> List[dict]:
+    """Read every message of a session in order."""
+    if not uses_subcollection(session_data):
+        return session_data.get("messages", [])
+    query = session_ref.collection(MESSAGES_SUBCOLLECTION).order_by("seq")
+    return [doc.to_dict() for doc in await collect(query)]
+
+
+async def tail_messages(session_ref, session_data: Dict[str, Any], limit: int) -> List[dict]:
+    """
+    Read the last ``limit`` messages of a session in chronological order.
+
+    Used where only recent context matters, e.g. question generation.
+    """
+    from google.cloud.firestore_v1 import Query
+
+    if not uses_subcollection(session_data):
+        return session_data.get("messages", [])[-limit:]
+    query = session_ref.collection(MESSAGES_SUBCOLLECTION)\
+        .order_by("seq", direction=Query.DESCENDING)\
+        .limit(limit)
+    return list(reversed([doc.to_dict() for doc in await collect(query)]))
+
+
+async def page_messages(session_ref, session_data: Dict[str, Any], cursor: Optional[int] = None,
+                  limit: Optional[int] = None) -> Tuple[List[dict], Optional[int]]:
+    """
+    Read a page of messages after a cursor.
+
+    Args:
+        session_ref: Firestore reference of the session document
+        session_data (Dict[str, Any]): Session document
+        cursor (int, optional): Sequence number of the last message already seen
+        limit (int, optional): Maximum messages to return (all remaining if omitted)
+
+    Returns:
+        Tuple[List[dict], Optional[int]]: The messages and the cursor for the
+            next page (None when there are no more messages)
+    """
+    start = 0 if cursor is None else cursor + 1
+
+    if not uses_subcollection(session_data):
+        messages = session_data.get("messages", [])
+        end = len(messages) if limit is None else start + limit
+        page = messages[start:end]
+        next_cursor = end - 1 if end < len(messages) else None
+        return page, next_cursor
+
+    query = session_ref.collection(MESSAGES_SUBCOLLECTION).order_by("seq")
+    if cursor is not None:
+        query = query.start_after({"seq": cursor})
+    if limit is not None:
+        query = query.limit(limit)
+    page = [doc.to_dict() for doc in await collect(query)]
+
+    last_seq = page[-1]["seq"] if page else None
+    has_more = last_seq is not None and last_seq + 1 < message_count(session_data)
+    return page, last_seq if has_more else None
@@ -0,0 +1,229 @@
+"""
+Metrics Module
+
+This module keeps the app's metrics in process and renders them in the
+Prometheus text format for the ``/metrics`` endpoint, without a client
+library or collector:
+
+- Counter, Gauge and Histogram families with fixed label names; ``labels()``
+  returns a child that is created once per label combination and reused
+- histograms have pre-computed bucket bounds, so an observation is one
+  ``bisect`` and two additions; cumulative bucket counts are only computed
+  when the metrics are rendered
+- callback metrics (``register_callback``, ``watch_cache``) read existing
+  ``stats()`` counters at render time instead of being updated per call
+
+Updates take no locks. They are made on the event loop thread (request
+handlers, middleware and awaited Firestore/Gemini calls), so they never race.
+``render()`` returns the exposition text, so metrics can be checked in tests
+and benchmarks by rendering or by reading a child's ``value``/``count``/``sum``.
+
+Usage:
+    from core.metrics import registry
+
+    LATENCY = registry.histogram("job_duration_seconds", "Job run time", ("job",))
+    LATENCY.labels("close_session").observe(elapsed)
+
+    registry.watch_cache("llm_response", response_cache.stats)
+    text = registry.render()
+"""
+
+import math
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from a cache hit to a slow Gemini generation
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Text size buckets in characters (prompts and responses)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)
+
+# A rendered family: (name, type, help, [(name suffix, labels, value)])
+Samples = Tuple[str, str, str, List[Tuple[str, Dict[str, Any], float]]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(labels: Dict[str, Any]) -> str:
+    """``{a="x",b="y"}`` (empty string without labels)."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One count per bucket plus the +Inf bucket; not cumulative
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+class MetricFamily:
+    """
+    A named metric with fixed label names and one child per label combination.
+
+    Args:
+        name (str): Metric name (counters should end in ``_total``)
+        documentation (str): HELP text
+        kind (str): ``counter``, ``gauge`` or ``histogram``
+        labelnames (Sequence[str]): Label names, in the order ``labels()`` takes values
+        buckets (Sequence[float], optional): Histogram bucket upper bounds
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str] = (),
+                 buckets: Optional[Sequence[float]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets or LATENCY_BUCKETS))
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def labels(self, *values: Any):
+        """The child for these label values, created on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            if self.kind == "histogram":
+                child = _HistogramChild(self.buckets)
+            elif self.kind == "gauge":
+                child = _GaugeChild()
+            else:
+                child = _CounterChild()
+            self._children[values] = child
+        return child
+
+    def samples(self) -> Samples:
+        rows: List[Tuple[str, Dict[str, Any], float]] = []
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            if self.kind != "histogram":
+                rows.append(("", labels, child.value))
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                rows.append(("_bucket", {**labels, "le": _number(float(bound))}, cumulative))
+            rows.append(("_sum", labels, child.sum))
+            rows.append(("_count", labels, cumulative))
+        return self.name, self.kind, self.documentation, rows
+
+
+class MetricsRegistry:
+    """Metric families and render-time collectors of the process."""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._collectors: List[Callable[[], Iterable[Samples]]] = []
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self.register_collector(self._collect_caches)
+
+    def _family(self, name: str, documentation: str, kind: str, labelnames: Sequence[str],
+                buckets: Optional[Sequence[float]] = None) -> MetricFamily:
+        if name in self._families:
+            raise ValueError(f"Metric {name} is already registered")
+        family = self._families[name] = MetricFamily(name, documentation, kind, labelnames, buckets)
+        return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._family(name, documentation, "counter", labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._family(name, documentation, "gauge", labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> MetricFamily:
+        return self._family(name, documentation, "histogram", labelnames, buckets)
+
+    def register_collector(self, collect: Callable[[], Iterable[Samples]]) -> None:
+        """Add a callable returning sample families, called on every render."""
+        self._collectors.append(collect)
+
+    def register_callback(self, name: str, documentation: str, read: Callable[[], float],
+                          kind: str = "gauge") -> None:
+        """Add an unlabelled metric whose value is read at render time."""
+        self.register_collector(lambda: [(name, kind, documentation, [("", {}, read())])])
+
+    def watch_cache(self, name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        """Report a cache's ``stats()`` (``hits``, ``misses``, optional ``entries``) as ``cache_*`` metrics."""
+        self._caches[name] = stats
+
+    def _collect_caches(self) -> Iterable[Samples]:
+        rows = [(name, stats() or {}) for name, stats in self._caches.items()]
+        if not rows:
+            return []
+        hits = [("", {"cache": name}, stats.get("hits", 0)) for name, stats in rows]
+        misses = [("", {"cache": name}, stats.get("misses", 0)) for name, stats in rows]
+        ratios = [("", {"cache": name}, stats.get("hits", 0) / max(1, stats.get("hits", 0) + stats.get("misses", 0)))
+                  for name, stats in rows]
+        # TieredCache reports entries per tier; count the memory tier
+        entries = [("", {"cache": name}, stats.get("entries", stats.get("memory", {}).get("entries", 0)))
+                   for name, stats in rows]
+        return [
+            ("cache_hits_total", "counter", "Cache lookups answered from the cache", hits),
+            ("cache_misses_total", "counter", "Cache lookups that missed", misses),
+            ("cache_hit_ratio", "gauge", "Fraction of cache lookups that were hits since start", ratios),
+            ("cache_entries", "gauge", "Entries held in memory by the cache", entries),
+        ]
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        families = [family.samples() for family in self._families.values()]
+        for collect in self._collectors:
+            families.extend(collect())
+
+        lines: List[str] = []
+        for name, kind, documentation, rows in families:
+            lines.append(f"# HELP {name} {_escape(documentation)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in rows:
+                lines.append(f"{name}{suffix}{_label_text(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry rendered by GET /metrics
+registry = MetricsRegistry()
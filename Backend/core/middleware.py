@@ -1,34 +1,147 @@
-from fastapi import Request
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+"""
+HTTP Middleware Module
+
+This module provides the app's middleware as plain ASGI callables rather than
+Starlette's ``BaseHTTPMiddleware``, which runs every request in an extra task
+and re-streams every response through a memory channel. Here ``receive`` and
+``send`` are passed through untouched (only the response start message is
+inspected or extended), so streamed responses such as the SSE question
+endpoint reach the client chunk by chunk and the per-request cost is a few
+function calls.
+
+Middleware:
+- AuthMiddleware: requires a Firebase ID token (verified by
+  ``core.token_verifier``) and stores its claims in ``scope["state"]["user"]``,
+  which endpoints read as ``request.state.user`` through ``get_current_user``.
+  ``/open`` routes and ``/health`` (load balancer probes carry no token) are
+  public; ``/metrics`` is public only with ``METRICS_PUBLIC=true``, for
+  scrapers that reach the service on a private network
+- TimingMiddleware: measures each request until its last body chunk, adds a
+  ``Server-Timing`` header (time until the response started), records it in
+  the ``http_request_duration_seconds`` histogram (by method, route template
+  and status) and the ``http_requests_in_flight`` gauge, and logs requests
+  slower than ``settings.slow_request_ms``
+
+Usage:
+    from core.middleware import AuthMiddleware, TimingMiddleware
+
+    app.add_middleware(AuthMiddleware)
+    app.add_middleware(TimingMiddleware)
+"""
+
+import logging
+import time
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from core.config import settings
-from core.firebase import auth_client
+from core.metrics import registry
+from core.token_verifier import token_verifier
+
+# Configure logging for request middleware
+logger = logging.getLogger(__name__)
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request time until the last response chunk",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests being handled").labels()
+# Other methods are reported as "other" so clients cannot create label values at will
+_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+def route_name(scope: Scope) -> str:
+    """Route template of a handled request (e.g. ``/session/close/status/{job_id}``)."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    # Depending on the FastAPI version the route's path may lack its router's
+    # prefix; recover the prefix from the request path
+    try:
+        matched = route.path_format.format(**scope.get("path_params", {}))
+    except (AttributeError, KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if matched != path and path.endswith(matched):
+        return path[:len(path) - len(matched)] + template
+    return template
+
+
+class AuthMiddleware:
+    """Requires a valid Firebase ID token on every HTTP request except public routes."""
 
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Exact paths served without a token (besides the /open prefix)
+        self.public_paths = frozenset({"/health"} | ({"/metrics"} if settings.metrics_public else set()))
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Allow open endpoints without auth
-        if request.url.path.startswith("/open"):  # you can define any public routes
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Allow open endpoints without auth (and leave lifespan/websocket traffic alone)
+        if scope["type"] != "http" or scope["path"].startswith("/open") or scope["path"] in self.public_paths:
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
 
         # Dev bypass
         if settings.environment == "dev":
-            request.state.user = {"uid": "test-user", "email": "test@example.com"}
-            return await call_next(request)
+            state["user"] = {"uid": "test-user", "email": "test@example.com"}
+            await self.app(scope, receive, send)
+            return
 
         # Prod → Require Firebase ID Token
-        auth_header = request.headers.get("authorization")
+        auth_header = next((value for name, value in scope["headers"] if name == b"authorization"), None)
         if not auth_header:
-            return JSONResponse({"detail": "Missing Authorization header"}, status_code=401)
+            await JSONResponse({"detail": "Missing Authorization header"}, status_code=401)(scope, receive, send)
+            return
 
         try:
-            scheme, token = auth_header.split(" ")
+            scheme, token = auth_header.decode("latin-1").split(" ")
             if scheme.lower() != "bearer":
                 raise ValueError("Invalid auth scheme")
 
-            decoded_token = auth_client.verify_id_token(token)
-            request.state.user = decoded_token
-            return await call_next(request)
-
+            # Verified locally against cached signing keys; repeated tokens hit the claims cache
+            state["user"] = await token_verifier.verify(token)
         except Exception:
-            return JSONResponse({"detail": "Invalid or expired token"}, status_code=401)
+            await JSONResponse({"detail": "Invalid or expired token"}, status_code=401)(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
+class TimingMiddleware:
+    """Adds a ``Server-Timing`` header to each HTTP response, records its latency and logs slow requests."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500  # Reported if the app fails before starting a response
+        REQUESTS_IN_FLIGHT.inc()
+
+        async def timed_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                message["headers"] = list(message.get("headers", [])) + \
+                    [(b"server-timing", f"app;dur={elapsed_ms:.1f}".encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            route = route_name(scope)
+            method = scope["method"] if scope["method"] in _METHODS else "other"
+            REQUEST_DURATION.labels(method, route, status).observe(elapsed)
+            elapsed_ms = elapsed * 1000
+            if elapsed_ms >= settings.slow_request_ms:
+                logger.warning(f"Slow request: {scope['method']} {route} -> {status} "
+                               f"in {elapsed_ms:.0f} ms")
@@ -0,0 +1,88 @@
+"""
+Field Projection Module
+
+This module declares, per endpoint, which document fields it actually uses,
+so reads can ask Firestore for only those fields (a field mask) instead of
+whole documents. Session documents in the array layout carry every message,
+and summaries carry full analytics, so listings and checks that only need a
+date or a count otherwise transfer far more than they use.
+
+Projections apply to queries (``select``) and single-document reads
+(``field_paths``). Set ``FIRESTORE_FIELD_MASKS=false`` to read whole
+documents everywhere (for example with a client that does not support masks).
+
+Session counts come from the ``message_count`` field (subcollection layout) or
+the running analytics state (array layout), so sessions from before running
+analytics need ``scripts/reconcile_session_analytics.py --fix`` to be counted
+from a projection; ``message_store.count_available`` tells the two apart.
+
+Usage:
+    from core.projections import get_fields, project
+
+    sessions = await collect(project(db.collection("sessions").where(...), "debug_sessions"))
+    snapshot = await get_fields(summary_ref, "session_summary")
+"""
+
+from typing import Dict, List, Optional, Tuple
+from core.activity import ACTIVITY_FIELD
+from core.config import settings
+from core.goal_index import TERMS_FIELD
+from core.message_store import COUNT_FIELD, STORAGE_FIELD
+from core.session_analytics import ANALYTICS_FIELD
+from core.summary_index import EMBEDDING_FIELD
+
+# Everything message_count / message_counts need, without the messages
+SESSION_COUNTS = (
+    STORAGE_FIELD,
+    COUNT_FIELD,
+    f"{ANALYTICS_FIELD}.total_messages",
+    f"{ANALYTICS_FIELD}.user_messages",
+)
+
+PROJECTIONS: Dict[str, Tuple[str, ...]] = {
+    # GET /session/debug/sessions: array-layout sessions return their messages
+    # with the listing (subcollection-layout sessions have no messages field)
+    "debug_sessions": SESSION_COUNTS + ("created_at", "messages"),
+    # POST /session/close: length check before queueing the close job
+    "close_session": SESSION_COUNTS,
+    # GET /session/summary/{session_id} for a summarized session
+    "session_summary": ("summary", "analytics", "created_at"),
+    # GET /history/session: summary block of a summarized session
+    "history_summary": ("summary", "analytics", "goal_tracking"),
+    # Question generation: active goals and the summary similarity index
+    "context_goals": ("goal", "status", "category"),
+    "context_summaries": ("summary", "created_at", EMBEDDING_FIELD),
+    # Syncing a cached summary index: which summaries exist, without text or embeddings
+    "summary_listing": ("created_at",),
+    # Session close: matching detected goals to the user's goals (text for older goals without terms)
+    "goal_match": ("goal", TERMS_FIELD),
+    # Session close: the user's previous overall summary (not the rollup)
+    "overall_summary": ("overall_summary",),
+    # POST /session: the user's activity counters (user_summaries)
+    "activity": (ACTIVITY_FIELD,),
+    # GET /statistics/: activity counters and the number of summarized sessions
+    "statistics": (ACTIVITY_FIELD, "rollup.sessions"),
+    # Reopening a session: whether it has a summary
+    "summary_exists": ("user_id",),
+    # GET /statistics/goals: every returned field (not the stored match terms)
+    "goal_list": ("user_id", "goal", "status", "category", "created_at", "last_mentioned",
+                  "session_mentions", "confidence_score"),
+}
+
+
+def fields(endpoint: str) -> Optional[List[str]]:
+    """Fields read for an endpoint, or None (whole documents) when masks are disabled."""
+    if not settings.firestore_field_masks:
+        return None
+    return list(PROJECTIONS[endpoint])
+
+
+def project(query, endpoint: str):
+    """Restrict a query to the fields an endpoint uses."""
+    field_paths = fields(endpoint)
+    return query.select(field_paths) if field_paths is not None else query
+
+
+async def get_fields(ref, endpoint: str, transaction=None):
+    """Read one document with only the fields an endpoint uses."""
+    return await ref.get(field_paths=fields(endpoint), transaction=transaction)
@@ -0,0 +1,96 @@
+"""
+Lazy Client Providers Module
+
+This module defers creating the app's external service clients (Firebase,
+Firestore, Gemini) until they are first used, so importing ``main`` does not
+initialize SDKs, look up credentials or build connection channels, and the
+server answers ``/health`` as soon as uvicorn starts.
+
+- LazyClient: creates its client on first use, exactly once even when several
+  threads ask at the same time; attribute access is forwarded to the client,
+  so a module-level ``LazyClient`` is used like the client itself. It is falsy
+  when the client is unavailable (the factory returned None), which is how
+  callers detect that a service is not configured: ``if not db``.
+- warm_up: creates clients concurrently on worker threads, for the FastAPI
+  lifespan hook (see ``CLIENT_WARMUP``), so the first request does not pay
+  for initialization either.
+
+Usage:
+    from core.providers import LazyClient, warm_up
+
+    db = LazyClient("Firestore", create_client)
+    if not db:
+        ...  # Not configured (development mode)
+    snapshot = await db.collection("sessions").document(session_id).get()
+
+    await warm_up(db, model)
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Optional
+import logging
+
+# Configure logging for client initialization
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+
+
+class LazyClient:
+    """
+    Thread-safe, lazily created client.
+
+    Args:
+        name (str): Service name for logs and errors
+        factory (Callable): Creates the client; may return None when the
+            service is not configured. Called at most once.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Optional[Any]]):
+        self._name = name
+        self._factory = factory
+        self._client: Any = _UNSET
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[Any]:
+        """The client (None when unavailable), creating it on the first call."""
+        client = self._client
+        if client is _UNSET:
+            with self._lock:
+                if self._client is _UNSET:
+                    start = time.perf_counter()
+                    self._client = self._factory()
+                    logger.info(f"{self._name} client initialized in {(time.perf_counter() - start) * 1000:.0f} ms")
+                client = self._client
+        return client
+
+    @property
+    def initialized(self) -> bool:
+        """Whether the client has been created (without creating it)."""
+        return self._client is not _UNSET
+
+    def __bool__(self) -> bool:
+        return self.get() is not None
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes the wrapper itself does not have
+        client = self.get()
+        if client is None:
+            raise RuntimeError(f"{self._name} is not available")
+        return getattr(client, name)
+
+    def __repr__(self) -> str:
+        state = repr(self._client) if self.initialized else "not initialized"
+        return f"<LazyClient {self._name}: {state}>"
+
+
+async def warm_up(*clients: LazyClient) -> None:
+    """Create the given clients concurrently on worker threads."""
+    start = time.perf_counter()
+    results = await asyncio.gather(*(asyncio.to_thread(client.get) for client in clients), return_exceptions=True)
+    for client, result in zip(clients, results):
+        if isinstance(result, Exception):
+            logger.error(f"Warming up {client._name} failed: {result}")
+    logger.info(f"Warmed up {len(clients)} clients in {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -0,0 +1,477 @@
+"""
+Firestore Data Access Module
+
+This module provides the asynchronous Firestore client used by all API routers,
+so request handlers never block the event loop on a Firestore round trip.
+
+Two implementations share the same (google-cloud-firestore async) interface:
+- AsyncClient: the native ``google.cloud.firestore.AsyncClient`` created through
+  ``firebase_admin.firestore_async`` (default)
+- ThreadedClient: wraps the synchronous client from ``core.firebase`` and runs
+  every network call on a dedicated thread pool; used when the async client
+  cannot be created or when ``FIRESTORE_CLIENT=threaded``
+
+Both expose ``collection()``, ``document()``, ``batch()`` and ``get_all()``;
+references, queries and batches return awaitables / async iterators exactly as
+the native async client does. Transactions go through ``run_transaction`` so
+callers do not depend on which implementation is active.
+
+With ``METRICS_ENABLED`` either client is wrapped in ``MeasuredClient``, which
+times every call in the ``firestore_operation_duration_seconds`` histogram by
+collection path (subcollections as ``sessions/messages``) and operation, and
+each transaction as a whole in ``firestore_transaction_duration_seconds``.
+
+The client is created on first use (see core/providers.py), so importing this
+module neither initializes Firebase nor opens a connection. ``db`` is falsy
+when Firestore is not configured.
+
+Usage:
+    from core.repository import db, collect, run_transaction
+
+    snapshot = await db.collection("sessions").document(session_id).get()
+    summaries = await collect(db.collection("session_summaries").where("user_id", "==", uid))
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional
+from core.config import settings
+from core import firebase
+from core.metrics import registry
+from core.providers import LazyClient
+import logging
+
+# Configure logging for data access operations
+logger = logging.getLogger(__name__)
+
+class _WorkerState(threading.local):
+    # Class default, so reading the flag on other threads does not raise internally
+    active = False
+
+
+_worker = _WorkerState()
+
+
+def _mark_worker():
+    _worker.active = True
+
+
+# Dedicated pool for the threaded fallback, so Firestore calls never compete
+# with other work for the event loop's default executor
+_executor = ThreadPoolExecutor(
+    max_workers=settings.firestore_threads,
+    thread_name_prefix="firestore",
+    initializer=_mark_worker
+)
+
+
+async def _run(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking Firestore call on the pool (inline when already on a pool thread)."""
+    if _worker.active:
+        return fn(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+def _unwrap(value: Any) -> Any:
+    """Return the object behind a threaded or measured wrapper (one level)."""
+    return getattr(value, "_wrapped", value)
+
+
+class ThreadedSnapshot:
+    """Document snapshot whose ``reference`` is a threaded document reference."""
+
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    @property
+    def reference(self) -> "ThreadedDocument":
+        return ThreadedDocument(self._wrapped.reference)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._wrapped, name)
+
+
+class ThreadedQuery:
+    """Async facade over a synchronous Firestore query."""
+
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    def where(self, *args, **kwargs) -> "ThreadedQuery":
+        return ThreadedQuery(self._wrapped.where(*args, **kwargs))
+
+    def order_by(self, *args, **kwargs) -> "ThreadedQuery":
+        return ThreadedQuery(self._wrapped.order_by(*args, **kwargs))
+
+    def limit(self, count: int) -> "ThreadedQuery":
+        return ThreadedQuery(self._wrapped.limit(count))
+
+    def offset(self, count: int) -> "ThreadedQuery":
+        return ThreadedQuery(self._wrapped.offset(count))
+
+    def select(self, field_paths) -> "ThreadedQuery":
+        return ThreadedQuery(self._wrapped.select(field_paths))
+
+    def start_after(self, document_fields_or_snapshot) -> "ThreadedQuery":
+        return ThreadedQuery(self._wrapped.start_after(_unwrap(document_fields_or_snapshot)))
+
+    async def stream(self, transaction=None):
+        docs = await _run(lambda: list(self._wrapped.stream(transaction=_unwrap(transaction))))
+        for doc in docs:
+            yield ThreadedSnapshot(doc)
+
+    async def get(self, transaction=None) -> List[ThreadedSnapshot]:
+        return [doc async for doc in self.stream(transaction=transaction)]
+
+
+class ThreadedCollection(ThreadedQuery):
+    """Async facade over a synchronous collection reference."""
+
+    @property
+    def id(self) -> str:
+        return self._wrapped.id
+
+    def document(self, document_id: Optional[str] = None) -> "ThreadedDocument":
+        return ThreadedDocument(self._wrapped.document(document_id))
+
+
+class ThreadedDocument:
+    """Async facade over a synchronous document reference."""
+
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    @property
+    def id(self) -> str:
+        return self._wrapped.id
+
+    @property
+    def path(self) -> str:
+        return self._wrapped.path
+
+    def collection(self, collection_id: str) -> ThreadedCollection:
+        return ThreadedCollection(self._wrapped.collection(collection_id))
+
+    async def get(self, field_paths=None, transaction=None) -> ThreadedSnapshot:
+        snapshot = await _run(self._wrapped.get, field_paths=field_paths, transaction=_unwrap(transaction))
+        return ThreadedSnapshot(snapshot)
+
+    async def set(self, document_data: dict, merge: bool = False):
+        return await _run(self._wrapped.set, document_data, merge=merge)
+
+    async def update(self, field_updates: dict):
+        return await _run(self._wrapped.update, field_updates)
+
+    async def delete(self):
+        return await _run(self._wrapped.delete)
+
+
+class ThreadedBatch:
+    """Write batch (or transaction) that buffers writes and commits on the pool."""
+
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    def set(self, reference, document_data: dict, merge: bool = False):
+        self._wrapped.set(_unwrap(reference), document_data, merge=merge)
+
+    def update(self, reference, field_updates: dict):
+        self._wrapped.update(_unwrap(reference), field_updates)
+
+    def delete(self, reference):
+        self._wrapped.delete(_unwrap(reference))
+
+    async def commit(self):
+        return await _run(self._wrapped.commit)
+
+
+class ThreadedClient:
+    """Async facade over the synchronous Firestore client."""
+
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    def collection(self, collection_id: str) -> ThreadedCollection:
+        return ThreadedCollection(self._wrapped.collection(collection_id))
+
+    def document(self, document_path: str) -> ThreadedDocument:
+        return ThreadedDocument(self._wrapped.document(document_path))
+
+    def batch(self) -> ThreadedBatch:
+        return ThreadedBatch(self._wrapped.batch())
+
+    async def get_all(self, references, field_paths=None, transaction=None):
+        snapshots = await _run(lambda: list(self._wrapped.get_all(
+            [_unwrap(ref) for ref in references], field_paths=field_paths, transaction=_unwrap(transaction)
+        )))
+        for snapshot in snapshots:
+            yield ThreadedSnapshot(snapshot)
+
+    def run_transaction(self, callback: Callable[..., Awaitable[Any]], args) -> Any:
+        """
+        Run an async transaction callback with the synchronous retry logic.
+
+        Executes on a pool thread: each attempt drives the callback on a
+        private event loop, and the wrappers perform their calls inline.
+        """
+        from google.cloud.firestore_v1 import transactional
+
+        @transactional
+        def attempt(transaction):
+            return asyncio.run(callback(ThreadedBatch(transaction), *args))
+
+        return attempt(self._wrapped.transaction())
+
+
+OPERATION_DURATION = registry.histogram(
+    "firestore_operation_duration_seconds", "Firestore call time by collection and operation",
+    ("collection", "operation"),
+)
+OPERATION_ERRORS = registry.counter(
+    "firestore_operation_errors_total", "Failed Firestore calls by collection and operation",
+    ("collection", "operation"),
+)
+OPERATIONS_IN_FLIGHT = registry.gauge("firestore_operations_in_flight", "Firestore calls awaiting a response").labels()
+TRANSACTION_DURATION = registry.histogram(
+    "firestore_transaction_duration_seconds", "Firestore transaction time including retries, by callback",
+    ("transaction",),
+)
+
+
+def _collection_of(reference) -> str:
+    """Collection label of a measured reference."""
+    return getattr(reference, "_collection", "unknown")
+
+
+class _Measurement:
+    """Times one Firestore call; reads and writes inside a transaction are counted in the transaction."""
+
+    __slots__ = ("labels", "start")
+
+    def __init__(self, collection: str, operation: str, transaction=None):
+        # Calls in a threaded-client transaction run on a pool thread; metrics are
+        # only updated from the event loop thread
+        skip = transaction is not None or _worker.active
+        self.labels = None if skip else (collection, operation)
+
+    def __enter__(self):
+        if self.labels is not None:
+            OPERATIONS_IN_FLIGHT.inc()
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.labels is not None:
+            OPERATIONS_IN_FLIGHT.dec()
+            OPERATION_DURATION.labels(*self.labels).observe(time.perf_counter() - self.start)
+            if exc_type is not None and issubclass(exc_type, Exception):
+                OPERATION_ERRORS.labels(*self.labels).inc()
+        return False
+
+
+class MeasuredSnapshot:
+    """Document snapshot whose ``reference`` is a measured document reference."""
+
+    def __init__(self, wrapped, collection: str):
+        self._wrapped = wrapped
+        self._collection = collection
+
+    @property
+    def reference(self) -> "MeasuredDocument":
+        return MeasuredDocument(self._wrapped.reference, self._collection)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._wrapped, name)
+
+
+class MeasuredQuery:
+    """Query that times its execution (until the stream is drained)."""
+
+    def __init__(self, wrapped, collection: str):
+        self._wrapped = wrapped
+        self._collection = collection
+
+    def where(self, *args, **kwargs) -> "MeasuredQuery":
+        return MeasuredQuery(self._wrapped.where(*args, **kwargs), self._collection)
+
+    def order_by(self, *args, **kwargs) -> "MeasuredQuery":
+        return MeasuredQuery(self._wrapped.order_by(*args, **kwargs), self._collection)
+
+    def limit(self, count: int) -> "MeasuredQuery":
+        return MeasuredQuery(self._wrapped.limit(count), self._collection)
+
+    def offset(self, count: int) -> "MeasuredQuery":
+        return MeasuredQuery(self._wrapped.offset(count), self._collection)
+
+    def select(self, field_paths) -> "MeasuredQuery":
+        return MeasuredQuery(self._wrapped.select(field_paths), self._collection)
+
+    def start_after(self, document_fields_or_snapshot) -> "MeasuredQuery":
+        return MeasuredQuery(self._wrapped.start_after(_unwrap(document_fields_or_snapshot)), self._collection)
+
+    async def stream(self, transaction=None):
+        with _Measurement(self._collection, "query", transaction):
+            async for doc in self._wrapped.stream(transaction=_unwrap(transaction)):
+                yield MeasuredSnapshot(doc, self._collection)
+
+    async def get(self, transaction=None) -> List[MeasuredSnapshot]:
+        return [doc async for doc in self.stream(transaction=transaction)]
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._wrapped, name)
+
+
+class MeasuredCollection(MeasuredQuery):
+    """Collection reference whose documents are measured."""
+
+    def document(self, document_id: Optional[str] = None) -> "MeasuredDocument":
+        return MeasuredDocument(self._wrapped.document(document_id), self._collection)
+
+
+class MeasuredDocument:
+    """Document reference that times its reads and writes."""
+
+    def __init__(self, wrapped, collection: str):
+        self._wrapped = wrapped
+        self._collection = collection
+
+    def collection(self, collection_id: str) -> MeasuredCollection:
+        return MeasuredCollection(self._wrapped.collection(collection_id), f"{self._collection}/{collection_id}")
+
+    async def get(self, field_paths=None, transaction=None) -> MeasuredSnapshot:
+        with _Measurement(self._collection, "get", transaction):
+            snapshot = await self._wrapped.get(field_paths=field_paths, transaction=_unwrap(transaction))
+        return MeasuredSnapshot(snapshot, self._collection)
+
+    async def set(self, document_data: dict, merge: bool = False):
+        with _Measurement(self._collection, "set"):
+            return await self._wrapped.set(document_data, merge=merge)
+
+    async def update(self, field_updates: dict):
+        with _Measurement(self._collection, "update"):
+            return await self._wrapped.update(field_updates)
+
+    async def delete(self):
+        with _Measurement(self._collection, "delete"):
+            return await self._wrapped.delete()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._wrapped, name)
+
+
+class MeasuredBatch:
+    """Write batch (or transaction) that unwraps measured references and times its commit."""
+
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+        self._collections = set()
+
+    def set(self, reference, document_data: dict, merge: bool = False):
+        self._collections.add(_collection_of(reference))
+        self._wrapped.set(_unwrap(reference), document_data, merge=merge)
+
+    def update(self, reference, field_updates: dict):
+        self._collections.add(_collection_of(reference))
+        self._wrapped.update(_unwrap(reference), field_updates)
+
+    def delete(self, reference):
+        self._collections.add(_collection_of(reference))
+        self._wrapped.delete(_unwrap(reference))
+
+    async def commit(self):
+        # Labelled with every collection the batch writes to, e.g. "sessions,users/session_index"
+        with _Measurement(",".join(sorted(self._collections)), "commit"):
+            return await self._wrapped.commit()
+
+
+class MeasuredClient:
+    """Wraps an async-interface client (native or threaded) and times every call."""
+
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    def collection(self, collection_id: str) -> MeasuredCollection:
+        return MeasuredCollection(self._wrapped.collection(collection_id), collection_id)
+
+    def batch(self) -> MeasuredBatch:
+        return MeasuredBatch(self._wrapped.batch())
+
+    async def get_all(self, references, field_paths=None, transaction=None):
+        # Snapshots are matched to their reference's collection by document id
+        collections = {reference.id: _collection_of(reference) for reference in references}
+        with _Measurement(",".join(sorted(set(collections.values()))), "get_all", transaction):
+            async for snapshot in self._wrapped.get_all([_unwrap(ref) for ref in references],
+                                                        field_paths=field_paths, transaction=_unwrap(transaction)):
+                yield MeasuredSnapshot(snapshot, collections.get(snapshot.id, "unknown"))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._wrapped, name)
+
+
+def _measured(client):
+    return MeasuredClient(client) if settings.metrics_enabled else client
+
+
+def _create_client():
+    """Create the async client, falling back to the thread pool wrapper."""
+    sync_client = firebase.db
+    if sync_client is None:
+        logger.warning("Firestore not available - data access layer disabled")
+        return None
+
+    if settings.firestore_client == "async":
+        try:
+            from firebase_admin import firestore_async
+            client = firestore_async.client()
+            logger.info("Using native async Firestore client")
+            return _measured(client)
+        except Exception as e:
+            logger.warning(f"Async Firestore client unavailable, using thread pool fallback: {e}")
+
+    logger.info(f"Using threaded Firestore client ({settings.firestore_threads} threads)")
+    return _measured(ThreadedClient(sync_client))
+
+
+async def collect(query, transaction=None) -> list:
+    """Materialize an async query stream (optionally read in a transaction) into a list of snapshots."""
+    return [doc async for doc in query.stream(transaction=transaction)]
+
+
+async def run_transaction(callback: Callable[..., Awaitable[Any]], *args) -> Any:
+    """
+    Run ``callback(transaction, *args)`` in a Firestore transaction, retrying on contention.
+
+    Inside the callback, read with ``await ref.get(transaction=transaction)``
+    and buffer writes with ``transaction.set/update/delete``.
+    """
+    client = db.get() if isinstance(db, LazyClient) else db
+    if not isinstance(client, MeasuredClient):
+        return await _run_transaction(client, callback, args)
+
+    async def measured_callback(transaction, *callback_args):
+        # References passed to the transaction are measured ones; unwrap them
+        return await callback(MeasuredBatch(transaction), *callback_args)
+
+    start = time.perf_counter()
+    try:
+        return await _run_transaction(client._wrapped, measured_callback, args)
+    finally:
+        name = getattr(callback, "__name__", "transaction").lstrip("_")
+        TRANSACTION_DURATION.labels(name).observe(time.perf_counter() - start)
+
+
+async def _run_transaction(client, callback: Callable[..., Awaitable[Any]], args: tuple) -> Any:
+    from google.cloud.firestore_v1 import async_transactional
+
+    if isinstance(client, ThreadedClient):
+        return await _run(client.run_transaction, callback, args)
+    return await async_transactional(callback)(client.transaction(), *args)
+
+
+# Global async-interface client, created on first use; falsy when Firestore
+# is not configured (check with ``if not db``)
+db = LazyClient("Firestore", _create_client)
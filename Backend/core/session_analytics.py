@@ -0,0 +1,102 @@
+"""
+Session Analytics Storage Module
+
+This module keeps a running-analytics state on each session document so that
+session summaries and closes can read precomputed emotion analytics instead of
+re-analyzing every message.
+
+Storage:
+- sessions/{session_id}.analytics_state: additive totals maintained with
+  Firestore ``Increment`` transforms as each message is appended
+  (see ``core.emotion_analysis.new_analytics_state`` for the shape)
+
+Sessions created before the state existed are handled transparently: the first
+message added to such a session writes a full state computed from its existing
+messages, and reads fall back to a full ``analyze_messages`` pass.
+
+Usage:
+    from core.session_analytics import analytics_update, session_analytics
+
+    session_ref.update({"messages": ArrayUnion([msg]), **analytics_update(session_data, [msg])})
+    analytics = session_analytics(session_data)
+"""
+
+from typing import Any, Dict, List, Tuple
+from core.emotion_analysis import (
+    accumulate,
+    analytics_from_state,
+    analyze_messages,
+    apply_deltas,
+    message_deltas,
+)
+
+# Session document field holding the running-analytics state
+ANALYTICS_FIELD = "analytics_state"
+
+
+def analytics_update(session_data: Dict[str, Any], new_messages: List[dict]) -> Dict[str, Any]:
+    """
+    Build the Firestore update fields that account for newly appended messages.
+
+    Args:
+        session_data (Dict[str, Any]): Session document as read before the append
+        new_messages (List[dict]): Messages being appended in the same update
+
+    Returns:
+        Dict[str, Any]: Field paths to merge into the session ``update()`` call
+    """
+    from google.cloud.firestore_v1 import Increment
+
+    if ANALYTICS_FIELD not in session_data:
+        # Legacy session: seed the state from everything stored so far
+        existing = session_data.get("messages", [])
+        return {ANALYTICS_FIELD: accumulate(existing + list(new_messages))}
+
+    deltas: Dict[str, Any] = {}
+    for message in new_messages:
+        apply_deltas(deltas, message_deltas(message))
+    return {f"{ANALYTICS_FIELD}.{path}": Increment(value) for path, value in _flatten(deltas).items()}
+
+
+def session_analytics(session_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the emotion analytics for a session document.
+
+    Uses the stored running state when present (O(1)); otherwise analyzes the
+    full message list.
+    """
+    state = session_data.get(ANALYTICS_FIELD)
+    if state is not None:
+        return analytics_from_state(state)
+    return analyze_messages(session_data.get("messages", []))
+
+
+def message_counts(session_data: Dict[str, Any]) -> Tuple[int, int, int]:
+    """
+    Total, user and AI message counts for a session document.
+
+    Read from the running analytics state when available so the message list
+    does not need to be scanned (or, for subcollection storage, read).
+    """
+    state = session_data.get(ANALYTICS_FIELD)
+    if state is not None:
+        total = state.get("total_messages", 0)
+        user_count = state.get("user_messages", 0)
+        return total, user_count, total - user_count
+
+    messages = session_data.get("messages", [])
+    user_count = len([m for m in messages if m.get("role") == "user"])
+    ai_count = len([m for m in messages if m.get("role") == "generated"])
+    return len(messages), user_count, ai_count
+
+
+def _flatten(tree: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested dicts into dotted field paths."""
+    flat: Dict[str, Any] = {}
+    for key, value in tree.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
@@ -0,0 +1,138 @@
+"""
+Per-User Session Index Module
+
+This module maintains a compact, denormalized index of each user's sessions so
+history listings can be served from one small query instead of reading every
+session document (with its messages) plus one summary lookup per session.
+
+Storage:
+- users/{uid}/session_index/{session_id}:
+    created_at, message_count, user_message_count, summarized
+
+Entries are created with the session, incremented in the same write as each
+appended message (which also clears ``summarized``, since appending reopens a
+session) and flagged ``summarized`` on close. Sessions carry an ``indexed``
+flag once their entry exists; older sessions get a full entry on their next
+message, or from ``scripts/backfill_session_index.py``.
+
+Usage:
+    from core.session_index import list_session_index
+
+    entries, next_cursor = await list_session_index(user_id, limit=20)
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from core.repository import collect, db
+from core.session_analytics import message_counts
+
+# Collection layout and the session document flag marking an existing entry
+USERS_COLLECTION = "users"
+INDEX_SUBCOLLECTION = "session_index"
+INDEXED_FIELD = "indexed"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a listing cursor names no entry of the user's session index."""
+
+
+def index_ref(user_id: str, session_id: str):
+    """Firestore reference of a session's index entry."""
+    return db.collection(USERS_COLLECTION).document(user_id)\
+        .collection(INDEX_SUBCOLLECTION).document(session_id)
+
+
+def index_entry(created_at, message_count: int = 0, user_message_count: int = 0,
+                summarized: bool = False) -> Dict[str, Any]:
+    """Build a complete index entry."""
+    return {
+        "created_at": created_at,
+        "message_count": message_count,
+        "user_message_count": user_message_count,
+        "summarized": summarized,
+    }
+
+
+def append_writes(session_id: str, session_data: Dict[str, Any],
+                  new_messages: List[dict]) -> Tuple[Optional[Any], Dict[str, Any], Dict[str, Any]]:
+    """
+    Describe the index write that accompanies appending messages to a session.
+
+    Args:
+        session_id (str): Session document id
+        session_data (Dict[str, Any]): Session document as read before the append
+        new_messages (List[dict]): Messages being appended
+
+    Returns:
+        Tuple: (index reference or None when the session has no owner,
+            fields to merge into the index entry,
+            fields to add to the session document update)
+    """
+    user_id = session_data.get("user_id")
+    if not user_id:
+        return None, {}, {}
+
+    added_user = len([m for m in new_messages if m.get("role") == "user"])
+    if session_data.get(INDEXED_FIELD):
+        from google.cloud.firestore_v1 import Increment
+
+        return index_ref(user_id, session_id), {
+            "message_count": Increment(len(new_messages)),
+            "user_message_count": Increment(added_user),
+            "summarized": False,
+        }, {}
+
+    # No entry yet: write a complete one and flag the session as indexed
+    total, user_count, _ = message_counts(session_data)
+    entry = index_entry(session_data.get("created_at"), total + len(new_messages),
+                        user_count + added_user)
+    return index_ref(user_id, session_id), entry, {INDEXED_FIELD: True}
+
+
+def set_summarized(writer, session_id: str, session_data: Dict[str, Any], summarized: bool) -> None:
+    """
+    Record the summarized flag through a batch or transaction.
+
+    Sessions without an index entry are left alone so that a partial entry is
+    never created; the backfill script fills those in.
+    """
+    user_id = session_data.get("user_id")
+    if user_id and session_data.get(INDEXED_FIELD):
+        writer.set(index_ref(user_id, session_id), {"summarized": summarized}, merge=True)
+
+
+async def list_session_index(user_id: str, limit: Optional[int] = None,
+                       cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    List a user's sessions, newest first.
+
+    Args:
+        user_id (str): Owner of the sessions
+        limit (int, optional): Maximum entries to return (all if omitted)
+        cursor (str, optional): Session id of the last entry already received
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[str]]: Entries (with ``session_id``)
+            and the cursor for the next page, or None when there are no more
+
+    Raises:
+        InvalidCursor: If ``cursor`` is not in the index (unknown or deleted);
+            restarting from the first page would repeat entries
+    """
+    from google.cloud.firestore_v1 import Query
+
+    collection = db.collection(USERS_COLLECTION).document(user_id).collection(INDEX_SUBCOLLECTION)
+    query = collection.order_by("created_at", direction=Query.DESCENDING)
+    if cursor:
+        cursor_doc = await collection.document(cursor).get()
+        if not cursor_doc.exists:
+            raise InvalidCursor(f"Unknown cursor: {cursor}")
+        query = query.start_after(cursor_doc)
+    if limit is not None:
+        # Fetch one extra entry to learn whether another page exists
+        query = query.limit(limit + 1)
+
+    entries = [{"session_id": doc.id, **doc.to_dict()} for doc in await collect(query)]
+    if limit is not None and len(entries) > limit:
+        entries = entries[:limit]
+        return entries, entries[-1]["session_id"]
+    return entries, None
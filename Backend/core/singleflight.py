@@ -0,0 +1,67 @@
+"""
+Request Coalescing Module
+
+This module provides single-flight execution: while a call for a key is in
+flight, further calls with the same key do not start their own work but wait
+for the first call and receive its result (or exception). Used so retried or
+double-tapped requests for an unchanged session cost a single Gemini
+generation.
+
+The shared work runs as its own task, so a caller that disconnects or is
+cancelled does not cancel it for the others.
+
+Usage:
+    from core.singleflight import SingleFlight
+
+    flights = SingleFlight()
+    result = await flights.do(f"{session_id}:{message_count}", lambda: generate(...))
+    flights.stats()  # {"executed": ..., "coalesced": ..., "in_flight": ...}
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._stats = {"executed": 0, "coalesced": 0}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``func()`` unless a call for ``key`` is already in flight, and return its result.
+
+        Args:
+            key (str): Identifies equivalent calls (e.g. session id and state hash)
+            func (Callable): Starts the work; only called when no call is in flight
+
+        Returns:
+            Any: The result shared by every caller with this key
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self._stats["executed"] += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._stats["coalesced"] += 1
+        # Shielded so one caller's cancellation leaves the shared task running
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        self._calls.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even if every caller went away
+
+    def stats(self) -> Dict[str, Any]:
+        """Executed vs coalesced call counters and calls currently in flight."""
+        executed, coalesced = self._stats["executed"], self._stats["coalesced"]
+        total = executed + coalesced
+        return dict(
+            self._stats,
+            in_flight=len(self._calls),
+            coalesced_rate=round(coalesced / total, 4) if total else 0.0,
+        )
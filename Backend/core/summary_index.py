@@ -0,0 +1,272 @@
+"""
+Session Summary Retrieval Module
+
+This module finds the past sessions most related to what the user is
+discussing now, so question generation can draw on relevant history instead
+of only the latest sessions. Everything runs locally on the CPU; no text
+leaves the process.
+
+Embeddings:
+- a summary (or the conversation tail) is reduced to stemmed terms and
+  adjacent-term pairs (same normalization as goal matching, see
+  ``core.goal_index``), which are hashed into a fixed number of signed
+  dimensions with sublinear term frequency
+- the L2-normalized vector is stored on the ``session_summaries`` document as
+  ``embedding`` (float16 bytes) when the session is closed; summaries stored
+  before that are embedded when the user's index is loaded
+
+A per-user SummaryIndex stacks the vectors into one NumPy matrix, reweights
+the hashed dimensions by inverse document frequency over that user's
+summaries, and ranks all of them against a query with one matrix-vector
+product (well under a millisecond for a thousand sessions).
+
+A loaded index is kept up to date in place: a closed session's summary is
+added (``add``), a reopened session's removed (``remove``), and ``sync``
+reconciles it with a listing of the stored summaries, reading only the
+summaries it does not hold yet.
+
+Usage:
+    from core.summary_index import EMBEDDING_FIELD, SummaryIndex, embed_text
+
+    session_summary[EMBEDDING_FIELD] = embed_text(summary)
+    index = SummaryIndex.from_docs(summary_docs)
+    for entry, score in index.top_k(tail_text, k=2, exclude={session_id}):
+        ...
+    index.add(session_id, session_summary)
+    index.remove(session_id)
+"""
+
+import time
+import zlib
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+from core.config import settings
+from core.goal_index import text_terms
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# session_summaries field holding the stored embedding
+EMBEDDING_FIELD = "embedding"
+
+# Stored precision of the embeddings (a NumPy dtype name; NumPy is imported on first use)
+_DTYPE = "float16"
+
+
+def text_features(text: str) -> List[str]:
+    """Stemmed content terms of a text followed by its adjacent-term pairs."""
+    terms = text_terms(text)
+    return terms + [f"{first} {second}" for first, second in zip(terms, terms[1:])]
+
+
+def embed_vector(text: str, dims: Optional[int] = None) -> "np.ndarray":
+    """
+    Hash a text into an L2-normalized float32 vector.
+
+    Each feature adds +1 or -1 (from one hash bit) to one of ``dims`` buckets,
+    so colliding features partly cancel instead of always adding up; counts
+    are then dampened to 1 + log(count).
+    """
+    import numpy as np  # Imported on first use to keep it off the startup path
+
+    dims = dims or settings.summary_embedding_dims
+    vector = np.zeros(dims, dtype=np.float32)
+    features = text_features(text)
+    if not features:
+        return vector
+    hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features),
+                         dtype=np.uint32, count=len(features))
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+    np.add.at(vector, hashes % dims, signs)
+    magnitude = np.abs(vector)
+    vector = np.sign(vector) * np.where(magnitude > 0, 1 + np.log(np.maximum(magnitude, 1)), 0)
+    norm = np.linalg.norm(vector)
+    return (vector / norm).astype(np.float32) if norm else vector
+
+
+def embed_text(text: str) -> bytes:
+    """Embedding of a text in its stored form (float16 bytes)."""
+    return embed_vector(text).astype(_DTYPE).tobytes()
+
+
+def decode_embedding(value: Any, dims: int) -> Optional["np.ndarray"]:
+    """Stored embedding as a float32 vector, or None if absent or of another size."""
+    import numpy as np
+
+    if not value:
+        return None
+    vector = np.frombuffer(bytes(value), dtype=_DTYPE)
+    return vector.astype(np.float32) if vector.size == dims else None
+
+
+def _insert_position(entries: List[Dict[str, Any]], session_date: Any) -> int:
+    """Position of an entry dated ``session_date`` in a most-recent-first entry list."""
+    if session_date is None:
+        return 0
+    for position, entry in enumerate(entries):
+        try:
+            if entry["session_date"] is None or entry["session_date"] <= session_date:
+                return position
+        except TypeError:
+            return 0  # Dates of different types; treat the new entry as the latest
+    return len(entries)
+
+
+class SummaryIndex:
+    """
+    Similarity search over one user's session summaries.
+
+    Args:
+        entries (List[Dict[str, Any]]): ``session_id``, ``summary`` and
+            ``session_date`` of each summary, most recent first
+        vectors (np.ndarray): One embedding row per entry
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], vectors: "np.ndarray"):
+        self.dims = vectors.shape[1] if vectors.ndim == 2 else settings.summary_embedding_dims
+        # When the entries were last checked against the stored summaries (time.monotonic)
+        self.synced_at = time.monotonic()
+        self._set(entries, vectors)
+
+    def _set(self, entries: List[Dict[str, Any]], vectors: "np.ndarray") -> None:
+        import numpy as np
+
+        self.entries = entries
+        # Unweighted vectors in their stored precision, kept so entries can be added and removed
+        self.vectors = vectors.astype(_DTYPE)
+        vectors = vectors.astype(np.float32)
+        # Hashed dimensions shared by many of this user's summaries say little
+        # about any one of them; weight them down like TF-IDF would
+        df = np.count_nonzero(vectors, axis=0) if len(entries) else np.zeros(self.dims)
+        self.weights = (np.log((1 + len(entries)) / (1 + df)) + 1).astype(np.float32)
+        weighted = vectors * self.weights
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True) if len(entries) else 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.matrix = np.nan_to_num(weighted / norms).astype(np.float32)
+
+    @staticmethod
+    def _row(session_id: str, data: Dict[str, Any], dims: int) -> Optional[Tuple[Dict[str, Any], "np.ndarray"]]:
+        """Entry and vector of a ``session_summaries`` document (None without summary text)."""
+        summary_text = (data.get("summary") or "").strip()
+        if not summary_text:
+            return None
+        vector = decode_embedding(data.get(EMBEDDING_FIELD), dims)
+        entry = {
+            "session_id": session_id,
+            "summary": summary_text[:200],  # Limit length to keep context focused
+            "session_date": data.get("created_at")
+        }
+        return entry, vector if vector is not None else embed_vector(summary_text, dims)
+
+    @classmethod
+    def from_docs(cls, docs: Iterable[Any]) -> "SummaryIndex":
+        """Index ``session_summaries`` snapshots, embedding any stored without an embedding."""
+        import numpy as np
+
+        dims = settings.summary_embedding_dims
+        rows = [row for row in (cls._row(doc.id, doc.to_dict() or {}, dims) for doc in docs) if row is not None]
+        vectors = np.vstack([vector for _, vector in rows]) if rows else np.zeros((0, dims), dtype=np.float32)
+        return cls([entry for entry, _ in rows], vectors)
+
+    def add(self, session_id: str, data: Dict[str, Any], limit: Optional[int] = None) -> None:
+        """
+        Add (or replace) the summary of a just-closed session, in ``created_at`` order.
+
+        Args:
+            session_id (str): Session the summary belongs to
+            data (Dict[str, Any]): The ``session_summaries`` document as stored
+            limit (int, optional): Keep at most this many entries, dropping the oldest
+        """
+        import numpy as np
+
+        row = self._row(session_id, data, self.dims)
+        keep = [i for i, entry in enumerate(self.entries) if entry["session_id"] != session_id]
+        if row is None and len(keep) == len(self.entries):
+            return
+        entries = [self.entries[i] for i in keep]
+        vectors = self.vectors[keep]
+        if row is not None:
+            position = _insert_position(entries, row[0]["session_date"])
+            entries.insert(position, row[0])
+            vectors = np.insert(vectors, position, row[1].astype(_DTYPE), axis=0)
+        if limit is not None:
+            entries, vectors = entries[:limit], vectors[:limit]
+        self._set(entries, vectors)
+
+    def remove(self, session_id: str) -> bool:
+        """Drop a session's summary (e.g. when the session is reopened); True if it was indexed."""
+        keep = [i for i, entry in enumerate(self.entries) if entry["session_id"] != session_id]
+        if len(keep) == len(self.entries):
+            return False
+        self._set([self.entries[i] for i in keep], self.vectors[keep])
+        return True
+
+    def sync(self, session_ids: List[str], docs: Iterable[Any]) -> None:
+        """
+        Make the index match a fresh listing of the user's summaries.
+
+        Args:
+            session_ids (List[str]): Every summarized session, most recent first
+            docs: Snapshots of the listed sessions that are not indexed yet
+        """
+        import numpy as np
+
+        dims = self.dims
+        rows = {entry["session_id"]: (entry, vector) for entry, vector in zip(self.entries, self.vectors)}
+        for doc in docs:
+            row = self._row(doc.id, doc.to_dict() or {}, dims)
+            if row is not None:
+                rows[doc.id] = row
+        kept = [rows[session_id] for session_id in session_ids if session_id in rows]
+        vectors = np.vstack([vector for _, vector in kept]) if kept else np.zeros((0, dims), dtype=np.float32)
+        self._set([entry for entry, _ in kept], vectors)
+        self.synced_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index."""
+        return int(self.matrix.nbytes + self.vectors.nbytes) + sum(len(entry["summary"]) + 64 for entry in self.entries)
+
+    def scores(self, text: str) -> "np.ndarray":
+        """Cosine similarity of a text to every summary, in entry order."""
+        import numpy as np
+
+        query = embed_vector(text, self.dims) * self.weights
+        norm = np.linalg.norm(query)
+        if not len(self.entries) or not norm:
+            return np.zeros(len(self.entries), dtype=np.float32)
+        return self.matrix @ (query / norm)
+
+    def top_k(self, text: str, k: int, exclude: Set[str] = frozenset(),
+              min_score: float = 0.0) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        The ``k`` summaries most similar to a text, best first.
+
+        Args:
+            text (str): Query text, e.g. the recent conversation
+            k (int): Maximum number of results
+            exclude (Set[str]): Session ids to leave out (e.g. the current one)
+            min_score (float): Minimum similarity of a result
+
+        Returns:
+            List[Tuple[Dict[str, Any], float]]: (entry, similarity) pairs
+        """
+        import numpy as np
+
+        scores = self.scores(text)
+        if not scores.size or k <= 0:
+            return []
+        # Over-fetch by the excluded count so exclusions cannot leave gaps
+        count = min(k + len(exclude), scores.size)
+        candidates = np.argpartition(-scores, count - 1)[:count]
+        results = []
+        for i in candidates[np.argsort(-scores[candidates], kind="stable")]:
+            entry, score = self.entries[i], float(scores[i])
+            if entry["session_id"] in exclude or score < min_score or score <= 0:
+                continue
+            results.append((entry, score))
+            if len(results) == k:
+                break
+        return results
@@ -0,0 +1,229 @@
+"""
+Firebase ID Token Verification Module
+
+This module verifies Firebase ID tokens locally, so authenticating a request
+costs a dictionary lookup in the common case instead of a call into the
+Firebase Admin SDK:
+
+- Google's signing keys (a JWKS document) are fetched once and kept for the
+  ``max-age`` of their ``Cache-Control`` header; concurrent refreshes share
+  one fetch, and a token signed with an unknown key id triggers at most one
+  early refresh per ``MIN_REFRESH_INTERVAL`` (keys rotate ahead of use)
+- signatures and claims are checked with PyJWT as the Admin SDK does: RS256,
+  audience = project id, issuer = ``https://securetoken.google.com/<project>``,
+  ``exp``/``iat``/``auth_time`` against the clock, non-empty ``sub``
+- verified claims are memoized per token (by SHA-256) in a bounded LRU until
+  the token expires, so repeated requests with the same token skip the
+  signature check
+
+Revocation is not checked (as with ``verify_id_token`` without
+``check_revoked``); a revoked token stays valid until it expires, at most an hour.
+PyJWT and ``cryptography`` are imported on first use, so they are not loaded
+when authentication is disabled.
+
+Usage:
+    from core.token_verifier import token_verifier
+
+    claims = await token_verifier.verify(id_token)
+    user_id = claims["uid"]
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import urllib.request
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from core.cache import MISSING, LRUCache
+from core.config import settings
+from core.metrics import registry
+from core.singleflight import SingleFlight
+
+# Configure logging for token verification
+logger = logging.getLogger(__name__)
+
+ISSUER_PREFIX = "https://securetoken.google.com/"
+ALGORITHM = "RS256"
+# Key lifetime when the response has no usable Cache-Control max-age
+DEFAULT_KEYS_MAX_AGE = 3600.0
+# Minimum seconds between refreshes forced by unknown key ids
+MIN_REFRESH_INTERVAL = 60.0
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class TokenVerificationError(ValueError):
+    """Raised when an ID token is malformed, expired or not signed by Firebase."""
+
+
+def cache_max_age(headers: Dict[str, str]) -> float:
+    """
+    Seconds a response may be cached, from its ``Cache-Control`` and ``Age`` headers.
+
+    Args:
+        headers (Dict[str, str]): Response headers with lower-case names
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    match = _MAX_AGE.search(cache_control)
+    if not match:
+        return DEFAULT_KEYS_MAX_AGE
+    try:
+        age = float(headers.get("age", 0))
+    except ValueError:
+        age = 0.0
+    return max(0.0, float(match.group(1)) - age)
+
+
+def _fetch_url(url: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Download a JSON document; returns (document, headers with lower-case names)."""
+    with urllib.request.urlopen(url, timeout=10) as response:
+        headers = {name.lower(): value for name, value in response.headers.items()}
+        return json.loads(response.read()), headers
+
+
+def _default_project_id() -> Optional[str]:
+    """Project id of the initialized Firebase app or the environment."""
+    try:
+        from core.firebase import firebase_app
+        import firebase_admin
+        firebase_app.get()
+        return firebase_admin.get_app().project_id
+    except Exception:
+        return os.getenv("GOOGLE_CLOUD_PROJECT") or os.getenv("GCLOUD_PROJECT")
+
+
+class TokenVerifier:
+    """
+    Verifies Firebase ID tokens against cached signing keys and memoizes the claims.
+
+    Args:
+        project_id (str, optional): Firebase project; defaults to the
+            initialized app's project (resolved on first use)
+        jwks_url (str): JWKS endpoint of Firebase's token signing keys
+        cache_size (int): Maximum memoized tokens (0 disables the memo)
+        clock_skew (int): Seconds of clock difference tolerated for exp/iat
+        fetch (Callable, optional): ``async fetch(url) -> (jwks, headers)``,
+            replaceable for tests and benchmarks
+    """
+
+    def __init__(self, project_id: Optional[str] = None, jwks_url: str = settings.auth_jwks_url,
+                 cache_size: int = settings.auth_token_cache_size, clock_skew: int = settings.auth_clock_skew,
+                 fetch: Optional[Callable[[str], Awaitable[Tuple[Dict[str, Any], Dict[str, str]]]]] = None):
+        self.project_id = project_id
+        self.jwks_url = jwks_url
+        self.clock_skew = clock_skew
+        self._fetch = fetch or (lambda url: asyncio.to_thread(_fetch_url, url))
+        self._claims = LRUCache(max_entries=cache_size) if cache_size > 0 else None
+        self._keys: Dict[str, Any] = {}
+        self._keys_expire_at = 0.0
+        self._last_refresh = float("-inf")
+        self._refreshes = SingleFlight()
+        self._stats = {"verified": 0, "rejected": 0, "key_refreshes": 0}
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Return the claims of a valid ID token, with ``uid`` set to its subject.
+
+        Raises:
+            TokenVerificationError: If the token is not a valid, unexpired Firebase ID token
+        """
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest() if self._claims is not None else None
+        if key is not None:
+            claims = self._claims.get(key)
+            if claims is not MISSING and claims["exp"] + self.clock_skew > time.time():
+                return claims
+
+        try:
+            claims = await self._decode(token)
+        except TokenVerificationError:
+            self._stats["rejected"] += 1
+            raise
+        self._stats["verified"] += 1
+        if key is not None:
+            self._claims.set(key, claims, ttl=max(0.0, claims["exp"] + self.clock_skew - time.time()))
+        return claims
+
+    async def _decode(self, token: str) -> Dict[str, Any]:
+        import jwt
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError as e:
+            raise TokenVerificationError(f"Malformed ID token: {e}") from e
+        if header.get("alg") != ALGORITHM:
+            raise TokenVerificationError(f"ID token has algorithm {header.get('alg')!r}, expected {ALGORITHM}")
+
+        signing_key = await self._signing_key(header.get("kid"))
+        project_id = self._project_id()
+        try:
+            claims = jwt.decode(
+                token, signing_key, algorithms=[ALGORITHM], audience=project_id,
+                issuer=ISSUER_PREFIX + project_id, leeway=self.clock_skew,
+                options={"require": ["exp", "iat", "aud", "iss", "sub"]},
+            )
+        except jwt.InvalidTokenError as e:
+            raise TokenVerificationError(f"Invalid ID token: {e}") from e
+
+        subject = claims["sub"]
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise TokenVerificationError("ID token has an invalid subject")
+        auth_time = claims.get("auth_time")
+        if auth_time is not None and auth_time > time.time() + self.clock_skew:
+            raise TokenVerificationError("ID token has an auth_time in the future")
+        claims["uid"] = subject
+        return claims
+
+    def _project_id(self) -> str:
+        if not self.project_id:
+            self.project_id = settings.firebase_project_id or _default_project_id()
+            if not self.project_id:
+                raise TokenVerificationError("Firebase project id is not configured (FIREBASE_PROJECT_ID)")
+        return self.project_id
+
+    async def _signing_key(self, key_id: Optional[str]):
+        """The public key for ``key_id``, refreshing the key set when it is stale or lacks the id."""
+        if time.monotonic() >= self._keys_expire_at:
+            await self._refreshes.do("keys", self._refresh_keys)
+        elif key_id not in self._keys and time.monotonic() - self._last_refresh >= MIN_REFRESH_INTERVAL:
+            await self._refreshes.do("keys", self._refresh_keys)
+        if key_id not in self._keys:
+            raise TokenVerificationError(f"ID token signed with unknown key {key_id!r}")
+        return self._keys[key_id]
+
+    async def _refresh_keys(self) -> None:
+        import jwt
+
+        try:
+            jwks, headers = await self._fetch(self.jwks_url)
+            keys = {jwk.key_id: jwk.key for jwk in jwt.PyJWKSet.from_dict(jwks).keys if jwk.key_id}
+        except Exception as e:
+            # Keep serving the previous keys; retry after the minimum interval
+            logger.error(f"Failed to refresh Firebase signing keys: {e}")
+            self._last_refresh = time.monotonic()
+            self._keys_expire_at = time.monotonic() + MIN_REFRESH_INTERVAL
+            return
+        self._keys = keys
+        self._last_refresh = time.monotonic()
+        self._keys_expire_at = self._last_refresh + cache_max_age(headers)
+        self._stats["key_refreshes"] += 1
+        logger.info(f"Loaded {len(keys)} Firebase signing keys, valid for {cache_max_age(headers):.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Verification counters, key set state and claims memo hit rate."""
+        return dict(
+            self._stats,
+            keys=len(self._keys),
+            keys_expire_in=round(max(0.0, self._keys_expire_at - time.monotonic()), 1),
+            claims_cache=self._claims.stats() if self._claims is not None else None,
+        )
+
+
+# Shared verifier used by the authentication middleware
+token_verifier = TokenVerifier()
+registry.watch_cache("auth_tokens", lambda: token_verifier.stats()["claims_cache"])
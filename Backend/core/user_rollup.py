@@ -0,0 +1,196 @@
+"""
+User Analytics Rollup Module
+
+This module maintains the numeric part of ``user_summaries`` incrementally, so
+closing a session costs a constant number of Firestore reads no matter how many
+sessions the user has.
+
+Storage:
+- user_summaries/{uid}.rollup: running totals over the user's session summaries
+    sessions: number of summarized sessions
+    intensity_sum / intensity_count: sum and count of per-session avg_intensity
+    emotion_percentage_sums: per-emotion sum of session emotion percentages
+- user_summaries/{uid}.avg_intensity / emotion_percentages: averages derived
+  from the rollup, kept in the original shape for readers
+
+Each close adds the session's contribution inside a transaction; re-closing a
+session first subtracts the contribution of its previous summary, and
+reopening a session (which deletes its summary) subtracts it as well. Users
+whose document predates the rollup are seeded from their summaries once.
+``scripts/rebuild_user_rollups.py`` recomputes rollups to check for drift.
+
+Usage:
+    from core.user_rollup import reopen_session, save_close
+
+    user_fields = await save_close(session_summary, session_data, overall_summary)
+    reopened = await reopen_session(session_id)
+"""
+
+from typing import Any, Dict, Optional
+from core.daily_stats import apply_summary_change, write_days
+from core.emotion_analysis import EMOTIONS
+from core.projections import get_fields
+from core.repository import collect, db, run_transaction
+from core.session_index import set_summarized
+
+# Collections and the user_summaries field holding the running totals
+SESSION_SUMMARIES = "session_summaries"
+USER_SUMMARIES = "user_summaries"
+ROLLUP_FIELD = "rollup"
+
+
+def new_rollup() -> Dict[str, Any]:
+    """Totals for a user with no summarized sessions."""
+    return {
+        "sessions": 0,
+        "intensity_sum": 0,
+        "intensity_count": 0,
+        "emotion_percentage_sums": {emotion: 0 for emotion in EMOTIONS},
+    }
+
+
+def add_summary(rollup: Dict[str, Any], session_summary: Dict[str, Any], sign: int = 1) -> None:
+    """
+    Add (``sign=1``) or subtract (``sign=-1``) one session summary's contribution in place.
+
+    Args:
+        rollup (Dict[str, Any]): Running totals to update
+        session_summary (Dict[str, Any]): A ``session_summaries`` document
+        sign (int): 1 to add, -1 to subtract
+    """
+    analytics = session_summary.get("analytics") or {}
+    rollup["sessions"] += sign
+    if "avg_intensity" in analytics:
+        rollup["intensity_sum"] += sign * analytics["avg_intensity"]
+        rollup["intensity_count"] += sign
+    sums = rollup["emotion_percentage_sums"]
+    for emotion, percentage in analytics.get("emotion_percentages", {}).items():
+        sums[emotion] = sums.get(emotion, 0) + sign * percentage
+
+
+def rollup_fields(rollup: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Derive the user's average intensity and emotion percentages from the totals.
+
+    Matches averaging every stored session summary: the mean of the sessions'
+    avg_intensity, and emotion percentages averaged over all sessions, rounded
+    to 3 places and adjusted so they sum to 1.0.
+    """
+    count = rollup["intensity_count"]
+    avg_intensity = rollup["intensity_sum"] / count if count else 0
+    if isinstance(rollup["intensity_sum"], int) and count and rollup["intensity_sum"] % count == 0:
+        avg_intensity = rollup["intensity_sum"] // count
+
+    sums = rollup["emotion_percentage_sums"]
+    emotion_averages = {emotion: 0 for emotion in EMOTIONS}
+    num_sessions = rollup["sessions"]
+    if num_sessions > 0:
+        emotion_averages = {emotion: round(sums.get(emotion, 0) / num_sessions, 3) for emotion in EMOTIONS}
+
+        # Ensure they still sum to 1.0
+        current_sum = sum(emotion_averages.values())
+        if current_sum != 1.0 and current_sum > 0:
+            # Adjust the largest percentage to make sum exactly 1.0
+            max_emotion = max(emotion_averages.keys(), key=lambda k: emotion_averages[k])
+            emotion_averages[max_emotion] += round(1.0 - current_sum, 3)
+
+    return {"avg_intensity": avg_intensity, "emotion_percentages": emotion_averages}
+
+
+async def rebuild_rollup(user_id: str, exclude_session_id: Optional[str] = None,
+                         transaction=None) -> Dict[str, Any]:
+    """Recompute a user's totals from all of their session summaries."""
+    rollup = new_rollup()
+    query = db.collection(SESSION_SUMMARIES).where("user_id", "==", user_id)
+    for summary_doc in await collect(query, transaction=transaction):
+        if summary_doc.id != exclude_session_id:
+            add_summary(rollup, summary_doc.to_dict() or {})
+    return rollup
+
+
+async def save_close(session_summary: Dict[str, Any], session_data: Dict[str, Any],
+                     overall_summary: Optional[str]) -> Dict[str, Any]:
+    """
+    Store a session summary and fold it into the user's rollup in one transaction.
+
+    Also flags the session's index entry as summarized and updates the daily
+    aggregate of the session's day. The stored overall summary is only
+    replaced when ``overall_summary`` is not None.
+
+    Args:
+        session_summary (Dict[str, Any]): The ``session_summaries`` document to write
+        session_data (Dict[str, Any]): The session document being closed
+        overall_summary (str, optional): New overall summary text for the user
+
+    Returns:
+        Dict[str, Any]: The user's updated avg_intensity and emotion_percentages
+    """
+    return await run_transaction(_save_close, session_summary, session_data, overall_summary)
+
+
+async def _save_close(transaction, session_summary: Dict[str, Any], session_data: Dict[str, Any],
+                      overall_summary: Optional[str]) -> Dict[str, Any]:
+    session_id, user_id = session_summary["session_id"], session_summary["user_id"]
+    summary_ref = db.collection(SESSION_SUMMARIES).document(session_id)
+    user_ref = db.collection(USER_SUMMARIES).document(user_id)
+
+    # All reads happen before any write, as transactions require
+    user_snapshot = await user_ref.get(transaction=transaction)
+    previous_snapshot = await summary_ref.get(transaction=transaction)
+    rollup = (user_snapshot.to_dict() or {}).get(ROLLUP_FIELD) if user_snapshot.exists else None
+    previous_summary = (previous_snapshot.to_dict() or {}) if previous_snapshot.exists else None
+    days = await apply_summary_change(transaction, session_summary, previous_summary)
+
+    if rollup is None:
+        # First close since the rollup was introduced: seed from stored summaries
+        rollup = await rebuild_rollup(user_id, exclude_session_id=session_id, transaction=transaction)
+    elif previous_snapshot.exists:
+        # Re-closing: replace the previous summary's contribution
+        add_summary(rollup, previous_summary, sign=-1)
+    add_summary(rollup, session_summary)
+
+    derived = rollup_fields(rollup)
+    user_fields = {"user_id": user_id, ROLLUP_FIELD: rollup, **derived}
+    if overall_summary is not None:
+        user_fields["overall_summary"] = overall_summary
+
+    transaction.set(summary_ref, session_summary)
+    set_summarized(transaction, session_id, session_data, True)
+    write_days(transaction, days)
+    transaction.set(user_ref, user_fields, merge=True)
+    return derived
+
+
+async def reopen_session(session_id: str) -> bool:
+    """
+    Reopen a summarized session by deleting its summary and subtracting it from the rollup.
+
+    Returns:
+        bool: True if the session had a summary
+    """
+    summary_ref = db.collection(SESSION_SUMMARIES).document(session_id)
+    if not (await get_fields(summary_ref, "summary_exists")).exists:
+        return False
+    return await run_transaction(_remove_summary, summary_ref)
+
+
+async def _remove_summary(transaction, summary_ref) -> bool:
+    snapshot = await summary_ref.get(transaction=transaction)
+    if not snapshot.exists:
+        return False
+    session_summary = snapshot.to_dict() or {}
+
+    user_ref = rollup = None
+    if session_summary.get("user_id"):
+        user_ref = db.collection(USER_SUMMARIES).document(session_summary["user_id"])
+        user_snapshot = await user_ref.get(transaction=transaction)
+        rollup = (user_snapshot.to_dict() or {}).get(ROLLUP_FIELD) if user_snapshot.exists else None
+    days = await apply_summary_change(transaction, None, session_summary)
+
+    transaction.delete(summary_ref)
+    write_days(transaction, days)
+    # Users without a rollup are seeded from the remaining summaries on their next close
+    if rollup is not None:
+        add_summary(rollup, session_summary, sign=-1)
+        transaction.set(user_ref, {ROLLUP_FIELD: rollup, **rollup_fields(rollup)}, merge=True)
+    return True
@@ -19,10 +19,38 @@ Author: Therapy App Team
 Version: 0.1.0
 """
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from api import session, history, statistics
-from core.middleware import AuthMiddleware
+from core.config import settings
+from core.genkit_gemini import model
+from core.jobs import job_queue
+from core.metrics import CONTENT_TYPE, registry
+from core.middleware import AuthMiddleware, TimingMiddleware
+from core.providers import warm_up
+from core.repository import db
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run the background job workers (session close processing) with the app.
+    
+    Firestore and Gemini clients are created on first use; CLIENT_WARMUP
+    creates them concurrently at startup instead, either while already
+    serving ("background") or before serving ("startup").
+    """
+    await job_queue.start()
+    if settings.client_warmup == "startup":
+        await warm_up(db, model)
+    elif settings.client_warmup == "background":
+        app.state.warmup = asyncio.create_task(warm_up(db, model))
+    yield
+    await job_queue.stop()
+
 
 # Initialize FastAPI application with metadata
 app = FastAPI(
@@ -31,8 +59,21 @@ app = FastAPI(
     description="Backend API for AI-powered therapy application with session management, mood tracking, and conversation assistance.",
     docs_url="/docs",  # Swagger UI endpoint
     redoc_url="/redoc",  # ReDoc endpoint
+    lifespan=lifespan,
 )
 
+# Middleware is plain ASGI (see core/middleware.py) and the last one added runs
+# first: CORS, then timing, then authentication, so preflight requests and 401
+# responses still get CORS headers and timing covers token verification.
+
+# Authentication middleware: disabled for demo purposes unless AUTH_ENABLED is set,
+# in which case every request needs a Firebase ID token (verified locally and cached)
+if settings.auth_enabled:
+    app.add_middleware(AuthMiddleware)
+
+# Server-Timing header and slow request logging
+app.add_middleware(TimingMiddleware)
+
 # Configure CORS middleware for frontend integration
 app.add_middleware(
     CORSMiddleware,
@@ -42,10 +83,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Authentication middleware disabled for demo purposes
-# All endpoints are now publicly accessible with a test user
-# app.add_middleware(AuthMiddleware)  # Commented out for demo
-
 # Include API routers with organized endpoints
 # Session management: conversation creation, message handling, AI assistance
 app.include_router(
@@ -81,6 +118,16 @@ async def health_check():
         "version": "0.1.0"
     }
 
+# Prometheus metrics: request, Firestore and Gemini latency histograms, cache
+# hit rates and in-flight gauges (see core/metrics.py)
+if settings.metrics_enabled:
+    @app.get("/metrics", tags=["System"], response_class=PlainTextResponse)
+    async def metrics():
+        """
+        Metrics in the Prometheus text exposition format, for scraping.
+        """
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
 # Root endpoint with API information
 @app.get("/", tags=["System"])
 async def root():
@@ -91,10 +138,11 @@ async def root():
         "message": "AI Therapy App Backend API - Demo Mode",
         "version": "0.1.0",
         "mode": "demo",
-        "authentication": "disabled",
+        "authentication": "enabled" if settings.auth_enabled else "disabled",
         "test_user": "demo-user-12345",
         "docs": "/docs",
         "health": "/health",
+        "metrics": "/metrics" if settings.metrics_enabled else None,
         "endpoints": {
             "sessions": "/session/",
             "history": "/history/",
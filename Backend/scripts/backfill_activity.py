@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Backfill (or rebuild) the per-user activity counters behind GET /statistics/.
+
+Scans ``sessions`` page by page (only ``user_id``, ``day`` and ``created_at``
+are fetched) and collects each user's active days: the stored local ``day``
+of newer sessions, or ``created_at`` converted to the user's time zone (the
+one on their activity counters, else ``DEFAULT_TIMEZONE``) for older ones.
+Users are then processed ``--batch-size`` at a time: their ``user_summaries``
+documents are fetched in one ``get_all`` call, recomputed counters that differ
+from the stored ones are reported and, unless ``--dry-run`` is given, written
+in one batch per group of users.
+
+Run once after deploying the counters, preferably while traffic is low
+(sessions started during the scan may be missed; re-running corrects them).
+
+Run from the Backend directory with the usual environment (.env) configured:
+    python scripts/backfill_activity.py --dry-run
+    python scripts/backfill_activity.py --user demo-user-12345
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.activity import ACTIVITY_FIELD, DAY_FIELD, activity_from_days, local_day, resolve_timezone
+from core.repository import collect, db
+from core.user_rollup import USER_SUMMARIES
+
+# Firestore allows at most 500 writes per batch
+MAX_BATCH_WRITES = 500
+
+
+def _moment(value: Any) -> Optional[datetime]:
+    """A stored ``created_at`` (datetime, Firestore timestamp or ISO string) as a datetime."""
+    try:
+        if isinstance(value, datetime):
+            return value
+        if hasattr(value, "seconds"):  # Firestore timestamp
+            return datetime.fromtimestamp(value.seconds, timezone.utc)
+        return datetime.fromisoformat(str(value)) if value else None
+    except ValueError:
+        return None
+
+
+async def scan_sessions(user: Optional[str], batch_size: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Each user's sessions (``day`` and ``created_at`` only), read page by page."""
+    base_query = db.collection("sessions")
+    if user:
+        base_query = base_query.where("user_id", "==", user)
+    base_query = base_query.select(["user_id", DAY_FIELD, "created_at"]).order_by("__name__").limit(batch_size)
+
+    sessions: Dict[str, List[Dict[str, Any]]] = {}
+    last_doc = None
+    while True:
+        query = base_query.start_after(last_doc) if last_doc else base_query
+        page = await collect(query)
+        if not page:
+            break
+        for doc in page:
+            data = doc.to_dict() or {}
+            if data.get("user_id"):
+                sessions.setdefault(data["user_id"], []).append(data)
+        last_doc = page[-1]
+    return sessions
+
+
+def expected_activity(sessions: List[Dict[str, Any]], stored: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Counters recomputed from a user's sessions, in the user's stored time zone."""
+    timezone_name = resolve_timezone((stored or {}).get("timezone"))
+    days = []
+    for data in sessions:
+        moment = _moment(data.get("created_at"))
+        day = data.get(DAY_FIELD) or (local_day(timezone_name, moment) if moment else None)
+        if day:
+            days.append(day)
+    return activity_from_days(days, len(sessions), timezone_name)
+
+
+async def backfill_users(user_ids: List[str], sessions: Dict[str, List[Dict[str, Any]]], dry_run: bool) -> int:
+    """Recompute and write one group of users; returns how many differed."""
+    refs = [db.collection(USER_SUMMARIES).document(user_id) for user_id in user_ids]
+    stored = {snapshot.id: (snapshot.to_dict() or {}).get(ACTIVITY_FIELD)
+              async for snapshot in db.get_all(refs, field_paths=[ACTIVITY_FIELD]) if snapshot.exists}
+
+    batch, differing = db.batch(), 0
+    for ref, user_id in zip(refs, user_ids):
+        expected = expected_activity(sessions.get(user_id, []), stored.get(user_id))
+        if stored.get(user_id) == expected:
+            continue
+        differing += 1
+        print(f"{user_id}: stored {json.dumps(stored.get(user_id), sort_keys=True)}")
+        print(f"{' ' * len(user_id)}  expected {json.dumps(expected, sort_keys=True)}")
+        batch.set(ref, {"user_id": user_id, ACTIVITY_FIELD: expected}, merge=True)
+
+    if differing and not dry_run:
+        await batch.commit()
+    return differing
+
+
+async def backfill(args) -> int:
+    """Rebuild the selected users' activity counters; returns how many users differed."""
+    sessions = await scan_sessions(args.user, args.batch_size)
+    user_ids = sorted(set(sessions) | ({args.user} if args.user else set()))
+
+    batch_size = min(args.batch_size, MAX_BATCH_WRITES)
+    differing = 0
+    for start in range(0, len(user_ids), batch_size):
+        differing += await backfill_users(user_ids[start:start + batch_size], sessions, args.dry_run)
+
+    action = "would update" if args.dry_run else "updated"
+    print(f"Checked {len(user_ids)} users: {differing} differed; {action} {differing}")
+    return differing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="only rebuild this user id")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="session documents read per page and users written per batch (max 500)")
+    parser.add_argument("--dry-run", action="store_true", help="report differences without writing")
+    args = parser.parse_args()
+
+    if not db:
+        raise SystemExit("Firestore is not available - check your credentials configuration")
+
+    logging.disable(logging.INFO)
+
+    asyncio.run(backfill(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Backfill (or rebuild) the per-user daily statistics aggregates.
+
+Scans ``sessions`` (only ``user_id``, ``day`` and ``created_at`` are fetched),
+``session_summaries`` and ``moods`` page by page, recomputes every
+``users/{uid}/daily_stats/{day}`` document and compares it with the stored
+one. Differing or missing days are reported; unless ``--dry-run`` is given,
+the recomputed days are written (stale days are deleted) and every counted
+summary is flagged ``daily_counted`` so later reopens subtract it.
+
+Run once after deploying the aggregates, preferably while traffic is low
+(writes made during the scan may be overwritten; re-running corrects them).
+
+Run from the Backend directory with the usual environment (.env) configured:
+    python scripts/backfill_daily_stats.py --dry-run
+    python scripts/backfill_daily_stats.py --user demo-user-12345
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.activity import DAY_FIELD
+from core.daily_stats import (
+    COUNTED_FIELD,
+    add_mood_entry,
+    add_summary,
+    daily_ref,
+    day_key,
+    list_daily_stats,
+    new_day,
+    summary_day,
+)
+from core.repository import collect, db
+
+# Firestore allows at most 500 writes per batch
+MAX_BATCH_WRITES = 500
+
+
+async def scan(collection: str, user: Optional[str], batch_size: int, fields: Optional[List[str]] = None):
+    """Yield the documents of a collection page by page, optionally for one user."""
+    base_query = db.collection(collection)
+    if user:
+        base_query = base_query.where("user_id", "==", user)
+    if fields:
+        base_query = base_query.select(fields)
+    base_query = base_query.order_by("__name__").limit(batch_size)
+
+    last_doc = None
+    while True:
+        query = base_query.start_after(last_doc) if last_doc else base_query
+        page = await collect(query)
+        if not page:
+            break
+        for doc in page:
+            yield doc
+        last_doc = page[-1]
+
+
+def _day(days: Dict[Tuple[str, str], Dict[str, Any]], data: Dict[str, Any], *date_fields: str):
+    """
+    The aggregate a document counts towards, or None without an owner or date.
+
+    Sessions and summaries count on their stored local day (no ``date_fields``);
+    mood entries on the first of ``date_fields`` they have.
+    """
+    user_id = data.get("user_id")
+    if date_fields:
+        day = next((day_key(data.get(field)) for field in date_fields if data.get(field)), None)
+    else:
+        day = summary_day(data)
+    if not user_id or not day:
+        return None
+    return days.setdefault((user_id, day), new_day(day))
+
+
+async def recompute(args) -> Tuple[Dict[Tuple[str, str], Dict[str, Any]], list]:
+    """Aggregate every selected session, summary and mood entry by user and day."""
+    days: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    counted = []
+
+    async for doc in scan("sessions", args.user, args.batch_size, ["user_id", DAY_FIELD, "created_at"]):
+        day_stats = _day(days, doc.to_dict() or {})
+        if day_stats is not None:
+            day_stats["sessions"] += 1
+
+    async for doc in scan("session_summaries", args.user, args.batch_size):
+        summary = doc.to_dict() or {}
+        day_stats = _day(days, summary)
+        if day_stats is not None:
+            add_summary(day_stats, summary)
+            if not summary.get(COUNTED_FIELD):
+                counted.append(doc.reference)
+
+    async for doc in scan("moods", args.user, args.batch_size):
+        entry = doc.to_dict() or {}
+        day_stats = _day(days, entry, "created_at", "timestamp", "date")
+        if day_stats is not None:
+            add_mood_entry(day_stats, entry)
+
+    return days, counted
+
+
+def _normalized(day_stats: Dict[str, Any]) -> str:
+    """Serialize an aggregate for comparison, ignoring zero counts."""
+    return json.dumps({
+        key: {k: v for k, v in value.items() if v} if isinstance(value, dict) else value
+        for key, value in day_stats.items()
+    }, sort_keys=True)
+
+
+async def commit_writes(writes: List[Tuple[str, Any, Optional[Dict[str, Any]]]]) -> None:
+    """Apply (operation, reference, data) writes in batches."""
+    for start in range(0, len(writes), MAX_BATCH_WRITES):
+        batch = db.batch()
+        for operation, ref, data in writes[start:start + MAX_BATCH_WRITES]:
+            if operation == "set":
+                batch.set(ref, data)
+            elif operation == "update":
+                batch.update(ref, data)
+            else:
+                batch.delete(ref)
+        await batch.commit()
+
+
+async def backfill(args) -> int:
+    """Rebuild the selected users' daily aggregates; returns the number of days that differed."""
+    days, counted = await recompute(args)
+    users = sorted({user_id for user_id, _ in days} | ({args.user} if args.user else set()))
+
+    writes: List[Tuple[str, Any, Optional[Dict[str, Any]]]] = []
+    differing = 0
+    for user_id in users:
+        stored = {day_stats["date"]: day_stats for day_stats in await list_daily_stats(user_id)}
+        expected = {day: day_stats for (owner, day), day_stats in days.items() if owner == user_id}
+        for day in sorted(set(stored) | set(expected)):
+            if day in stored and day in expected and _normalized(stored[day]) == _normalized(expected[day]):
+                continue
+            differing += 1
+            print(f"{user_id} {day}: stored {_normalized(stored[day]) if day in stored else '-'}")
+            print(f"{' ' * len(user_id)} {day}: expected {_normalized(expected[day]) if day in expected else '-'}")
+            if day in expected:
+                writes.append(("set", daily_ref(user_id, day), expected[day]))
+            else:
+                writes.append(("delete", daily_ref(user_id, day), None))
+    writes += [("update", ref, {COUNTED_FIELD: True}) for ref in counted]
+
+    if not args.dry_run:
+        await commit_writes(writes)
+    action = "would write" if args.dry_run else "wrote"
+    print(f"Checked {len(users)} users: {differing} days differed; {action} {len(writes)} documents")
+    return differing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="only rebuild this user id")
+    parser.add_argument("--batch-size", type=int, default=500, help="documents read per page")
+    parser.add_argument("--dry-run", action="store_true", help="report differences without writing")
+    args = parser.parse_args()
+
+    if not db:
+        raise SystemExit("Firestore is not available - check your credentials configuration")
+
+    logging.disable(logging.INFO)
+
+    asyncio.run(backfill(args))
+
+
+if __name__ == "__main__":
+    main()
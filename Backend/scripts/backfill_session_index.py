@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Backfill the per-user session index for existing sessions.
+
+Sessions are scanned in pages of ``--batch-size`` documents. For each page the
+matching ``session_summaries`` documents are fetched in one ``get_all`` call,
+and every session without an index entry gets a complete
+``users/{uid}/session_index/{session_id}`` document plus the ``indexed`` flag
+on the session, written in a single batch per page.
+
+Run from the Backend directory with the usual environment (.env) configured:
+    python scripts/backfill_session_index.py --dry-run
+    python scripts/backfill_session_index.py --user demo-user-12345
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.repository import collect, db
+from core.session_analytics import message_counts
+from core.session_index import INDEXED_FIELD, index_entry, index_ref
+
+
+async def backfill_page(page, dry_run: bool) -> int:
+    """Index the unindexed sessions of one page; returns how many were indexed."""
+    pending = [doc for doc in page if not (doc.to_dict() or {}).get(INDEXED_FIELD)]
+    pending = [doc for doc in pending if (doc.to_dict() or {}).get("user_id")]
+    if not pending:
+        return 0
+
+    summary_refs = [db.collection("session_summaries").document(doc.id) for doc in pending]
+    summarized = {snapshot.id async for snapshot in db.get_all(summary_refs) if snapshot.exists}
+
+    batch = db.batch()
+    for session_doc in pending:
+        session_data = session_doc.to_dict()
+        total, user_count, _ = message_counts(session_data)
+        entry = index_entry(session_data.get("created_at"), total, user_count, session_doc.id in summarized)
+        print(f"{session_doc.id}: {entry['message_count']} messages, summarized={entry['summarized']}")
+        batch.set(index_ref(session_data["user_id"], session_doc.id), entry)
+        batch.update(session_doc.reference, {INDEXED_FIELD: True})
+
+    if not dry_run:
+        await batch.commit()
+    return len(pending)
+
+
+async def backfill(args) -> None:
+    """Walk the selected sessions page by page and index them."""
+    # Two writes per session must fit in one 500-write batch
+    batch_size = min(args.batch_size, 250)
+    base_query = db.collection("sessions")
+    if args.user:
+        base_query = base_query.where("user_id", "==", args.user)
+    base_query = base_query.order_by("__name__").limit(batch_size)
+
+    scanned = indexed = 0
+    last_doc = None
+    while True:
+        query = base_query.start_after(last_doc) if last_doc else base_query
+        page = await collect(query)
+        if not page:
+            break
+        scanned += len(page)
+        indexed += await backfill_page(page, args.dry_run)
+        last_doc = page[-1]
+
+    action = "would index" if args.dry_run else "indexed"
+    print(f"Scanned {scanned} sessions, {action} {indexed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="only index sessions belonging to this user id")
+    parser.add_argument("--batch-size", type=int, default=200, help="session documents per page (max 250)")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be indexed")
+    args = parser.parse_args()
+
+    if not db:
+        raise SystemExit("Firestore is not available - check your credentials configuration")
+
+    logging.disable(logging.INFO)
+
+    asyncio.run(backfill(args))
+
+
+if __name__ == "__main__":
+    main()
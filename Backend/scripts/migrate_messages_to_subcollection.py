@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Migrate array-based sessions to subcollection message storage.
+
+Sessions are scanned in pages of ``--batch-size`` documents. For each session
+still storing its messages in the ``messages`` array, the messages are copied
+to ``sessions/{id}/messages/{seq}`` in write batches, and the session document
+is then switched to subcollection storage in a transaction that also copies any
+messages appended while the copy was running and removes the array.
+
+Message document ids are derived from the sequence number, so the script is
+safe to re-run: interrupted sessions are simply copied again, and messages
+that reached a migrated session's array afterwards are appended after
+``message_count``.
+
+Run from the Backend directory with the usual environment (.env) configured:
+    python scripts/migrate_messages_to_subcollection.py --dry-run
+    python scripts/migrate_messages_to_subcollection.py --user demo-user-12345
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.cloud.firestore_v1 import DELETE_FIELD, transactional
+from core.firebase import db
+from core.emotion_analysis import accumulate
+from core.message_store import (
+    COUNT_FIELD,
+    MESSAGES_SUBCOLLECTION,
+    STORAGE_FIELD,
+    SUBCOLLECTION,
+    message_doc_id,
+    uses_subcollection,
+)
+from core.session_analytics import ANALYTICS_FIELD
+
+# Firestore allows at most 500 writes per batch or transaction
+MAX_WRITES = 500
+
+
+def copy_messages(session_ref, messages, first_seq: int) -> None:
+    """Write messages to the subcollection in batches, numbering from ``first_seq``."""
+    messages_ref = session_ref.collection(MESSAGES_SUBCOLLECTION)
+    for offset in range(0, len(messages), MAX_WRITES):
+        batch = db.batch()
+        for index, message in enumerate(messages[offset:offset + MAX_WRITES], start=first_seq + offset):
+            batch.set(messages_ref.document(message_doc_id(index)), {**message, "seq": index})
+        batch.commit()
+
+
+@transactional
+def finalize_session(transaction, session_ref, base: int, copied: int) -> int:
+    """
+    Switch a session to subcollection storage.
+
+    Returns:
+        int: Number of messages that arrived after the bulk copy and were
+            copied inside the transaction
+    """
+    snapshot = session_ref.get(transaction=transaction)
+    session_data = snapshot.to_dict() or {}
+    messages = session_data.get("messages", [])
+    if (session_data.get(COUNT_FIELD, 0) if uses_subcollection(session_data) else 0) != base:
+        raise RuntimeError("message_count changed during migration")
+
+    late = messages[copied:]
+    messages_ref = session_ref.collection(MESSAGES_SUBCOLLECTION)
+    for index, message in enumerate(late, start=base + copied):
+        transaction.set(messages_ref.document(message_doc_id(index)), {**message, "seq": index})
+
+    updates = {
+        STORAGE_FIELD: SUBCOLLECTION,
+        COUNT_FIELD: base + len(messages),
+        "messages": DELETE_FIELD,
+    }
+    if ANALYTICS_FIELD not in session_data:
+        updates[ANALYTICS_FIELD] = accumulate(messages)
+    transaction.update(session_ref, updates)
+    return len(late)
+
+
+def migrate_session(session_doc, dry_run: bool) -> bool:
+    """Migrate one session document; returns True when it needed migration."""
+    session_data = session_doc.to_dict() or {}
+    messages = session_data.get("messages")
+    if uses_subcollection(session_data) and not messages:
+        return False
+
+    base = session_data.get(COUNT_FIELD, 0) if uses_subcollection(session_data) else 0
+    print(f"{session_doc.id}: {len(messages or [])} messages to move (starting at seq {base})")
+    if dry_run:
+        return True
+
+    # Bulk-copy what we have now; the transaction picks up anything newer
+    copy_messages(session_doc.reference, messages or [], base)
+    try:
+        late = finalize_session(db.transaction(), session_doc.reference, base, len(messages or []))
+    except RuntimeError as e:
+        print(f"  skipped: {e} - re-run the migration for this session")
+        return True
+    if late:
+        print(f"  copied {late} messages appended during migration")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="only migrate sessions belonging to this user id")
+    parser.add_argument("--batch-size", type=int, default=100, help="session documents read per page")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be migrated")
+    args = parser.parse_args()
+
+    if db is None:
+        raise SystemExit("Firestore is not available - check your credentials configuration")
+
+    logging.disable(logging.INFO)
+
+    base_query = db.collection("sessions")
+    if args.user:
+        base_query = base_query.where("user_id", "==", args.user)
+    base_query = base_query.order_by("__name__").limit(args.batch_size)
+
+    scanned = migrated = 0
+    last_doc = None
+    while True:
+        query = base_query.start_after(last_doc) if last_doc else base_query
+        page = list(query.stream())
+        if not page:
+            break
+        for session_doc in page:
+            scanned += 1
+            if migrate_session(session_doc, args.dry_run):
+                migrated += 1
+        last_doc = page[-1]
+
+    action = "would migrate" if args.dry_run else "migrated"
+    print(f"Scanned {scanned} sessions, {action} {migrated}")
+
+
+if __name__ == "__main__":
+    main()
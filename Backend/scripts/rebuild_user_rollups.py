@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Rebuild per-user analytics rollups from the stored session summaries.
+
+For every selected user this recomputes the ``rollup`` totals on
+``user_summaries/{uid}`` from all of the user's ``session_summaries`` and
+compares the averages they produce with the stored ones. Any difference
+(including users without a rollup yet) is reported as drift; with ``--fix``
+the recomputed rollup and averages are written back.
+
+Run from the Backend directory with the usual environment (.env) configured:
+    python scripts/rebuild_user_rollups.py --user demo-user-12345
+    python scripts/rebuild_user_rollups.py --fix
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.repository import collect, db
+from core.user_rollup import ROLLUP_FIELD, USER_SUMMARIES, rebuild_rollup, rollup_fields
+
+
+def _rounded(fields: dict) -> str:
+    """Serialize derived averages, ignoring float noise from running sums."""
+    return json.dumps({
+        "avg_intensity": round(fields["avg_intensity"], 6),
+        "emotion_percentages": {k: round(v, 6) for k, v in fields["emotion_percentages"].items()},
+    }, sort_keys=True)
+
+
+async def rebuild_user(user_doc, fix: bool) -> bool:
+    """Check one user_summaries document; returns True when it has drifted."""
+    stored = (user_doc.to_dict() or {}).get(ROLLUP_FIELD)
+    expected = await rebuild_rollup(user_doc.id)
+
+    if stored is not None and _rounded(rollup_fields(stored)) == _rounded(rollup_fields(expected)):
+        return False
+
+    if stored is None:
+        print(f"{user_doc.id}: no rollup stored")
+    else:
+        print(f"{user_doc.id}: drift detected")
+        print(f"  stored  : {json.dumps(stored, sort_keys=True)}")
+        print(f"  expected: {json.dumps(expected, sort_keys=True)}")
+
+    if fix:
+        await user_doc.reference.set({ROLLUP_FIELD: expected, **rollup_fields(expected)}, merge=True)
+        print(f"  fixed {user_doc.id}")
+    return True
+
+
+async def rebuild(args) -> int:
+    """Rebuild the selected users' rollups; returns the number that drifted."""
+    if args.user:
+        snapshot = await db.collection(USER_SUMMARIES).document(args.user).get()
+        docs = [snapshot] if snapshot.exists else []
+    else:
+        docs = await collect(db.collection(USER_SUMMARIES))
+
+    checked = drifted = 0
+    for user_doc in docs:
+        checked += 1
+        if await rebuild_user(user_doc, args.fix):
+            drifted += 1
+
+    print(f"Checked {checked} users: {drifted} drifted{' (fixed)' if args.fix and drifted else ''}")
+    return drifted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="only this user id")
+    parser.add_argument("--fix", action="store_true", help="overwrite drifted rollups with the recomputed ones")
+    args = parser.parse_args()
+
+    if not db:
+        raise SystemExit("Firestore is not available - check your credentials configuration")
+
+    drifted = asyncio.run(rebuild(args))
+    sys.exit(1 if drifted and not args.fix else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Reconcile running session analytics against a full recomputation.
+
+For every selected session this recomputes the analytics state from the stored
+message list and compares the analytics it produces with those produced by the
+stored ``analytics_state``. Any difference (including sessions that have no
+state yet) is reported as drift; with ``--fix`` the recomputed state is written
+back.
+
+Run from the Backend directory with the usual environment (.env) configured:
+    python scripts/reconcile_session_analytics.py --user demo-user-12345
+    python scripts/reconcile_session_analytics.py --session <id> --fix
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.repository import collect, db
+from core.emotion_analysis import accumulate, analytics_from_state
+from core.message_store import load_messages
+from core.session_analytics import ANALYTICS_FIELD
+
+
+def _canonical(analytics: dict) -> str:
+    """Serialize analytics so that both values and numeric types are compared."""
+    return json.dumps(analytics, sort_keys=True)
+
+
+async def reconcile_session(session_doc, fix: bool) -> bool:
+    """Check one session document; returns True when it has drifted."""
+    session_data = session_doc.to_dict() or {}
+    expected_state = accumulate(await load_messages(session_doc.reference, session_data))
+    stored_state = session_data.get(ANALYTICS_FIELD)
+
+    if stored_state is not None and \
+            _canonical(analytics_from_state(stored_state)) == _canonical(analytics_from_state(expected_state)):
+        return False
+
+    if stored_state is None:
+        print(f"{session_doc.id}: no running analytics stored")
+    else:
+        print(f"{session_doc.id}: drift detected")
+        print(f"  stored  : {json.dumps(stored_state, sort_keys=True)}")
+        print(f"  expected: {json.dumps(expected_state, sort_keys=True)}")
+
+    if fix:
+        await session_doc.reference.update({ANALYTICS_FIELD: expected_state})
+        print(f"  fixed {session_doc.id}")
+    return True
+
+
+async def reconcile(args) -> int:
+    """Reconcile the selected sessions; returns the number that drifted."""
+    if args.session:
+        snapshot = await db.collection("sessions").document(args.session).get()
+        docs = [snapshot] if snapshot.exists else []
+    else:
+        query = db.collection("sessions")
+        if args.user:
+            query = query.where("user_id", "==", args.user)
+        docs = await collect(query)
+
+    checked = drifted = 0
+    for session_doc in docs:
+        checked += 1
+        if await reconcile_session(session_doc, args.fix):
+            drifted += 1
+
+    print(f"Checked {checked} sessions: {drifted} drifted{' (fixed)' if args.fix and drifted else ''}")
+    return drifted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="only sessions belonging to this user id")
+    parser.add_argument("--session", help="only this session id")
+    parser.add_argument("--fix", action="store_true", help="overwrite drifted state with the recomputed one")
+    args = parser.parse_args()
+
+    if not db:
+        raise SystemExit("Firestore is not available - check your credentials configuration")
+
+    # Analysis logs at INFO for every session; keep the report readable
+    logging.disable(logging.INFO)
+
+    drifted = asyncio.run(reconcile(args))
+    sys.exit(1 if drifted and not args.fix else 0)
+
+
+if __name__ == "__main__":
+    main()
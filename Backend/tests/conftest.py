@@ -0,0 +1,12 @@
+"""
+Shared pytest setup: run from the Backend directory with no credentials, so
+importing ``core`` modules never contacts a Google service.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ENVIRONMENT", "dev")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("JOB_STORE", "memory")
@@ -0,0 +1,127 @@
+"""Tests for the memory, SQLite and tiered caches (core/cache.py)."""
+
+import asyncio
+import time
+
+import pytest
+
+from core.cache import MISSING, LRUCache, SQLiteCache, TieredCache
+
+
+@pytest.fixture
+def disk(tmp_path):
+    return SQLiteCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024)
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_bounds_total_size():
+    cache = LRUCache(max_entries=100, max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+    cache.set("c", "zzzz")
+    assert cache.get("a") is MISSING
+    assert cache.stats()["bytes"] == 8
+
+    cache.set("huge", "x" * 11)  # Larger than the whole cache: not stored
+    assert cache.get("huge") is MISSING
+    assert cache.get("c") == "zzzz"
+
+
+def test_lru_expires_entries_and_caches_none():
+    cache = LRUCache(max_entries=10, ttl=60)
+    cache.set("gone", "value", ttl=-1)
+    cache.set("none", None)
+
+    assert cache.get("gone") is MISSING
+    assert cache.get("none") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_delete_prefix():
+    cache = LRUCache(max_entries=10)
+    for key in ("user1:a", "user1:b", "user2:a"):
+        cache.set(key, key)
+    assert cache.delete_prefix("user1:") == 2
+    assert cache.get("user1:a") is MISSING
+    assert cache.get("user2:a") == "user2:a"
+
+
+def test_sqlite_round_trips_json_and_survives_reopen(disk, tmp_path):
+    disk.set("key", {"question": "How did that feel?", "tokens": [1, 2]})
+    reopened = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    assert reopened.get("key") == {"question": "How did that feel?", "tokens": [1, 2]}
+    assert reopened.get("other") is MISSING
+
+
+def test_sqlite_expires_and_evicts_by_size(disk):
+    disk.set("expired", "x", ttl=-1)
+    assert disk.get("expired") is MISSING
+    assert disk.stats()["expirations"] == 1
+
+    for i in range(5):
+        disk.set(f"k{i}", "x" * 300)  # 302 bytes encoded; at most three fit
+    stats = disk.stats()
+    assert stats["bytes"] <= 1024
+    assert disk.get("k0") is MISSING
+    assert disk.get("k4") == "x" * 300
+
+
+def test_sqlite_delete_prefix(disk):
+    disk.set("user1:a", 1)
+    disk.set("user1:b", 2)
+    disk.set("user2:a", 3)
+    assert disk.delete_prefix("user1:") == 2
+    assert disk.get("user2:a") == 3
+
+
+def test_tiered_promotes_disk_hits_to_memory(disk):
+    async def run():
+        cache = TieredCache(LRUCache(max_entries=10), disk)
+        await cache.set("key", "value")
+        cache.memory.clear()
+
+        assert await cache.get("key") == "value"  # From disk
+        assert cache.memory.get("key") == "value"  # Promoted
+        assert await cache.get("missing") is MISSING
+
+        await cache.delete("key")
+        assert await cache.get("key") is MISSING
+        return cache.stats()
+
+    stats = asyncio.run(run())
+    assert stats["disk"]["hits"] == 1
+    assert stats["misses"] == stats["disk"]["misses"] == 2
+
+
+def test_tiered_promotion_keeps_the_entry_ttl(disk):
+    async def run():
+        cache = TieredCache(LRUCache(max_entries=10, ttl=3600), disk)
+        await cache.set("followup", "How are you?", ttl=0.2)
+        await cache.set("summary", "You talked about work.")
+        cache.memory.clear()
+
+        value, ttl = disk.get_with_ttl("followup")
+        assert value == "How are you?" and 0 < ttl <= 0.2
+        assert disk.get_with_ttl("missing") == (MISSING, None)
+
+        assert await cache.get("followup") == "How are you?"  # Promoted with its remaining 0.2 s
+        assert await cache.get("summary") == "You talked about work."  # Promoted with the memory default
+        time.sleep(0.25)
+        return cache.memory.get("followup"), cache.memory.get("summary")
+
+    followup, summary = asyncio.run(run())
+    assert followup is MISSING
+    assert summary == "You talked about work."
@@ -0,0 +1,75 @@
+"""Tests for the rolling summary of the question context (core/context_builder.py)."""
+
+import asyncio
+
+import pytest
+
+from core import context_builder
+from core.config import settings
+from core.context_builder import SUMMARY_FIELD, build_context
+
+
+class FakeSession:
+    """Session document reference recording ``update`` calls."""
+
+    id = "session-1"
+
+    def __init__(self):
+        self.updates = []
+
+    async def update(self, data):
+        self.updates.append(data)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(settings, "question_context_window", 4)
+    monkeypatch.setattr(settings, "question_summary_step", 2)
+    messages = [{"role": "user" if i % 2 == 0 else "generated", "text": f"message {i}"} for i in range(8)]
+
+    async def page_messages(session_ref, session_data, cursor=None, limit=None):
+        start = 0 if cursor is None else cursor + 1
+        return messages[start:start + limit], None
+
+    async def tail_messages(session_ref, session_data, limit):
+        return messages[-limit:]
+
+    monkeypatch.setattr(context_builder, "page_messages", page_messages)
+    monkeypatch.setattr(context_builder, "tail_messages", tail_messages)
+    return {"messages": messages}
+
+
+def summarizer(monkeypatch, result):
+    calls = []
+
+    async def summarize(previous_summary, messages):
+        calls.append(messages)
+        return result
+
+    monkeypatch.setattr(context_builder, "summarize_conversation_window", summarize)
+    return calls
+
+
+def test_empty_summary_still_advances_through(session, monkeypatch):
+    calls = summarizer(monkeypatch, "")
+    session_ref = FakeSession()
+
+    context = asyncio.run(build_context(session_ref, session))
+    assert context["summarized_through"] == 4
+    assert session_ref.updates == [{SUMMARY_FIELD: {"text": "", "through": 4}}]
+
+    # The stored state covers the overflow, so the next request does not summarize again
+    asyncio.run(build_context(session_ref, {**session, **session_ref.updates[-1]}))
+    assert len(calls) == 1
+
+
+def test_failed_summary_is_retried_on_the_next_request(session, monkeypatch):
+    calls = summarizer(monkeypatch, None)
+    session_ref = FakeSession()
+
+    context = asyncio.run(build_context(session_ref, session))
+    assert context["summarized_through"] == 0
+    assert session_ref.updates == []
+
+    asyncio.run(build_context(session_ref, session))
+    assert len(calls) == 2
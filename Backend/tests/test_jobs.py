@@ -0,0 +1,231 @@
+"""Tests for the background job stores and queue (core/jobs.py)."""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from core.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, MemoryJobStore, SQLiteJobStore, register_handler
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    return MemoryJobStore()
+
+
+def make_queue(store, max_attempts=3, base_delay=0.01, max_delay=1.0):
+    return JobQueue(store, workers=1, max_attempts=max_attempts, retry_base_delay=base_delay,
+                    retry_max_delay=max_delay, lease_seconds=60, poll_interval=0.01)
+
+
+def handler_kind(handler) -> str:
+    """Register ``handler`` under a kind unique to the test."""
+    kind = f"test_{uuid.uuid4().hex}"
+    register_handler(kind, handler)
+    return kind
+
+
+async def wait_for(queue, job_id, statuses=(SUCCEEDED, FAILED), timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not reach {statuses}")
+
+
+def test_enqueue_returns_active_job_for_same_dedupe_key(store):
+    first = store.enqueue("close_session", {"session_id": "s1"}, "s1")
+    again = store.enqueue("close_session", {"session_id": "s1"}, "s1")
+    assert again["job_id"] == first["job_id"]
+
+    # Still deduplicated while running
+    assert store.claim(60)["job_id"] == first["job_id"]
+    assert store.enqueue("close_session", {"session_id": "s1"}, "s1")["job_id"] == first["job_id"]
+
+    # Finished jobs do not block a new one
+    store.complete(first["job_id"], 1, {"status": "summarized"})
+    assert store.enqueue("close_session", {"session_id": "s1"}, "s1")["job_id"] != first["job_id"]
+    assert store.enqueue("close_session", {"session_id": "s2"}, "s2")["job_id"] != first["job_id"]
+
+
+def test_claim_skips_leased_job_until_lease_expires(store):
+    job = store.enqueue("close_session", {}, None)
+    assert store.claim(60)["attempts"] == 1
+    assert store.claim(60) is None
+
+    store.retry(job["job_id"], 1, "boom", time.time())
+    store.claim(0)  # Lease already expired, as for a worker that died mid-run
+    reclaimed = store.claim(60)
+    assert reclaimed["job_id"] == job["job_id"]
+    assert reclaimed["status"] == RUNNING
+    assert reclaimed["attempts"] == 3
+
+
+def test_expired_lease_is_reclaimed_after_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    job = SQLiteJobStore(path).enqueue("close_session", {"session_id": "s1"}, "s1")
+    SQLiteJobStore(path).claim(0)
+
+    reclaimed = SQLiteJobStore(path).claim(60)
+    assert reclaimed["job_id"] == job["job_id"]
+    assert reclaimed["payload"] == {"session_id": "s1"}
+    assert reclaimed["attempts"] == 2
+
+
+def test_retry_schedules_next_attempt_in_the_future(store):
+    async def failing(payload, final_attempt):
+        raise RuntimeError("Gemini unavailable")
+
+    queue = make_queue(store, base_delay=30, max_delay=60)
+    job = store.enqueue(handler_kind(failing), {}, None)
+    before = time.time()
+    asyncio.run(queue._execute(store.claim(60)))
+
+    retried = store.get(job["job_id"])
+    assert retried["status"] == QUEUED
+    assert retried["error"] == "RuntimeError: Gemini unavailable"
+    # First backoff is base_delay with +-20% jitter
+    assert before + 30 * 0.8 <= retried["run_after"] <= time.time() + 30 * 1.2
+    assert store.claim(60) is None
+
+
+def test_job_fails_permanently_after_max_attempts(store):
+    attempts = []
+
+    async def failing(payload, final_attempt):
+        attempts.append(final_attempt)
+        raise RuntimeError("Gemini unavailable")
+
+    async def run():
+        queue = make_queue(store, max_attempts=3)
+        await queue.start()
+        try:
+            job = await queue.enqueue(handler_kind(failing), {})
+            return await wait_for(queue, job["job_id"])
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(run())
+    assert job["status"] == FAILED
+    assert job["attempts"] == 3
+    assert attempts == [False, False, True]
+    assert store.claim(60) is None
+
+
+def test_handler_exception_is_retried_and_final_attempt_returns_partial_result(store):
+    attempts = []
+
+    async def flaky(payload, final_attempt):
+        attempts.append(final_attempt)
+        if not final_attempt:
+            raise TimeoutError("summary stage timed out")
+        return {"status": "summarized", "partial": True}
+
+    async def run():
+        queue = make_queue(store, max_attempts=3)
+        await queue.start()
+        try:
+            job = await queue.enqueue(handler_kind(flaky), {"session_id": "s1"})
+            return await wait_for(queue, job["job_id"])
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(run())
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == {"status": "summarized", "partial": True}
+    assert job["attempts"] == 3
+    assert attempts == [False, False, True]
+
+
+def test_enqueue_rejects_unknown_kind(store):
+    with pytest.raises(ValueError):
+        asyncio.run(make_queue(store).enqueue("no_such_kind", {}))
+
+
+def test_worker_keeps_running_when_the_store_fails_to_record_a_result(store, monkeypatch):
+    async def succeed(payload, final_attempt):
+        return {"status": "summarized"}
+
+    complete = store.complete
+    calls = []
+
+    def flaky_complete(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        complete(*args)
+
+    monkeypatch.setattr(store, "complete", flaky_complete)
+
+    async def run():
+        queue = make_queue(store)
+        await queue.start()
+        try:
+            kind = handler_kind(succeed)
+            first = await queue.enqueue(kind, {"session_id": "s1"})
+            second = await queue.enqueue(kind, {"session_id": "s2"})
+            return await queue.get(first["job_id"]), await wait_for(queue, second["job_id"])
+        finally:
+            await queue.stop()
+
+    first, second = asyncio.run(run())
+    # The worker survived the failed update and processed the next job
+    assert second["status"] == SUCCEEDED
+    assert first["status"] == RUNNING
+
+
+def test_outcome_of_an_attempt_that_lost_its_lease_is_discarded(store):
+    job = store.enqueue("close_session", {"session_id": "s1"}, "s1")
+    assert store.claim(0)["attempts"] == 1  # Outlives its lease
+    assert store.claim(60)["attempts"] == 2  # Re-claimed by another worker
+
+    assert not store.complete(job["job_id"], 1, {"status": "stale"})
+    assert not store.retry(job["job_id"], 1, "stale", time.time())
+    assert store.get(job["job_id"])["status"] == RUNNING
+
+    assert store.complete(job["job_id"], 2, {"status": "summarized"})
+    assert not store.fail(job["job_id"], 2, "late")
+    finished = store.get(job["job_id"])
+    assert finished["status"] == SUCCEEDED
+    assert finished["result"] == {"status": "summarized"}
+
+
+def test_prune_deletes_only_finished_jobs_older_than_the_cutoff(store):
+    done = store.enqueue("close_session", {}, None)
+    store.claim(60)
+    store.complete(done["job_id"], 1, {})
+    failed = store.enqueue("close_session", {}, None)
+    store.claim(60)
+    store.fail(failed["job_id"], 1, "boom")
+    queued = store.enqueue("close_session", {}, None)
+
+    assert store.prune(time.time() - 60) == 0
+    assert store.prune(time.time() + 1) == 2
+    assert store.get(done["job_id"]) is None
+    assert store.get(failed["job_id"]) is None
+    assert store.get(queued["job_id"])["status"] == QUEUED
+
+
+def test_idle_worker_prunes_expired_jobs(store):
+    async def succeed(payload, final_attempt):
+        return {}
+
+    async def run():
+        queue = JobQueue(store, workers=1, max_attempts=3, retry_base_delay=0.01, retry_max_delay=1.0,
+                         lease_seconds=60, retention_seconds=0, poll_interval=0.01, prune_interval=0)
+        await queue.start()
+        try:
+            job = await queue.enqueue(handler_kind(succeed), {})
+            deadline = time.monotonic() + 5
+            while await queue.get(job["job_id"]) is not None and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            return await queue.get(job["job_id"])
+        finally:
+            await queue.stop()
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,70 @@
+"""Tests for the bounded Gemini executor and its load shedding (core/llm_executor.py)."""
+
+import asyncio
+import threading
+
+import pytest
+
+from core.llm_executor import LLMExecutor, LLMOverloaded
+
+
+def blocking_call(release: threading.Event, value):
+    release.wait(5)
+    return value
+
+
+def test_runs_blocking_calls_and_counts_them():
+    async def run():
+        executor = LLMExecutor(threads=2, max_concurrency=2, max_queue=2)
+        results = await asyncio.gather(*(executor.run(pow, 2, n) for n in range(4)))
+        with pytest.raises(ZeroDivisionError):
+            await executor.run(divmod, 1, 0)
+        return results, executor.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == [1, 2, 4, 8]
+    assert (stats["completed"], stats["failed"], stats["shed"]) == (4, 1, 0)
+    assert (stats["in_flight"], stats["waiting"]) == (0, 0)
+
+
+def test_sheds_calls_when_queue_is_full():
+    async def run():
+        executor = LLMExecutor(threads=2, max_concurrency=1, max_queue=1)
+        release = threading.Event()
+        running = asyncio.ensure_future(executor.run(blocking_call, release, "first"))
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(executor.run(blocking_call, release, "second"))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(LLMOverloaded):
+            await executor.run(blocking_call, release, "third")
+        assert executor.stats()["waiting"] == 1
+
+        release.set()
+        return await asyncio.gather(running, queued), executor.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == ["first", "second"]
+    assert (stats["completed"], stats["shed"], stats["queue_timeouts"]) == (2, 1, 0)
+    assert stats["max_waiting"] == 1
+
+
+def test_sheds_callers_that_wait_past_queue_timeout():
+    async def run():
+        executor = LLMExecutor(threads=1, max_concurrency=1, max_queue=5, queue_timeout=0.05)
+        release = threading.Event()
+        running = asyncio.ensure_future(executor.run(blocking_call, release, "first"))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(LLMOverloaded):
+            await executor.run(blocking_call, release, "late")
+
+        release.set()
+        await running
+        # The slot is free again once the running call returns
+        assert await executor.run(blocking_call, release, "after") == "after"
+        return executor.stats()
+
+    stats = asyncio.run(run())
+    assert (stats["shed"], stats["queue_timeouts"], stats["completed"]) == (1, 1, 2)
+    assert stats["in_flight"] == 0
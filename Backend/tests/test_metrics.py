@@ -0,0 +1,77 @@
+"""Tests for the in-process metrics registry and its text rendering (core/metrics.py)."""
+
+import pytest
+
+from core.metrics import MetricsRegistry
+
+
+def sample_lines(registry: MetricsRegistry, name: str):
+    return [line for line in registry.render().splitlines() if line.startswith(name)]
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("request_seconds", "Request time", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("/health").observe(value)
+
+    child = latency.labels("/health")
+    assert child.count == 4
+    assert child.sum == pytest.approx(3.65)
+    assert sample_lines(registry, "request_seconds") == [
+        'request_seconds_bucket{route="/health",le="0.1"} 2',
+        'request_seconds_bucket{route="/health",le="1.0"} 3',
+        'request_seconds_bucket{route="/health",le="+Inf"} 4',
+        'request_seconds_sum{route="/health"} 3.65',
+        'request_seconds_count{route="/health"} 4',
+    ]
+
+
+def test_counter_and_gauge_children_are_per_label_values():
+    registry = MetricsRegistry()
+    errors = registry.counter("errors_total", "Errors", ("operation",))
+    in_flight = registry.gauge("in_flight", "Calls in flight")
+    errors.labels("get").inc()
+    errors.labels("get").inc(2)
+    errors.labels("set").inc()
+    in_flight.labels().inc()
+    in_flight.labels().inc()
+    in_flight.labels().dec()
+
+    assert errors.labels("get") is errors.labels("get")
+    text = registry.render()
+    assert "# TYPE errors_total counter" in text
+    assert 'errors_total{operation="get"} 3' in text
+    assert 'errors_total{operation="set"} 1' in text
+    assert "\nin_flight 1\n" in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("calls_total", "Calls", ("route",)).labels('/a"b\\c\nd').inc()
+    assert sample_lines(registry, "calls_total") == ['calls_total{route="/a\\"b\\\\c\\nd"} 1']
+
+
+def test_rejects_wrong_label_count_and_duplicate_names():
+    registry = MetricsRegistry()
+    family = registry.counter("calls_total", "Calls", ("route", "status"))
+    with pytest.raises(ValueError):
+        family.labels("/health")
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Again")
+
+
+def test_callbacks_and_caches_are_read_at_render_time():
+    registry = MetricsRegistry()
+    state = {"waiting": 0, "hits": 0}
+    registry.register_callback("queue_waiting", "Waiting callers", lambda: state["waiting"])
+    registry.watch_cache("responses", lambda: {"hits": state["hits"], "misses": 1, "entries": 7})
+    registry.watch_cache("tiered", lambda: {"hits": 0, "misses": 0, "memory": {"entries": 2}})
+
+    state.update(waiting=3, hits=3)
+    text = registry.render()
+    assert "\nqueue_waiting 3\n" in text
+    assert 'cache_hits_total{cache="responses"} 3' in text
+    assert 'cache_hit_ratio{cache="responses"} 0.75' in text
+    assert 'cache_hit_ratio{cache="tiered"} 0.0' in text
+    assert 'cache_entries{cache="tiered"} 2' in text
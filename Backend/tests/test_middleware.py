@@ -0,0 +1,61 @@
+"""Tests for the routes AuthMiddleware serves without a token (core/middleware.py)."""
+
+import asyncio
+
+import pytest
+
+from core import middleware
+from core.config import settings
+from core.middleware import AuthMiddleware
+
+
+async def downstream(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def status_of(app, path: str, headers=()) -> int:
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": list(headers)}
+    asyncio.run(app(scope, receive, send))
+    return messages[0]["status"]
+
+
+@pytest.fixture
+def production(monkeypatch):
+    monkeypatch.setattr(settings, "environment", "production")
+
+
+def test_health_and_open_routes_need_no_token(production):
+    app = AuthMiddleware(downstream)
+    assert status_of(app, "/health") == 200
+    assert status_of(app, "/open/ping") == 200
+    assert status_of(app, "/session/") == 401
+    assert status_of(app, "/healthz") == 401
+
+
+def test_metrics_need_a_token_unless_public(production, monkeypatch):
+    assert status_of(AuthMiddleware(downstream), "/metrics") == 401
+
+    monkeypatch.setattr(settings, "metrics_public", True)
+    assert status_of(AuthMiddleware(downstream), "/metrics") == 200
+
+
+def test_token_is_verified_on_protected_routes(production, monkeypatch):
+    async def verify(token):
+        if token != "good":
+            raise ValueError("bad token")
+        return {"uid": "user-1"}
+
+    monkeypatch.setattr(middleware.token_verifier, "verify", verify)
+    app = AuthMiddleware(downstream)
+
+    assert status_of(app, "/metrics", [(b"authorization", b"Bearer good")]) == 200
+    assert status_of(app, "/metrics", [(b"authorization", b"Bearer bad")]) == 401
@@ -0,0 +1,83 @@
+"""Tests for streamed follow-up questions failing mid-stream (core/genkit_gemini.py, api/session.py)."""
+
+import asyncio
+
+import pytest
+
+import api.session as session_api
+from core import genkit_gemini
+from core.config import settings
+from core.genkit_gemini import StreamInterrupted, stream_contextual_followup_question
+
+HISTORY = [{"role": "user", "text": "I could not sleep again last night."}]
+
+
+def failing_stream(chunks):
+    async def stream(prompt):
+        for chunk in chunks:
+            yield chunk
+        raise RuntimeError("connection reset")
+    return stream
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    monkeypatch.setattr(settings, "llm_cache_enabled", False)
+
+
+def test_failure_mid_stream_raises(monkeypatch):
+    monkeypatch.setattr(genkit_gemini, "_stream_model", failing_stream(["How did ", "that "]))
+    received = []
+
+    async def consume():
+        async for chunk in stream_contextual_followup_question(HISTORY, {}):
+            received.append(chunk)
+
+    with pytest.raises(StreamInterrupted):
+        asyncio.run(consume())
+    assert received == ["How did ", "that "]
+
+
+def test_failure_before_any_text_yields_the_fallback(monkeypatch):
+    async def fallback(history):
+        return "What is on your mind?"
+
+    monkeypatch.setattr(genkit_gemini, "_stream_model", failing_stream([]))
+    monkeypatch.setattr(genkit_gemini, "generate_followup_question", fallback)
+    assert asyncio.run(collect(stream_contextual_followup_question(HISTORY, {}))) == ["What is on your mind?"]
+
+
+class FakeRequest:
+    headers = {"accept": "text/event-stream"}
+
+
+def test_endpoint_does_not_save_a_partial_response(monkeypatch):
+    saved = []
+
+    async def load_session(session_id):
+        return object(), {}
+
+    async def prepare_question(session_ref, session_data, user):
+        return {"turns": HISTORY, "summary": ""}, {}, False
+
+    async def save_generated(session_ref, session_data, response):
+        saved.append(response)
+
+    monkeypatch.setattr(session_api, "_load_session", load_session)
+    monkeypatch.setattr(session_api, "_prepare_question", prepare_question)
+    monkeypatch.setattr(session_api, "_save_generated", save_generated)
+    monkeypatch.setattr(genkit_gemini, "_stream_model", failing_stream(["How did ", "that "]))
+
+    async def stream_events():
+        response = await session_api.generate_question_stream("session-1", FakeRequest(), {"uid": "user-1"})
+        return "".join([event async for event in response.body_iterator])
+
+    events = asyncio.run(stream_events())
+    assert saved == []
+    assert events.count("event: token") == 2
+    assert "event: done" not in events
+    assert 'event: error\ndata: {"detail": "Response generation failed", "message_added": false}' in events
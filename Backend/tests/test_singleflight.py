@@ -0,0 +1,68 @@
+"""Tests for request coalescing (core/singleflight.py)."""
+
+import asyncio
+
+import pytest
+
+from core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def generate(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def run():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("s1:4", lambda: generate("question")) for _ in range(5)))
+        other = await flights.do("s1:6", lambda: generate("next question"))
+        return results, other, flights.stats()
+
+    results, other, stats = asyncio.run(run())
+    assert results == ["question"] * 5
+    assert other == "next question"
+    assert calls == ["question", "next question"]
+    assert (stats["executed"], stats["coalesced"], stats["in_flight"]) == (2, 4, 0)
+
+
+def test_exception_is_shared_and_key_is_released():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("Gemini unavailable")
+        return "question"
+
+    async def run():
+        flights = SingleFlight()
+        results = await asyncio.gather(flights.do("key", flaky), flights.do("key", flaky), return_exceptions=True)
+        # The failed call is not cached: the next call runs again
+        return results, await flights.do("key", flaky)
+
+    results, retried = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == "question"
+    assert len(attempts) == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "question"
+
+    async def run():
+        flights = SingleFlight()
+        first = asyncio.ensure_future(flights.do("key", slow))
+        second = asyncio.ensure_future(flights.do("key", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "question"
@@ -0,0 +1,84 @@
+"""Tests for in-place maintenance of the summary similarity index (core/summary_index.py)."""
+
+import numpy as np
+
+from core.summary_index import EMBEDDING_FIELD, SummaryIndex, embed_text
+
+
+class Snapshot:
+    def __init__(self, doc_id: str, data: dict):
+        self.id = doc_id
+        self.exists = True
+        self._data = data
+
+    def to_dict(self) -> dict:
+        return self._data
+
+
+def summary(day: int, text: str, embedded: bool = True) -> dict:
+    data = {"summary": text, "created_at": f"2025-01-{day:02d}T10:00:00"}
+    if embedded:
+        data[EMBEDDING_FIELD] = embed_text(text)
+    return data
+
+
+SUMMARIES = {
+    "s1": summary(1, "You talked about trouble falling asleep."),
+    "s2": summary(2, "You talked about an argument with your sister."),
+    "s3": summary(3, "You talked about deadline pressure at work.", embedded=False),
+    "s4": summary(4, "You talked about saving money for a trip."),
+}
+
+
+def snapshots(*session_ids):
+    """Snapshots most recent first, as the summaries query returns them."""
+    return [Snapshot(session_id, SUMMARIES[session_id]) for session_id in session_ids]
+
+
+def assert_same_index(index: SummaryIndex, expected: SummaryIndex):
+    assert [entry["session_id"] for entry in index.entries] == [entry["session_id"] for entry in expected.entries]
+    query = "I can't sleep because of work"
+    np.testing.assert_allclose(index.scores(query), expected.scores(query), rtol=1e-5, atol=1e-6)
+
+
+def test_add_inserts_in_created_at_order_and_matches_a_fresh_load():
+    index = SummaryIndex.from_docs(snapshots("s4", "s2", "s1"))
+    index.add("s3", SUMMARIES["s3"])
+    assert_same_index(index, SummaryIndex.from_docs(snapshots("s4", "s3", "s2", "s1")))
+
+    # Re-closing a session replaces its entry
+    index.add("s3", SUMMARIES["s3"])
+    assert len(index) == 4
+
+
+def test_add_keeps_the_latest_sessions_within_limit():
+    index = SummaryIndex.from_docs(snapshots("s3", "s2", "s1"))
+    index.add("s4", SUMMARIES["s4"], limit=3)
+    assert_same_index(index, SummaryIndex.from_docs(snapshots("s4", "s3", "s2")))
+
+
+def test_add_without_summary_text_only_drops_the_old_entry():
+    index = SummaryIndex.from_docs(snapshots("s2", "s1"))
+    index.add("s2", {"summary": "", "created_at": "2025-01-02T10:00:00"})
+    assert [entry["session_id"] for entry in index.entries] == ["s1"]
+
+
+def test_remove_drops_a_reopened_session():
+    index = SummaryIndex.from_docs(snapshots("s4", "s3", "s2", "s1"))
+    assert index.remove("s3")
+    assert not index.remove("unknown")
+    assert_same_index(index, SummaryIndex.from_docs(snapshots("s4", "s2", "s1")))
+
+
+def test_sync_adds_new_and_drops_deleted_summaries():
+    index = SummaryIndex.from_docs(snapshots("s3", "s2", "s1"))
+    index.sync(["s4", "s3", "s1"], snapshots("s4"))
+    assert_same_index(index, SummaryIndex.from_docs(snapshots("s4", "s3", "s1")))
+
+
+def test_empty_index_accepts_additions():
+    index = SummaryIndex.from_docs([])
+    assert index.top_k("sleep", k=2) == []
+    index.add("s1", SUMMARIES["s1"])
+    (entry, score), = index.top_k("I have trouble sleeping and falling asleep", k=2)
+    assert entry["session_id"] == "s1" and score > 0
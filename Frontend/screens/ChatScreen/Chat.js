@@ -18,6 +18,9 @@ const LiveAudioChatScreen = ({ navigation }) => {
   // Configuration
   const API_BASE_URL = 'https://therapyapp-backend-82022078425.us-central1.run.app';
   const userToken = 'authorization'; // Replace with actual token or remove if not needed
+  // Session close summaries are produced by a background job; poll for up to a minute
+  const CLOSE_POLL_INTERVAL_MS = 2000;
+  const CLOSE_POLL_ATTEMPTS = 30;
   
   // Session management
   const [sessionId, setSessionId] = useState(null);
@@ -421,7 +424,9 @@ const LiveAudioChatScreen = ({ navigation }) => {
   const startSession = async (showWelcome = true) => {
     try {
       setIsProcessing(true);
-      const response = await fetch(`${API_BASE_URL}/session/`, {
+      // The backend counts activity streaks in the user's own time zone
+      const timezone = Intl.DateTimeFormat().resolvedOptions().timeZone;
+      const response = await fetch(`${API_BASE_URL}/session/?timezone=${encodeURIComponent(timezone || '')}`, {
         method: 'POST',
         headers: {
           'Authorization': `Bearer ${userToken}`,
@@ -468,6 +473,37 @@ const LiveAudioChatScreen = ({ navigation }) => {
     }
   };
 
+  // Poll a session close job and show its summary once it has succeeded
+  const showCloseSummary = async (statusUrl) => {
+    for (let attempt = 0; attempt < CLOSE_POLL_ATTEMPTS; attempt += 1) {
+      await new Promise((res) => setTimeout(res, CLOSE_POLL_INTERVAL_MS));
+      try {
+        const response = await fetch(`${API_BASE_URL}${statusUrl}`, {
+          headers: {
+            'Authorization': `Bearer ${userToken}`,
+          },
+        });
+        if (!response.ok) return;
+
+        const job = await response.json();
+        if (job.status === 'failed') return;
+        if (job.status !== 'succeeded') continue;
+
+        const summary = job.result && job.result.summary;
+        if (summary) {
+          Alert.alert(
+            'Session Complete',
+            `Thank you for sharing. Here's a brief summary: ${summary.substring(0, 100)}...`
+          );
+        }
+        return;
+      } catch (error) {
+        console.log('Could not fetch session summary:', error);
+        return;
+      }
+    }
+  };
+
   const endSession = async () => {
     // If there's no session id, still perform cleanup and close the screen
     if (!sessionId) {
@@ -497,12 +533,11 @@ const LiveAudioChatScreen = ({ navigation }) => {
         const data = await response.json();
         console.log('Session ended:', data);
         
-        // Show session summary if available
-        if (data.summary) {
-          Alert.alert(
-            'Session Complete', 
-            `Thank you for sharing. Here's a brief summary: ${data.summary.substring(0, 100)}...`
-          );
+        // The summary is written by a background job (202 with a status_url) and
+        // shown when it is ready, without holding the screen open; short sessions
+        // are not summarized and return no job
+        if (data.status_url) {
+          showCloseSummary(data.status_url);
         }
       }
       